@@ -1,3 +1,5 @@
+__version__ = "1.4.0"
+
 __all__ = [
 "main",
 ]
\ No newline at end of file
@@ -0,0 +1,274 @@
+"""Tabela colunar de usuários para relatórios (somas e contagens por grupo).
+
+Em vez de uma lista de ``User``, cada campo numérico vira um ``array`` contíguo
+(``id``/``condo_id`` em ``q``, medidas em ``d`` com NaN para NULL) e os textos
+repetidos (``condo``, ``vehicle_type``) são codificados por dicionário: um
+código ``I`` por linha e a lista de valores distintos. 1M usuários ocupam
+~48 MB em vez de ~600 MB de objetos ``User``.
+
+Com NumPy instalado, as colunas são expostas sem cópia (``np.frombuffer``) e
+filtros/somas usam ``bincount``; sem ele, laços sobre os arrays.
+"""
+from __future__ import annotations
+import math
+from array import array
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+if TYPE_CHECKING:
+    from ..domain.interfaces import IDatabase
+    from ..domain.models import User
+
+NUMERIC_COLUMNS = {
+    "id": "q",
+    "condo_id": "q",
+    "last_energy": "d",
+    "last_cost": "d",
+    "last_time_minutes": "d",
+}
+MEASURE_COLUMNS = ("last_energy", "last_cost", "last_time_minutes")
+DICT_COLUMNS = ("condo", "vehicle_type")
+
+# mesma ordem das colunas de ``UserTable.extend``
+SELECT_COLUMNS_SQL = """
+    SELECT u.id, u.condo_id, c.name, u.vehicle_type, u.last_energy, u.last_cost, u.last_time_minutes
+    FROM users u JOIN condos c ON c.id = u.condo_id ORDER BY u.id
+"""
+
+NAN = float("nan")
+
+Mask = Union[bytearray, Any]  # bytearray (0/1 por linha) ou array booleano do NumPy
+
+
+def _numpy():
+    """NumPy é opcional: acelera filtros e agrupamentos quando instalado."""
+    try:
+        import numpy  # type: ignore
+    except Exception:
+        return None
+    return numpy
+
+
+class DictColumn:
+    """Coluna de texto codificada por dicionário (valores distintos + um código por linha)."""
+
+    def __init__(self) -> None:
+        self.codes = array("I")
+        self.values: List[str] = []
+        self._index: Dict[str, int] = {}
+
+    def code_of(self, value: str) -> Optional[int]:
+        return self._index.get(value)
+
+    def encode(self, value: str) -> int:
+        code = self._index.get(value)
+        if code is None:
+            code = self._index[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def append(self, value: str) -> None:
+        self.codes.append(self.encode(value))
+
+    def __getitem__(self, row: int) -> str:
+        return self.values[self.codes[row]]
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+
+class UserTable:
+    """Instantâneo colunar dos usuários; somente leitura depois de carregado."""
+
+    def __init__(self, use_numpy: Optional[bool] = None) -> None:
+        self.id = array("q")
+        self.condo_id = array("q")
+        self.last_energy = array("d")
+        self.last_cost = array("d")
+        self.last_time_minutes = array("d")
+        self.condo = DictColumn()
+        self.vehicle_type = DictColumn()
+        np = _numpy() if use_numpy in (None, True) else None
+        if use_numpy and np is None:
+            raise RuntimeError("NumPy não está instalado.")
+        self._np = np
+
+    @classmethod
+    def from_db(cls, db: "IDatabase", chunk_size: int = 10_000, use_numpy: Optional[bool] = None) -> "UserTable":
+        """Carrega direto do cursor (tuplas em blocos), sem montar ``User``."""
+        table = cls(use_numpy)
+        with db.connect() as conn:
+            cur = conn.cursor()
+            cur.row_factory = None
+            cur.execute(SELECT_COLUMNS_SQL)
+            while True:
+                rows = cur.fetchmany(chunk_size)
+                if not rows:
+                    break
+                table.extend(rows)
+        return table
+
+    @classmethod
+    def from_users(cls, users: Iterable["User"], use_numpy: Optional[bool] = None) -> "UserTable":
+        """Para repositórios sem SQL (mock, memória)."""
+        table = cls(use_numpy)
+        table.extend(
+            (u.id, u.condo_id, u.condo, u.vehicle_type, u.last_energy, u.last_cost, u.last_time_minutes)
+            for u in users
+        )
+        return table
+
+    def extend(self, rows: Iterable[Sequence[Any]]) -> None:
+        """Acrescenta linhas ``(id, condo_id, condo, vehicle_type, energia, custo, minutos)``."""
+        ids, condo_ids = self.id.append, self.condo_id.append
+        energy, cost, minutes = self.last_energy.append, self.last_cost.append, self.last_time_minutes.append
+        condo, vtype = self.condo.append, self.vehicle_type.append
+        for uid, cid, cname, vt, e, c, t in rows:
+            ids(uid)
+            condo_ids(cid if cid is not None else 0)
+            condo(cname)
+            vtype(vt)
+            energy(NAN if e is None else e)
+            cost(NAN if c is None else c)
+            minutes(NAN if t is None else t)
+
+    def __len__(self) -> int:
+        return len(self.id)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes dos buffers das colunas (sem os valores distintos dos dicionários)."""
+        numeric = sum(getattr(self, name).itemsize * len(self) for name in NUMERIC_COLUMNS)
+        return numeric + sum(getattr(self, name).codes.itemsize * len(self) for name in DICT_COLUMNS)
+
+    def column(self, name: str) -> Any:
+        """Coluna numérica (ou códigos de uma coluna de dicionário) sem cópia:
+        ``numpy.ndarray`` se houver NumPy, senão ``memoryview``."""
+        if name in NUMERIC_COLUMNS:
+            buf = getattr(self, name)
+        elif name in DICT_COLUMNS:
+            buf = getattr(self, name).codes
+        else:
+            raise KeyError(f"Coluna desconhecida: {name}")
+        if self._np is not None:
+            return self._np.frombuffer(buf, dtype=buf.typecode) if len(buf) else self._np.array([], dtype=buf.typecode)
+        return memoryview(buf)
+
+    def mask(self, **equals: str) -> Mask:
+        """Linhas em que cada coluna de dicionário é igual ao valor dado (E lógico)."""
+        n = len(self)
+        wanted: List[Tuple[str, Optional[int]]] = []
+        for name, value in equals.items():
+            if name not in DICT_COLUMNS:
+                raise KeyError(f"Filtro só em colunas de dicionário {DICT_COLUMNS}: {name}")
+            wanted.append((name, getattr(self, name).code_of(value)))
+        if self._np is not None:
+            np = self._np
+            result = np.ones(n, dtype=bool)
+            for name, code in wanted:
+                if code is None:
+                    return np.zeros(n, dtype=bool)
+                result &= self.column(name) == code
+            return result
+        result = bytearray(b"\x01") * n
+        for name, code in wanted:
+            if code is None:
+                return bytearray(n)
+            codes = getattr(self, name).codes
+            for i in range(n):
+                if codes[i] != code:
+                    result[i] = 0
+        return result
+
+    def sum(self, column: str, where: Optional[Mask] = None) -> float:
+        """Soma ignorando NULL (NaN)."""
+        if column not in MEASURE_COLUMNS:
+            raise KeyError(f"Soma só em colunas de medida {MEASURE_COLUMNS}: {column}")
+        if self._np is not None:
+            values = self.column(column)
+            if where is not None:
+                values = values[where]
+            return float(self._np.nansum(values))
+        values = getattr(self, column)
+        if where is None:
+            return math.fsum(v for v in values if v == v)
+        return math.fsum(v for v, m in zip(values, where) if m and v == v)
+
+    def group_sum(
+        self,
+        by: str,
+        columns: Sequence[str] = MEASURE_COLUMNS,
+        where: Optional[Mask] = None,
+    ) -> Dict[str, Dict[str, float]]:
+        """Por valor de ``by`` (coluna de dicionário): ``users``, ``measured``
+        (linhas com ``last_energy``) e a soma de cada coluna de ``columns``."""
+        if by not in DICT_COLUMNS:
+            raise KeyError(f"Agrupamento só em colunas de dicionário {DICT_COLUMNS}: {by}")
+        for name in columns:
+            if name not in MEASURE_COLUMNS:
+                raise KeyError(f"Soma só em colunas de medida {MEASURE_COLUMNS}: {name}")
+        group = getattr(self, by)
+        k = len(group.values)
+        if self._np is not None:
+            totals = self._np_group_sum(by, columns, where, k)
+        else:
+            totals = self._py_group_sum(group, columns, where, k)
+        return {
+            group.values[code]: stats
+            for code, stats in enumerate(totals)
+            if stats["users"]
+        }
+
+    def _py_group_sum(
+        self, group: DictColumn, columns: Sequence[str], where: Optional[Mask], k: int
+    ) -> List[Dict[str, float]]:
+        codes = group.codes
+        users = [0] * k
+        measured = [0] * k
+        if where is None:
+            for code in codes:
+                users[code] += 1
+            for code, e in zip(codes, self.last_energy):
+                if e == e:
+                    measured[code] += 1
+        else:
+            for code, m, e in zip(codes, where, self.last_energy):
+                if m:
+                    users[code] += 1
+                    if e == e:
+                        measured[code] += 1
+        sums: Dict[str, List[float]] = {}
+        for name in columns:
+            acc = [0.0] * k
+            values = getattr(self, name)
+            if where is None:
+                for code, v in zip(codes, values):
+                    if v == v:
+                        acc[code] += v
+            else:
+                for code, m, v in zip(codes, where, values):
+                    if m and v == v:
+                        acc[code] += v
+            sums[name] = acc
+        return [
+            {"users": users[c], "measured": measured[c], **{name: sums[name][c] for name in columns}}
+            for c in range(k)
+        ]
+
+    def _np_group_sum(
+        self, by: str, columns: Sequence[str], where: Optional[Mask], k: int
+    ) -> List[Dict[str, float]]:
+        np = self._np
+        codes = self.column(by)
+        if where is not None:
+            codes = codes[where]
+        users = np.bincount(codes, minlength=k)
+        energy = self.column("last_energy") if where is None else self.column("last_energy")[where]
+        measured = np.bincount(codes, weights=~np.isnan(energy), minlength=k)
+        sums = {}
+        for name in columns:
+            values = self.column(name) if where is None else self.column(name)[where]
+            sums[name] = np.bincount(codes, weights=np.nan_to_num(values, nan=0.0), minlength=k)
+        return [
+            {"users": int(users[c]), "measured": int(measured[c]), **{name: float(sums[name][c]) for name in columns}}
+            for c in range(k)
+        ]
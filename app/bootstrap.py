@@ -0,0 +1,112 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Optional, Tuple
+from .config import AppConfig
+from .domain.interfaces import IChargingSessionRepository, ICondoRepository, IDatabase, IUserRepository
+from .infrastructure.db import SQLiteDatabase
+from .infrastructure.repositories import UserRepository, CondoRepository, ChargingSessionRepository
+from .metrics import MetricsRegistry, PeriodicDump, instrument
+from .services.user_service import UserService
+from .services.condo_service import CondoService
+from .services.rfid_service import RfidAuthorizationService
+
+
+@dataclass
+class AppContext:
+    """Serviços montados a partir da configuração (menu, comandos e servidores)."""
+    cfg: AppConfig
+    db: IDatabase  # SQLiteDatabase ou MemoryStore (database.backend)
+    user_service: UserService
+    condo_service: CondoService
+    rfid_service: RfidAuthorizationService
+    write_behind: Optional[IChargingSessionRepository] = None
+    metrics: MetricsRegistry = field(default_factory=MetricsRegistry)
+    metrics_dump: Optional[PeriodicDump] = None
+
+    def close(self) -> None:
+        if self.metrics_dump is not None:
+            self.metrics_dump.close()
+        if self.write_behind is not None:
+            self.write_behind.close()  # type: ignore[attr-defined]
+        self.db.close()
+
+
+BACKENDS = ("sqlite", "memory")
+
+
+def _open_repositories(
+    cfg: AppConfig, metrics: MetricsRegistry
+) -> Tuple[IDatabase, IUserRepository, ICondoRepository, IChargingSessionRepository]:
+    if cfg.db_backend not in BACKENDS:
+        raise ValueError(f"database.backend inválido: {cfg.db_backend} (use {' ou '.join(BACKENDS)})")
+    if cfg.db_backend == "memory":
+        from .infrastructure.memory import (
+            MemoryCondoRepository, MemorySessionRepository, MemoryStore, MemoryUserRepository,
+        )
+        store = MemoryStore.open(cfg.db_snapshot_path)
+        metrics.add_collector("memory_store", store.stats)
+        return (
+            store,
+            instrument(MemoryUserRepository(store), metrics),
+            instrument(MemoryCondoRepository(store), metrics),
+            instrument(MemorySessionRepository(store), metrics),
+        )
+    db = SQLiteDatabase(
+        cfg.database_path,
+        pool_size=cfg.db_pool_size,
+        busy_timeout_ms=cfg.db_busy_timeout_ms,
+        journal_mode=cfg.db_journal_mode,
+        slow_query_ms=cfg.db_slow_query_ms,
+        explain_slow=cfg.db_explain_slow,
+    )
+    metrics.add_collector("db_pool", db.stats)
+    if db.tracer is not None:
+        metrics.add_collector("sql", db.tracer.stats)
+    # com as métricas desligadas, instrument() devolve o próprio objeto
+    condos_repo: ICondoRepository = instrument(CondoRepository(db), metrics)
+    if cfg.condo_cache:  # o backend em memória já é um dicionário: cache só no SQLite
+        from .infrastructure.cache import CachedCondoRepository
+        condos_repo = CachedCondoRepository(condos_repo, max_size=cfg.condo_cache_size, ttl_seconds=cfg.condo_cache_ttl)
+        metrics.add_collector("condo_cache", condos_repo.stats)
+        instrument(condos_repo, metrics)
+    return (
+        db,
+        instrument(UserRepository(db), metrics),
+        condos_repo,
+        instrument(ChargingSessionRepository(db), metrics),
+    )
+
+
+def build_context(cfg: AppConfig) -> AppContext:
+    # DI: injeta implementações concretas
+    metrics = MetricsRegistry(enabled=cfg.metrics)
+    db, users_repo, condos_repo, sessions_repo = _open_repositories(cfg, metrics)
+    rfid_service = RfidAuthorizationService(users_repo)
+    write_behind = None
+    if cfg.write_behind:
+        from .infrastructure.write_behind import WriteBehindSessionRepository
+        sessions_repo = write_behind = WriteBehindSessionRepository(
+            sessions_repo,
+            max_batch=cfg.write_behind_max_batch,
+            flush_interval=cfg.write_behind_flush_ms / 1000,
+            coalesce=cfg.write_behind_coalesce,
+            user_exists=rfid_service.has_user,
+        )
+        metrics.add_collector("write_behind", write_behind.stats)
+        instrument(write_behind, metrics)
+
+    user_service = UserService(
+        users_repo, condos_repo, batch_size=cfg.import_batch_size,
+        commit_every=cfg.import_commit_every, chunk_size=cfg.import_chunk_size,
+        sessions=sessions_repo,
+    )
+    user_service.add_listener(rfid_service)
+    condo_service = CondoService(
+        condos_repo, users_repo, batch_size=cfg.import_batch_size,
+        commit_every=cfg.import_commit_every, chunk_size=cfg.import_chunk_size,
+    )
+    metrics.add_collector("rfid_index", rfid_service.stats)
+    for service in (user_service, condo_service, rfid_service):
+        instrument(service, metrics)
+    dump = PeriodicDump(metrics, cfg.metrics_file, cfg.metrics_dump_interval) if cfg.metrics_file else None
+    return AppContext(cfg, db, user_service, condo_service, rfid_service, write_behind, metrics, dump)
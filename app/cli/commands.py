@@ -0,0 +1,498 @@
+from __future__ import annotations
+import argparse
+import json
+import logging
+import shlex
+import sys
+import time
+from typing import IO, Dict, List, Optional
+from ..config import AppConfig
+
+logger = logging.getLogger(__name__)
+
+# Códigos de saída (também usados por cada linha de um run-script)
+EXIT_OK = 0
+EXIT_FAILURE = 1  # a operação falhou (arquivo ausente, validação, banco...)
+EXIT_USAGE = 2  # argumentos inválidos (mesmo código do argparse)
+EXIT_PARTIAL = 3  # lote concluído, mas parte dos registros foi rejeitada
+EXIT_NOT_FOUND = 4  # registro consultado não existe
+
+
+class Session:
+    """Estado compartilhado pelos comandos de uma invocação: os serviços só são
+    montados quando algum comando precisa deles, e uma única vez (run-script)."""
+
+    def __init__(self, cfg: AppConfig, timings: bool = False, profile: bool = False) -> None:
+        from ..profiling import make_profiler
+
+        self.cfg = cfg
+        self.timings = timings
+        self.profiler = make_profiler(cfg.export_path, profile)
+        self._ctx = None
+        self.context_ms = 0.0
+
+    @property
+    def ctx(self):
+        if self._ctx is None:
+            start = time.perf_counter()
+            from ..bootstrap import build_context
+            self._ctx = build_context(self.cfg)
+            self.context_ms = (time.perf_counter() - start) * 1000
+        return self._ctx
+
+    def note_size(self, size: int) -> None:
+        if self.profiler is not None:
+            self.profiler.note_size(size)
+
+    def close(self) -> None:
+        if self._ctx is not None:
+            self._ctx.close()
+            self._ctx = None
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="evcharge", description="EVCharge Manager - comandos não interativos.")
+    parser.add_argument(
+        "--timings", action="store_true",
+        help="Escreve em stderr uma linha JSON por comando com código de saída e tempo (ms).",
+    )
+    parser.add_argument(
+        "--profile", action="store_true",
+        help="Perfila cada comando (cProfile) em <export_path>/profiles (ou EVCHARGE_PROFILE=1).",
+    )
+    parser.add_argument(
+        "--startup-profile", action="store_true",
+        help="Ao final, escreve em stderr (JSON) o tempo de cada fase da inicialização.",
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_version = sub.add_parser("version", help="Exibe a versão (não abre o banco).")
+    p_version.set_defaults(handler=_cmd_version)
+
+    p_iu = sub.add_parser("import-users", help="Importa usuários de um TXT.")
+    p_iu.add_argument("file")
+    p_iu.set_defaults(handler=_cmd_import_users)
+
+    p_ic = sub.add_parser("import-condos", help="Importa condomínios de um TXT.")
+    p_ic.add_argument("file")
+    p_ic.set_defaults(handler=_cmd_import_condos)
+
+    p_export = sub.add_parser("export", help="Exporta usuários ou condomínios.")
+    p_export.add_argument("entity", choices=["users", "condos"])
+    p_export.add_argument("--format", choices=["csv"], default="csv")
+    p_export.add_argument("--dir", help="Diretório de saída (padrão: cli.export_path).")
+    p_export.set_defaults(handler=_cmd_export)
+
+    p_report = sub.add_parser("report", help="Energia, custo e tempo somados por condomínio ou tipo de veículo.")
+    p_report.add_argument("--by", choices=["condo", "vehicle_type"], default="condo")
+    p_report.add_argument("--condo", help="Só usuários deste condomínio.")
+    p_report.add_argument("--vehicle-type", help="Só veículos deste tipo.")
+    p_report.add_argument("--format", choices=["text", "json", "csv"], default="text")
+    p_report.add_argument("--dir", help="Diretório do CSV (padrão: cli.export_path).")
+    p_report.set_defaults(handler=_cmd_report)
+
+    p_measure = sub.add_parser("measure", help="Registra ou lê a última medida de um usuário.")
+    measure_sub = p_measure.add_subparsers(dest="action", required=True)
+    p_mset = measure_sub.add_parser("set", help="Registra uma medida.")
+    p_mset.add_argument("user_id", type=int)
+    p_mset.add_argument("--energy", type=float, required=True, help="Energia (kWh).")
+    p_mset.add_argument("--cost", type=float, required=True, help="Custo (R$).")
+    p_mset.add_argument("--minutes", type=float, required=True, help="Duração (min).")
+    p_mset.set_defaults(handler=_cmd_measure_set)
+    p_mget = measure_sub.add_parser("get", help="Exibe a última medida.")
+    p_mget.add_argument("user_id", type=int)
+    p_mget.set_defaults(handler=_cmd_measure_get)
+
+    p_script = sub.add_parser(
+        "run-script", help="Executa vários comandos (um por linha) num só processo (- = entrada padrão).",
+    )
+    p_script.add_argument("file")
+    p_script.add_argument("--keep-going", action="store_true", help="Continua após um comando falhar.")
+    p_script.set_defaults(handler=_cmd_run_script)
+
+    p_replay = sub.add_parser(
+        "replay", help="Reexecuta um roteiro gravado de operações do menu e mede a latência (- = entrada padrão).",
+    )
+    p_replay.add_argument("file")
+    p_replay.add_argument("--repeat", type=int, default=1, help="Quantas vezes percorrer o roteiro.")
+    p_replay.add_argument("--db", help="Banco alvo (padrão: database.path da configuração).")
+    p_replay.add_argument("--format", choices=["text", "json"], default="text")
+    p_replay.add_argument("--show-output", action="store_true", help="Mostra a saída dos handlers (stderr).")
+    p_replay.set_defaults(handler=_cmd_replay)
+
+    p_stats = sub.add_parser("stats", help="Métricas do processo (chamadas, latência, pool, caches).")
+    p_stats.add_argument("--format", choices=["text", "json", "prometheus"], default="text")
+    p_stats.add_argument("--output", "-o", help="Grava em arquivo (atomicamente) em vez de imprimir.")
+    p_stats.set_defaults(handler=_cmd_stats)
+
+    p_migrate = sub.add_parser("migrate", help="Aplica as migrações pendentes do banco.")
+    p_migrate.add_argument("--status", action="store_true", help="Apenas exibe as migrações aplicadas/pendentes.")
+    p_migrate.set_defaults(handler=_cmd_migrate)
+
+    p_snap = sub.add_parser("rfid-snapshot", help="Gera o arquivo binário de RFIDs para os gateways.")
+    p_snap.add_argument("--output", "-o", help="Destino (padrão: rfid.snapshot_path da configuração).")
+    p_snap.set_defaults(handler=_cmd_rfid_snapshot)
+
+    p_serve = sub.add_parser("serve", help="Sobe o servidor TCP de autorização/medidas para carregadores.")
+    p_serve.add_argument("--host", help="Endereço (padrão: server.host).")
+    p_serve.add_argument("--port", type=int, help="Porta (padrão: server.port; 0 = qualquer livre).")
+    p_serve.set_defaults(handler=_cmd_serve)
+
+    p_ocpp = sub.add_parser("ocpp-server", help="Sobe a central OCPP 1.6-J (WebSocket) para carregadores.")
+    p_ocpp.add_argument("--host", help="Endereço (padrão: server.host).")
+    p_ocpp.add_argument("--port", type=int, help="Porta (padrão: server.ocpp_port; 0 = qualquer livre).")
+    p_ocpp.set_defaults(handler=_cmd_ocpp_server)
+
+    p_api = sub.add_parser("api", help="Sobe a API HTTP/JSON de usuários, condomínios e medidas.")
+    p_api.add_argument("--host", help="Endereço (padrão: server.host).")
+    p_api.add_argument("--port", type=int, help="Porta (padrão: server.http_port; 0 = qualquer livre).")
+    p_api.set_defaults(handler=_cmd_api)
+    return parser
+
+
+def _cmd_version(args: argparse.Namespace, session: Session) -> int:
+    from .. import __version__
+
+    print(f"evcharge {__version__}")
+    return EXIT_OK
+
+
+def _cmd_import_users(args: argparse.Namespace, session: Session) -> int:
+    ok, fail, errors = session.ctx.user_service.import_from_txt(args.file)
+    session.note_size(ok + fail)
+    print(f"Importação concluída: {ok} criado(s), {fail} falha(s).")
+    for e in errors:
+        print(f" - {e}", file=sys.stderr)
+    return EXIT_PARTIAL if fail else EXIT_OK
+
+
+def _cmd_import_condos(args: argparse.Namespace, session: Session) -> int:
+    rejected: List[str] = []
+    created = session.ctx.condo_service.import_from_txt(args.file, rejected=rejected)
+    session.note_size(created + len(rejected))
+    print(f"{created} condomínio(s) importado(s).")
+    for e in rejected:
+        print(f" - {e}", file=sys.stderr)
+    return EXIT_PARTIAL if rejected else EXIT_OK
+
+
+def _cmd_export(args: argparse.Namespace, session: Session) -> int:
+    from ..infrastructure.exporters import CsvExporter
+
+    exporter = CsvExporter(args.dir or session.cfg.export_path)
+    if args.entity == "users":
+        path, count = exporter.export_users(session.ctx.user_service.iter_users())
+    else:
+        path, count = exporter.export_condos(session.ctx.condo_service.iter_condos())
+    session.note_size(count)
+    print(f"Exportado para {path}: {count} registro(s)." if path else "Nada a exportar.")
+    return EXIT_OK
+
+
+def _cmd_report(args: argparse.Namespace, session: Session) -> int:
+    from ..analytics.columnar import UserTable
+
+    ctx = session.ctx
+    if session.cfg.db_backend == "memory":
+        table = UserTable.from_users(ctx.user_service.iter_users())
+    else:
+        table = UserTable.from_db(ctx.db)
+    session.note_size(len(table))
+    filters = {k: v for k, v in (("condo", args.condo), ("vehicle_type", args.vehicle_type)) if v}
+    totals = table.group_sum(args.by, where=table.mask(**filters) if filters else None)
+    if args.format == "csv":
+        from ..infrastructure.exporters import CsvExporter
+
+        path, count = CsvExporter(args.dir or session.cfg.export_path).export_usage(args.by, totals)
+        print(f"Exportado para {path}: {count} grupo(s)." if path else "Nada a exportar.")
+    elif args.format == "json":
+        print(json.dumps(totals, ensure_ascii=False))
+    else:
+        print(f"{args.by:<32}{'Usuários':>10}{'Medidos':>9}{'Energia kWh':>14}{'Custo R$':>12}{'Tempo min':>11}")
+        for key, t in sorted(totals.items()):
+            print(
+                f"{key:<32}{t['users']:>10}{t['measured']:>9}{t['last_energy']:>14.3f}"
+                f"{t['last_cost']:>12.2f}{t['last_time_minutes']:>11.1f}"
+            )
+    return EXIT_OK
+
+
+def _cmd_measure_set(args: argparse.Namespace, session: Session) -> int:
+    session.ctx.user_service.set_last_measure(args.user_id, args.energy, args.cost, args.minutes)
+    print("Medida registrada.")
+    return EXIT_OK
+
+
+def _cmd_measure_get(args: argparse.Namespace, session: Session) -> int:
+    if session.ctx.user_service.get_user("id", str(args.user_id)) is None:
+        print("Usuário não encontrado.", file=sys.stderr)
+        return EXIT_NOT_FOUND
+    print(session.ctx.user_service.read_last_measure(args.user_id))
+    return EXIT_OK
+
+
+def _cmd_run_script(args: argparse.Namespace, session: Session) -> int:
+    """Uma linha por comando, na mesma sintaxe da linha de comando (``#`` comenta).
+
+    Retorna o código do primeiro comando que falhou (ou ``EXIT_PARTIAL`` se
+    algum import rejeitou registros); sem ``--keep-going`` para na primeira falha.
+    """
+    parser = build_parser()
+    worst = EXIT_OK
+    with _open_script(args.file) as f:
+        for line_no, line in enumerate(f, start=1):
+            argv = shlex.split(line, comments=True)
+            if argv[:1] == [parser.prog]:
+                argv = argv[1:]
+            if not argv:
+                continue
+            try:
+                sub_args = parser.parse_args(argv)
+            except SystemExit as e:
+                code = EXIT_USAGE if e.code else EXIT_OK
+            else:
+                if sub_args.handler is _cmd_run_script:
+                    print(f"Linha {line_no}: run-script não pode ser aninhado.", file=sys.stderr)
+                    code = EXIT_USAGE
+                else:
+                    code = _execute(sub_args, session, f"{args.file}:{line_no} {' '.join(argv)}")
+            if code == EXIT_PARTIAL:
+                worst = worst or code
+            elif code != EXIT_OK:
+                if not args.keep_going:
+                    return code
+                if worst in (EXIT_OK, EXIT_PARTIAL):
+                    worst = code
+    return worst
+
+
+def _cmd_replay(args: argparse.Namespace, session: Session) -> int:
+    """Roda as operações pelos handlers do menu; ``EXIT_PARTIAL`` se alguma falhou."""
+    from .menu import MenuCLI
+    from .replay import parse_script, replay
+
+    with _open_script(args.file) as f:
+        operations = parse_script(f)
+    if args.db:
+        # contexto próprio: num run-script o da sessão pode já estar aberto em outro banco,
+        # e os comandos seguintes continuam nele
+        import copy
+        from ..bootstrap import build_context
+
+        cfg = copy.copy(session.cfg)
+        cfg.database_path = args.db
+        ctx = build_context(cfg)
+    else:
+        ctx = session.ctx
+    try:
+        menu = MenuCLI(
+            ctx.user_service, ctx.condo_service, export_dir=session.cfg.export_path,
+            echo_rows=session.cfg.echo_rows, rfid_service=ctx.rfid_service,
+        )
+        report = replay(menu, operations, repeat=args.repeat, output=sys.stderr if args.show_output else None)
+    finally:
+        if args.db:
+            ctx.close()
+    print(json.dumps(report.to_dict()) if args.format == "json" else report.render())
+    return EXIT_PARTIAL if report.error_count else EXIT_OK
+
+
+class _open_script:
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._f: Optional[IO[str]] = None
+
+    def __enter__(self) -> IO[str]:
+        self._f = sys.stdin if self.path == "-" else open(self.path, encoding="utf-8")
+        return self._f
+
+    def __exit__(self, *exc) -> None:
+        if self._f is not None and self._f is not sys.stdin:
+            self._f.close()
+
+
+def _cmd_stats(args: argparse.Namespace, session: Session) -> int:
+    """Num run-script, mostra o que os comandos anteriores mediram (mesmo contexto)."""
+    metrics = session.ctx.metrics
+    if args.format == "prometheus":
+        if args.output:
+            metrics.write_prometheus(args.output)
+            print(f"Métricas gravadas em {args.output}.")
+            return EXIT_OK
+        text = metrics.render_prometheus()
+    elif args.format == "json":
+        text = json.dumps({"enabled": metrics.enabled, "methods": metrics.summary(), "gauges": metrics.collect()})
+    else:
+        text = _stats_table(metrics)
+    if args.output:
+        from ..metrics import write_atomic
+
+        write_atomic(args.output, text + "\n")
+        print(f"Métricas gravadas em {args.output}.")
+    else:
+        print(text)
+    return EXIT_OK
+
+
+def _stats_table(metrics) -> str:
+    lines = []
+    if not metrics.enabled:
+        lines.append("Instrumentação desligada (metrics.enabled / METRICS=1); apenas gauges.")
+    rows = metrics.summary()
+    if rows:
+        lines.append(f"{'Método':<44}{'Chamadas':>10}{'Erros':>7}{'Total ms':>12}{'p50 ms':>10}{'p99 ms':>10}")
+        for r in sorted(rows, key=lambda r: -r["total_ms"]):
+            name = f"{r['component']}.{r['method']}"
+            lines.append(
+                f"{name:<44}{r['calls']:>10}{r['errors']:>7}{r['total_ms']:>12.3f}{r['p50_ms']:>10.3f}{r['p99_ms']:>10.3f}"
+            )
+    for group, values in metrics.collect().items():
+        lines.append(f"{group}: " + ", ".join(f"{k}={v:g}" for k, v in values.items()))
+    return "\n".join(lines)
+
+
+def _cmd_migrate(args: argparse.Namespace, session: Session) -> int:
+    from ..infrastructure.migrations import MigrationRunner
+
+    runner = MigrationRunner(session.cfg.database_path)
+    if args.status:
+        current = runner.current_version()
+        print(f"Versão atual: {current} (mais recente: {runner.latest_version})")
+        for m, done in runner.status():
+            print(f"[{'x' if done else ' '}] {m.version:03d} {m.description}")
+        return EXIT_OK
+    applied = runner.migrate()
+    if applied:
+        print(f"Migrações aplicadas: {', '.join(str(v) for v in applied)}")
+    else:
+        print("Banco já está na versão mais recente.")
+    return EXIT_OK
+
+
+def _cmd_rfid_snapshot(args: argparse.Namespace, session: Session) -> int:
+    from ..infrastructure.rfid_snapshot import write_snapshot
+
+    output = args.output or session.cfg.rfid_snapshot_path
+    entries = ((rfid, e.user_id) for rfid, e in session.ctx.user_service.users.iter_rfid_entries())
+    count = write_snapshot(entries, output)
+    print(f"Snapshot RFID gravado em {output}: {count} tag(s).")
+    return EXIT_OK
+
+
+def _cmd_serve(args: argparse.Namespace, session: Session) -> int:
+    from ..server.auth_server import AuthorizationServer
+
+    cfg = session.cfg
+    return _serve_with(session, lambda ctx: AuthorizationServer(
+        ctx.user_service, ctx.rfid_service,
+        host=args.host or cfg.server_host,
+        port=cfg.server_port if args.port is None else args.port,
+        max_workers=cfg.server_workers, max_pipeline=cfg.server_max_pipeline,
+    ))
+
+
+def _cmd_ocpp_server(args: argparse.Namespace, session: Session) -> int:
+    from ..server.ocpp import OcppCentralSystem
+
+    cfg = session.cfg
+    return _serve_with(session, lambda ctx: OcppCentralSystem(
+        ctx.user_service, ctx.condo_service, ctx.rfid_service,
+        host=args.host or cfg.server_host,
+        port=cfg.ocpp_port if args.port is None else args.port,
+        max_workers=cfg.server_workers,
+    ))
+
+
+def _cmd_api(args: argparse.Namespace, session: Session) -> int:
+    from ..server.http_api import HttpApi
+
+    cfg, ctx = session.cfg, session.ctx
+    api = HttpApi(
+        ctx.user_service, ctx.condo_service,
+        host=args.host or cfg.server_host,
+        port=cfg.http_port if args.port is None else args.port,
+    )
+    print(f"API ouvindo em http://{api.host}:{api.port}", flush=True)
+    try:
+        api.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        api.close()
+    return EXIT_OK
+
+
+def _serve_with(session: Session, make_server) -> int:
+    """Sobe o servidor criado por ``make_server`` com os serviços da sessão e roda até Ctrl+C."""
+    import asyncio
+
+    ctx = session.ctx
+    ctx.rfid_service.load()  # evita que o primeiro carregador pague a carga do índice
+    server = make_server(ctx)
+    ctx.metrics.add_collector("server", server.stats)
+
+    async def _serve() -> None:
+        await server.start()
+        print(f"Servidor ouvindo em {server.host}:{server.port}", flush=True)
+        try:
+            await server.serve_forever()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(_serve())
+    except KeyboardInterrupt:
+        pass
+    return EXIT_OK
+
+
+def _execute(args: argparse.Namespace, session: Session, label: str) -> int:
+    """Roda um comando já interpretado; exceções viram ``EXIT_FAILURE`` em vez de traceback."""
+    start = time.perf_counter()
+    try:
+        if session.profiler is not None and args.handler is not _cmd_run_script:
+            operation = "-".join(filter(None, (args.command, getattr(args, "action", None))))
+            with session.profiler.profile(operation):
+                code = args.handler(args, session)
+        else:
+            code = args.handler(args, session)
+    except Exception as e:
+        logger.debug("Comando %s falhou", label, exc_info=True)
+        print(f"Erro: {e}", file=sys.stderr)
+        code = EXIT_FAILURE
+    if session.timings:
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        print(json.dumps({"command": label, "exit": code, "elapsed_ms": round(elapsed_ms, 3)}), file=sys.stderr)
+    return code
+
+
+_GLOBAL_FLAGS = ("--timings", "--profile", "--startup-profile")
+
+
+def run(argv: List[str], cfg: Optional[AppConfig] = None, startup: Optional[Dict[str, float]] = None) -> int:
+    """Executa um comando. ``startup`` traz fases já medidas pelo ``main`` (ms)
+    e só é usado com ``--startup-profile``."""
+    start = time.perf_counter()
+    args = build_parser().parse_args(argv)
+    phases = dict(startup or {})
+    if cfg is None:
+        cfg = AppConfig.load("config.yaml")
+        phases["config"] = (time.perf_counter() - start) * 1000
+    phases["parse"] = (time.perf_counter() - start) * 1000 - phases.get("config", 0.0)
+    session = Session(cfg, timings=args.timings, profile=args.profile)
+    command_start = time.perf_counter()
+    try:
+        code = _execute(args, session, " ".join(a for a in argv if a not in _GLOBAL_FLAGS))
+    finally:
+        session.close()
+    phases["context"] = session.context_ms
+    phases["command"] = (time.perf_counter() - command_start) * 1000 - session.context_ms
+    if args.startup_profile:
+        _print_startup_profile(phases)
+    return code
+
+
+def _print_startup_profile(phases: Dict[str, float]) -> None:
+    profile = {name: round(ms, 3) for name, ms in phases.items()}
+    profile["total"] = round(sum(phases.values()), 3)
+    print(json.dumps({"startup_ms": profile, "modules": len(sys.modules)}), file=sys.stderr)
@@ -1,22 +1,71 @@
 from __future__ import annotations
-import csv
 import logging
 from pathlib import Path
-from typing import Callable
+from contextlib import nullcontext
+from typing import TYPE_CHECKING, Callable, List, Optional
 from ..services.user_service import UserService
 from ..services.condo_service import CondoService
+from ..services.rfid_service import RfidAuthorizationService
 from ..utils.validators import non_empty_str, to_float, to_int, validate_rfid
 
+if TYPE_CHECKING:
+    from ..infrastructure.exporters import CsvExporter
+    from ..profiling import Profiler
+    from .replay import MenuRecorder
+
+# nomes das operações nos arquivos de perfil
+OPERATIONS = {
+    "1": "cadastrar-condominio",
+    "2": "importar-condominios",
+    "3": "cadastrar-usuario",
+    "4": "consultar-usuario",
+    "5": "consultar-condominio",
+    "6": "atualizar-usuario",
+    "7": "atualizar-condominio",
+    "8": "medidas",
+    "9": "excluir-usuario",
+    "10": "excluir-condominio",
+    "11": "exportar-usuarios",
+    "12": "exportar-condominios",
+    "13": "importar-usuarios",
+    "14": "autorizar-rfid",
+}
+
 logger = logging.getLogger(__name__)
 
 
 class MenuCLI:
-    def __init__(self, user_service: UserService, condo_service: CondoService, export_dir: str) -> None:
+    def __init__(
+        self,
+        user_service: UserService,
+        condo_service: CondoService,
+        export_dir: str,
+        echo_rows: bool = True,
+        rfid_service: Optional[RfidAuthorizationService] = None,
+        profiler: Optional["Profiler"] = None,
+        recorder: Optional["MenuRecorder"] = None,
+    ) -> None:
         self.user_service = user_service
         self.condo_service = condo_service
         self.export_dir = export_dir
+        self.echo_rows = echo_rows
+        self.rfid_service = rfid_service
+        self.profiler = profiler
+        self.recorder = recorder
+        # respostas vindas de um roteiro (replay) em vez do teclado
+        self.answer_source: Optional[Callable[[str], str]] = None
+        self._answers: Optional[List[str]] = None
+        self._exporter: Optional["CsvExporter"] = None
         Path(self.export_dir).mkdir(parents=True, exist_ok=True)
 
+    @property
+    def exporter(self) -> "CsvExporter":
+        # csv/exporters só são carregados na primeira exportação
+        if self._exporter is None:
+            from ..infrastructure.exporters import CsvExporter
+            self._exporter = CsvExporter(self.export_dir)
+        return self._exporter
+
     def run(self) -> None:
         while True:
             print("=== EVCharge Manager ===")
@@ -33,82 +82,133 @@ class MenuCLI:
             print("11) Listar usuários e exportar CSV")
             print("12) Listar condomínios e exportar CSV")
             print("13) Importar usuários de TXT")
+            if self.rfid_service is not None:
+                print("14) Autorizar RFID")
             print("0) Sair")
             op = input("> Escolha: ").strip()
+            if self.recorder is not None:
+                self._answers = []
 
             try:
-                if op == "1":
-                    self._cad_condo()
-                elif op == "2":
-                    self._import_txt_condos()
-                elif op == "3":
-                    self._cad_user()
-                elif op == "4":
-                    self._consult_user()
-                elif op == "5":
-                    self._consult_condo()
-                elif op == "6":
-                    self._update_user()
-                elif op == "7":
-                    self._update_condo()
-                elif op == "8":
-                    self._measures()
-                elif op == "9":
-                    self._delete_user()
-                elif op == "10":
-                    self._delete_condo()
-                elif op == "11":
-                    self._list_users_export()
-                elif op == "12":
-                    self._list_condos_export()
-                elif op == "13":
-                    self._import_txt_users()
-                elif op == "0":
-                    print("Até mais!")
+                if not self.perform(op):
                     break
-                else:
-                    print("Opção inválida.")
             except Exception as e:
                 logger.exception("Erro na operação: %s", e)
                 print(f"Erro: {e}")
+            finally:
+                if self._answers is not None and op != "0":
+                    self.recorder.record(op, self._answers)  # type: ignore[union-attr]
+                self._answers = None
+
+    def perform(self, op: str) -> bool:
+        """Executa uma opção do menu (perfilada, se houver profiler); ``False`` = sair."""
+        with self._profile(op):
+            return self._dispatch(op)
+
+    def _ask(self, prompt: str) -> str:
+        answer = input(prompt) if self.answer_source is None else self.answer_source(prompt)
+        if self._answers is not None:
+            self._answers.append(answer)
+        return answer
+
+    def _profile(self, op: str):
+        if self.profiler is None or op not in OPERATIONS:
+            return nullcontext()
+        return self.profiler.profile(OPERATIONS[op])
+
+    def _note_size(self, size: int) -> None:
+        if self.profiler is not None:
+            self.profiler.note_size(size)
+
+    def _dispatch(self, op: str) -> bool:
+        """Executa a opção do menu; ``False`` encerra o laço."""
+        if op == "1":
+            self._cad_condo()
+        elif op == "2":
+            self._import_txt_condos()
+        elif op == "3":
+            self._cad_user()
+        elif op == "4":
+            self._consult_user()
+        elif op == "5":
+            self._consult_condo()
+        elif op == "6":
+            self._update_user()
+        elif op == "7":
+            self._update_condo()
+        elif op == "8":
+            self._measures()
+        elif op == "9":
+            self._delete_user()
+        elif op == "10":
+            self._delete_condo()
+        elif op == "11":
+            self._list_users_export()
+        elif op == "12":
+            self._list_condos_export()
+        elif op == "13":
+            self._import_txt_users()
+        elif op == "14" and self.rfid_service is not None:
+            self._authorize_rfid()
+        elif op == "0":
+            print("Até mais!")
+            return False
+        else:
+            print("Opção inválida.")
+        return True
 
     def _cad_condo(self) -> None:
-        name = non_empty_str(input("Nome do condomínio: "), "Nome")
-        charger_type = non_empty_str(input("Tipo do carregador (Lento/Rápido): "), "Tipo")
-        chargers_count = to_int(input("Quantidade de carregadores: "), "Quantidade de carregadores")
-        state = non_empty_str(input("Estado (UF): "), "Estado")
-        energy_price = to_float(input("Preço de energia (R$/kWh): "), "Preço de energia")
-        apartments_count = to_int(input("Nº de apartamentos: "), "Nº apartamentos")
+        name = non_empty_str(self._ask("Nome do condomínio: "), "Nome")
+        charger_type = non_empty_str(self._ask("Tipo do carregador (Lento/Rápido): "), "Tipo")
+        chargers_count = to_int(self._ask("Quantidade de carregadores: "), "Quantidade de carregadores")
+        state = non_empty_str(self._ask("Estado (UF): "), "Estado")
+        energy_price = to_float(self._ask("Preço de energia (R$/kWh): "), "Preço de energia")
+        apartments_count = to_int(self._ask("Nº de apartamentos: "), "Nº apartamentos")
         cid = self.condo_service.register_condo(name, apartments_count, chargers_count, charger_type, state, energy_price)
         print(f"Condomínio cadastrado com ID {cid}")
 
     def _import_txt_condos(self) -> None:
-        path = non_empty_str(input("Caminho do arquivo TXT de condomínios: "), "Arquivo")
-        created = self.condo_service.import_from_txt(path)
+        path = non_empty_str(self._ask("Caminho do arquivo TXT de condomínios: "), "Arquivo")
+        rejected: List[str] = []
+        created = self.condo_service.import_from_txt(path, rejected=rejected)
+        self._note_size(created + len(rejected))
         print(f"{created} condomínio(s) importado(s).")
+        if rejected:
+            print("Linhas recusadas:")
+            for e in rejected:
+                print(" - ", e)
 
     def _cad_user(self) -> None:
-        name = non_empty_str(input("Nome do morador: "), "Nome")
-        apartment = non_empty_str(input("Apartamento: "), "Apartamento")
-        condo = non_empty_str(input("Condomínio (nome): "), "Condomínio")
-        plate_ending = non_empty_str(input("Últimos 2 dígitos da placa: "), "Final da placa")
-        vehicle_type = non_empty_str(input("Tipo do veículo (híbrido/elétrico): "), "Tipo")
-        rfid = validate_rfid(input("Código RFID (8 hex, ex.: b3950a25): "))
+        name = non_empty_str(self._ask("Nome do morador: "), "Nome")
+        apartment = non_empty_str(self._ask("Apartamento: "), "Apartamento")
+        condo = non_empty_str(self._ask("Condomínio (nome): "), "Condomínio")
+        plate_ending = non_empty_str(self._ask("Últimos 2 dígitos da placa: "), "Final da placa")
+        vehicle_type = non_empty_str(self._ask("Tipo do veículo (híbrido/elétrico): "), "Tipo")
+        rfid = validate_rfid(self._ask("Código RFID (8 hex, ex.: b3950a25): "))
         uid = self.user_service.register_user(name, apartment, condo, plate_ending, vehicle_type, rfid)
         print(f"Usuário cadastrado com ID {uid}")
 
     def _import_txt_users(self) -> None:
-        path = non_empty_str(input("Caminho do arquivo TXT de usuários: "), "Arquivo")
+        path = non_empty_str(self._ask("Caminho do arquivo TXT de usuários: "), "Arquivo")
         ok, fail, errors = self.user_service.import_from_txt(path)
+        self._note_size(ok + fail)
         print(f"Importação concluída: {ok} criado(s), {fail} falha(s).")
         if errors:
             print("Erros:")
             for e in errors:
                 print(" - ", e)
 
+    def _authorize_rfid(self) -> None:
+        rfid = non_empty_str(self._ask("Código RFID: "), "RFID")
+        entry = self.rfid_service.authorize(rfid)  # type: ignore[union-attr]
+        if entry is None:
+            print("RFID não autorizado.")
+            return
+        print(f"Autorizado: usuário ID={entry.user_id} | Condomínio ID={entry.condo_id} | Tipo={entry.vehicle_type}")
+
     def _consult_user(self) -> None:
-        by = non_empty_str(input("Consultar por 'id' ou 'name': "), "Modo")
-        value = non_empty_str(input("Valor: "), "Valor")
+        by = non_empty_str(self._ask("Consultar por 'id' ou 'name': "), "Modo")
+        value = non_empty_str(self._ask("Valor: "), "Valor")
         u = self.user_service.get_user(by, value)
         if not u:
             print("Usuário não encontrado.")
@@ -119,8 +219,8 @@ class MenuCLI:
         )
 
     def _consult_condo(self) -> None:
-        by = non_empty_str(input("Consultar por 'id' ou 'name': "), "Modo")
-        value = non_empty_str(input("Valor: "), "Valor")
+        by = non_empty_str(self._ask("Consultar por 'id' ou 'name': "), "Modo")
+        value = non_empty_str(self._ask("Valor: "), "Valor")
         c = self.condo_service.get_condo(by, value)
         if not c:
             print("Condomínio não encontrado.")
@@ -131,35 +231,35 @@ class MenuCLI:
         )
 
     def _update_user(self) -> None:
-        uid = to_int(input("ID do usuário para atualizar: "), "ID")
+        uid = to_int(self._ask("ID do usuário para atualizar: "), "ID")
         u = self.user_service.get_user("id", str(uid))
         if not u:
             print("Usuário não encontrado.")
             return
         # campos opcionais; se vazio, mantém
-        name = input(f"Nome [{u.name}]: ").strip() or u.name
-        ap = input(f"Apartamento [{u.apartment}]: ").strip() or u.apartment
-        cond = input(f"Condomínio [{u.condo}]: ").strip() or u.condo
-        plate = input(f"Final da placa [{u.plate_ending}]: ").strip() or u.plate_ending
-        vtype = input(f"Tipo do veículo [{u.vehicle_type}]: ").strip() or u.vehicle_type
-        rfid_in = input(f"RFID [{u.rfid_code}]: ").strip()
+        name = self._ask(f"Nome [{u.name}]: ").strip() or u.name
+        ap = self._ask(f"Apartamento [{u.apartment}]: ").strip() or u.apartment
+        cond = self._ask(f"Condomínio [{u.condo}]: ").strip() or u.condo
+        plate = self._ask(f"Final da placa [{u.plate_ending}]: ").strip() or u.plate_ending
+        vtype = self._ask(f"Tipo do veículo [{u.vehicle_type}]: ").strip() or u.vehicle_type
+        rfid_in = self._ask(f"RFID [{u.rfid_code}]: ").strip()
         rfid = validate_rfid(rfid_in) if rfid_in else u.rfid_code
         u.name, u.apartment, u.condo, u.plate_ending, u.vehicle_type, u.rfid_code = name, ap, cond, plate, vtype, rfid
         self.user_service.update_user(u)
         print("Usuário atualizado.")
 
     def _update_condo(self) -> None:
-        cid = to_int(input("ID do condomínio para atualizar: "), "ID")
+        cid = to_int(self._ask("ID do condomínio para atualizar: "), "ID")
         c = self.condo_service.get_condo("id", str(cid))
         if not c:
             print("Condomínio não encontrado.")
             return
-        name = input(f"Nome [{c.name}]: ").strip() or c.name
-        ctype = input(f"Tipo carregador [{c.charger_type}]: ").strip() or c.charger_type
-        ccnt = input(f"Qtde carregadores [{c.chargers_count}]: ").strip()
-        state = input(f"UF [{c.state}]: ").strip() or c.state
-        price = input(f"Preço kWh [{c.energy_price}]: ").strip()
-        apts = input(f"Qtde apartamentos [{c.apartments_count}]: ").strip()
+        name = self._ask(f"Nome [{c.name}]: ").strip() or c.name
+        ctype = self._ask(f"Tipo carregador [{c.charger_type}]: ").strip() or c.charger_type
+        ccnt = self._ask(f"Qtde carregadores [{c.chargers_count}]: ").strip()
+        state = self._ask(f"UF [{c.state}]: ").strip() or c.state
+        price = self._ask(f"Preço kWh [{c.energy_price}]: ").strip()
+        apts = self._ask(f"Qtde apartamentos [{c.apartments_count}]: ").strip()
         c.name = name
         c.charger_type = ctype
         c.chargers_count = int(ccnt) if ccnt else c.chargers_count
@@ -170,56 +270,46 @@ class MenuCLI:
         print("Condomínio atualizado.")
 
     def _measures(self) -> None:
-        uid = to_int(input("ID do usuário: "), "ID")
-        action = input("Digite 'ver' para ler ou 'set' para registrar medida: ").strip().lower()
+        uid = to_int(self._ask("ID do usuário: "), "ID")
+        action = self._ask("Digite 'ver' para ler ou 'set' para registrar medida: ").strip().lower()
         if action == "ver":
             msg = self.user_service.read_last_measure(uid)
             print(msg)
         elif action == "set":
-            e = to_float(input("Energia (kWh): "), "Energia")
-            c = to_float(input("Custo (R$): "), "Custo")
-            t = to_float(input("Tempo (min): "), "Tempo")
+            e = to_float(self._ask("Energia (kWh): "), "Energia")
+            c = to_float(self._ask("Custo (R$): "), "Custo")
+            t = to_float(self._ask("Tempo (min): "), "Tempo")
             self.user_service.set_last_measure(uid, e, c, t)
             print("Medida registrada.")
         else:
             print("Ação inválida.")
 
     def _delete_user(self) -> None:
-        uid = to_int(input("ID do usuário: "), "ID")
+        uid = to_int(self._ask("ID do usuário: "), "ID")
         self.user_service.delete_user(uid)
         print("Usuário deletado.")
 
     def _delete_condo(self) -> None:
-        cid = to_int(input("ID do condomínio: "), "ID")
+        cid = to_int(self._ask("ID do condomínio: "), "ID")
         ok, msg = self.condo_service.delete_condo(cid)
         print(msg)
 
     def _list_users_export(self) -> None:
-        users = list(self.user_service.list_users())
-        for u in users:
-            print(f"{u.id};{u.name};{u.rfid_code};{u.apartment};{u.condo};{u.plate_ending};{u.vehicle_type};{u.last_energy};{u.last_cost};{u.last_time_minutes}")
-        if users:
-            path = Path(self.export_dir) / "users.csv"
-            with path.open("w", encoding="utf-8", newline="") as f:
-                w = csv.writer(f, delimiter=';')
-                w.writerow(["ID","Nome","RFID","Apartamento","Condomínio","FinalPlaca","Tipo","UltEnergia","UltCusto","UltTempoMin"])
-                for u in users:
-                    w.writerow([u.id,u.name,u.rfid_code,u.apartment,u.condo,u.plate_ending,u.vehicle_type,u.last_energy,u.last_cost,u.last_time_minutes])
+        path, count = self.exporter.export_users(
+            self.user_service.iter_users(), echo=print if self.echo_rows else None
+        )
+        self._note_size(count)
+        if path:
             print(f"Exportado para {path}")
         else:
             print("Sem usuários cadastrados.")
 
     def _list_condos_export(self) -> None:
-        condos = list(self.condo_service.list_condos())
-        for c in condos:
-            print(f"{c.id};{c.name};{c.apartments_count};{c.chargers_count};{c.charger_type};{c.state};{c.energy_price}")
-        if condos:
-            path = Path(self.export_dir) / "condos.csv"
-            with path.open("w", encoding="utf-8", newline="") as f:
-                w = csv.writer(f, delimiter=';')
-                w.writerow(["ID","Nome","Apts","QtdeCarreg","Tipo","UF","PrecoKWh"])
-                for c in condos:
-                    w.writerow([c.id,c.name,c.apartments_count,c.chargers_count,c.charger_type,c.state,c.energy_price])
+        path, count = self.exporter.export_condos(
+            self.condo_service.iter_condos(), echo=print if self.echo_rows else None
+        )
+        self._note_size(count)
+        if path:
             print(f"Exportado para {path}")
         else:
             print("Sem condomínios cadastrados.")
@@ -0,0 +1,185 @@
+"""Replay de operações do menu interativo, para teste de carga do caminho real.
+
+O roteiro tem uma operação por linha: uma lista JSON com a opção do menu
+seguida das respostas aos prompts, na ordem em que o handler as pede::
+
+    ["4", "name", "Ana Silva 12"]
+    ["8", "12", "set", "10.5", "7.2", "45"]
+
+Linhas vazias e iniciadas por ``#`` são ignoradas. Com ``EVCHARGE_RECORD=arquivo``
+o menu grava nesse formato o que o operador fez. ``replay`` chama os mesmos
+handlers do ``MenuCLI`` (sem desenhar o menu, com a saída descartada) e mede a
+latência de cada operação.
+"""
+from __future__ import annotations
+import io
+import json
+import logging
+import time
+from contextlib import redirect_stdout
+from typing import IO, Any, Dict, Iterable, List, Optional, Tuple
+from .menu import OPERATIONS, MenuCLI
+
+logger = logging.getLogger(__name__)
+
+Operation = Tuple[int, str, List[str]]  # linha do roteiro, opção, respostas
+
+
+class ScriptError(ValueError):
+    """Roteiro malformado ou fora de sincronia com os prompts dos handlers."""
+
+
+class MenuRecorder:
+    """Grava as operações do menu (opção + respostas) no formato do roteiro."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._f = open(path, "a", encoding="utf-8")
+
+    def record(self, op: str, answers: List[str]) -> None:
+        self._f.write(json.dumps([op, *answers], ensure_ascii=False) + "\n")
+        self._f.flush()
+
+    def close(self) -> None:
+        self._f.close()
+
+
+def parse_script(lines: Iterable[str]) -> List[Operation]:
+    operations: List[Operation] = []
+    for line_no, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        try:
+            item = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ScriptError(f"Linha {line_no}: JSON inválido ({e.msg}).") from None
+        if not isinstance(item, list) or not item or not all(isinstance(v, str) for v in item):
+            raise ScriptError(f"Linha {line_no}: esperado uma lista de textos [opção, respostas...].")
+        if item[0] != "0":  # sair do menu não é uma operação
+            operations.append((line_no, item[0], item[1:]))
+    return operations
+
+
+class _Feed:
+    def __init__(self, line_no: int, answers: List[str]) -> None:
+        self.line_no = line_no
+        self.answers = answers
+        self.used = 0
+
+    def __call__(self, prompt: str) -> str:
+        if self.used >= len(self.answers):
+            raise ScriptError(f"Linha {self.line_no}: faltou resposta para {prompt.strip()!r}.")
+        answer = self.answers[self.used]
+        self.used += 1
+        return answer
+
+
+class _Discard(io.TextIOBase):
+    def write(self, s: str) -> int:
+        return len(s)
+
+
+class ReplayReport:
+    """Latências (ns) e erros por operação."""
+
+    def __init__(self) -> None:
+        self.samples: Dict[str, List[int]] = {}
+        self.errors: Dict[str, int] = {}
+        self.first_error: Dict[str, str] = {}
+        self.elapsed = 0.0
+
+    def add(self, operation: str, elapsed_ns: int, error: Optional[BaseException]) -> None:
+        self.samples.setdefault(operation, []).append(elapsed_ns)
+        if error is not None:
+            self.errors[operation] = self.errors.get(operation, 0) + 1
+            self.first_error.setdefault(operation, str(error))
+
+    @property
+    def operations(self) -> int:
+        return sum(len(s) for s in self.samples.values())
+
+    @property
+    def error_count(self) -> int:
+        return sum(self.errors.values())
+
+    def rows(self) -> List[Dict[str, Any]]:
+        rows = []
+        for operation, samples in sorted(self.samples.items()):
+            samples = sorted(samples)
+            n = len(samples)
+            rows.append({
+                "operation": operation,
+                "count": n,
+                "errors": self.errors.get(operation, 0),
+                "total_ms": round(sum(samples) / 1e6, 3),
+                "p50_ms": round(samples[n // 2] / 1e6, 3),
+                "p95_ms": round(samples[min(n - 1, int(n * 0.95))] / 1e6, 3),
+                "p99_ms": round(samples[min(n - 1, int(n * 0.99))] / 1e6, 3),
+                "max_ms": round(samples[-1] / 1e6, 3),
+            })
+        return rows
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "operations": self.operations,
+            "errors": self.error_count,
+            "elapsed_s": round(self.elapsed, 4),
+            "ops_per_s": round(self.operations / self.elapsed, 1) if self.elapsed else 0.0,
+            "by_operation": self.rows(),
+            "first_errors": self.first_error,
+        }
+
+    def render(self) -> str:
+        d = self.to_dict()
+        lines = [
+            f"{d['operations']} operação(ões) em {d['elapsed_s']:.3f} s ({d['ops_per_s']:.1f} op/s), {d['errors']} erro(s)",
+            f"{'Operação':<24}{'Qtde':>8}{'Erros':>7}{'Total ms':>12}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'Máx ms':>10}",
+        ]
+        for r in d["by_operation"]:
+            lines.append(
+                f"{r['operation']:<24}{r['count']:>8}{r['errors']:>7}{r['total_ms']:>12.3f}"
+                f"{r['p50_ms']:>10.3f}{r['p95_ms']:>10.3f}{r['p99_ms']:>10.3f}{r['max_ms']:>10.3f}"
+            )
+        for operation, message in sorted(self.first_error.items()):
+            lines.append(f"Primeiro erro em {operation}: {message}")
+        return "\n".join(lines)
+
+
+def replay(
+    menu: MenuCLI,
+    operations: List[Operation],
+    repeat: int = 1,
+    output: Optional[IO[str]] = None,
+) -> ReplayReport:
+    """Executa o roteiro ``repeat`` vezes pelos handlers do ``menu``.
+
+    A saída dos handlers vai para ``output`` (padrão: descartada). Exceções são
+    contadas como erro da operação, como o laço interativo faria; sobrar ou
+    faltar resposta também conta como erro (roteiro fora de sincronia).
+    """
+    report = ReplayReport()
+    clock = time.perf_counter_ns
+    start = time.perf_counter()
+    try:
+        with redirect_stdout(output or _Discard()):
+            for _ in range(repeat):
+                for line_no, op, answers in operations:
+                    feed = _Feed(line_no, answers)
+                    menu.answer_source = feed
+                    error: Optional[BaseException] = None
+                    t0 = clock()
+                    try:
+                        menu.perform(op)
+                    except Exception as e:
+                        error = e
+                    elapsed = clock() - t0
+                    if error is None and feed.used < len(answers):
+                        error = ScriptError(f"Linha {line_no}: {len(answers) - feed.used} resposta(s) não usada(s).")
+                    if error is not None:
+                        logger.debug("Replay: linha %d falhou: %s", line_no, error)
+                    report.add(OPERATIONS.get(op, op), elapsed, error)
+    finally:
+        menu.answer_source = None
+        report.elapsed = time.perf_counter() - start
+    return report
@@ -8,10 +8,21 @@ from pathlib import Path
 from typing import Any, Dict, Optional
 
 
-try:
-    import yaml # type: ignore
-except Exception:
-    yaml = None # leitura YAML opcional; se ausente, usa JSON/env
+def _yaml():
+    """PyYAML é opcional e caro de importar: só é carregado ao ler um arquivo YAML."""
+    try:
+        import yaml  # type: ignore
+    except Exception:
+        return None  # leitura YAML opcional; se ausente, usa JSON/env
+    return yaml
+
+
+
+
+def _as_bool(value: Any) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes", "sim", "on")
+    return bool(value)
 
 
 
@@ -21,12 +32,49 @@ class AppConfig:
 
 
     def __init__(self, data: Dict[str, Any]) -> None:
-        self.database_path: str = data.get("database", {}).get("path", os.getenv("DB_PATH", "evcharge.db"))
+        db_cfg = data.get("database", {})
+        self.database_path: str = db_cfg.get("path", os.getenv("DB_PATH", "evcharge.db"))
+        self.db_backend: str = db_cfg.get("backend", os.getenv("DB_BACKEND", "sqlite"))
+        self.db_snapshot_path: Optional[str] = db_cfg.get("snapshot_path", os.getenv("DB_SNAPSHOT_PATH")) or None
+        self.db_pool_size: int = int(db_cfg.get("pool_size", os.getenv("DB_POOL_SIZE", 5)))
+        self.db_busy_timeout_ms: int = int(db_cfg.get("busy_timeout_ms", os.getenv("DB_BUSY_TIMEOUT_MS", 5000)))
+        self.db_journal_mode: str = db_cfg.get("journal_mode", os.getenv("DB_JOURNAL_MODE", "WAL"))
+        slow = db_cfg.get("slow_query_ms", os.getenv("DB_SLOW_QUERY_MS"))
+        self.db_slow_query_ms: Optional[float] = float(slow) if slow not in (None, "") else None
+        self.db_explain_slow: bool = _as_bool(db_cfg.get("explain_slow", os.getenv("DB_EXPLAIN_SLOW", True)))
         logging_cfg = data.get("logging", {})
         self.log_level: str = logging_cfg.get("level", os.getenv("LOG_LEVEL", "INFO"))
         self.log_file: Optional[str] = logging_cfg.get("file", os.getenv("LOG_FILE", "evcharge.log"))
+        import_cfg = data.get("import", {})
+        self.import_batch_size: int = int(import_cfg.get("batch_size", os.getenv("IMPORT_BATCH_SIZE", 1000)))
+        self.import_commit_every: int = int(import_cfg.get("commit_every", os.getenv("IMPORT_COMMIT_EVERY", 0)))
+        self.import_chunk_size: int = int(import_cfg.get("chunk_size", os.getenv("IMPORT_CHUNK_SIZE", 50_000)))
+        measures_cfg = data.get("measurements", {})
+        self.write_behind: bool = _as_bool(measures_cfg.get("write_behind", os.getenv("WRITE_BEHIND", False)))
+        self.write_behind_max_batch: int = int(measures_cfg.get("max_batch", os.getenv("WRITE_BEHIND_MAX_BATCH", 500)))
+        self.write_behind_flush_ms: int = int(measures_cfg.get("flush_interval_ms", os.getenv("WRITE_BEHIND_FLUSH_MS", 500)))
+        self.write_behind_coalesce: bool = _as_bool(measures_cfg.get("coalesce", os.getenv("WRITE_BEHIND_COALESCE", False)))
+        condo_cache_cfg = data.get("cache", {}).get("condos", {})
+        self.condo_cache: bool = _as_bool(condo_cache_cfg.get("enabled", os.getenv("CONDO_CACHE", True)))
+        self.condo_cache_size: int = int(condo_cache_cfg.get("max_size", os.getenv("CONDO_CACHE_SIZE", 1024)))
+        ttl = condo_cache_cfg.get("ttl_seconds", os.getenv("CONDO_CACHE_TTL"))
+        self.condo_cache_ttl: Optional[float] = float(ttl) if ttl not in (None, "") else None
+        rfid_cfg = data.get("rfid", {})
+        self.rfid_snapshot_path: str = rfid_cfg.get("snapshot_path", os.getenv("RFID_SNAPSHOT_PATH", "rfid.snap"))
+        metrics_cfg = data.get("metrics", {})
+        self.metrics: bool = _as_bool(metrics_cfg.get("enabled", os.getenv("METRICS", False)))
+        self.metrics_file: Optional[str] = metrics_cfg.get("file", os.getenv("METRICS_FILE")) or None
+        self.metrics_dump_interval: float = float(metrics_cfg.get("dump_interval_s", os.getenv("METRICS_DUMP_INTERVAL", 15)))
+        server_cfg = data.get("server", {})
+        self.server_host: str = server_cfg.get("host", os.getenv("SERVER_HOST", "127.0.0.1"))
+        self.server_port: int = int(server_cfg.get("port", os.getenv("SERVER_PORT", 8765)))
+        self.server_workers: int = int(server_cfg.get("workers", os.getenv("SERVER_WORKERS", 8)))
+        self.server_max_pipeline: int = int(server_cfg.get("max_pipeline", os.getenv("SERVER_MAX_PIPELINE", 64)))
+        self.ocpp_port: int = int(server_cfg.get("ocpp_port", os.getenv("OCPP_PORT", 9000)))
+        self.http_port: int = int(server_cfg.get("http_port", os.getenv("HTTP_PORT", 8080)))
         cli_cfg = data.get("cli", {})
         self.export_path: str = cli_cfg.get("export_path", os.getenv("EXPORT_PATH", "exports"))
+        self.echo_rows: bool = _as_bool(cli_cfg.get("echo_rows", os.getenv("EXPORT_ECHO_ROWS", True)))
 
 
     @staticmethod
@@ -34,9 +82,11 @@ class AppConfig:
         path = Path(config_file)
         data: Dict[str, Any] = {}
         if path.exists():
-            if path.suffix.lower() in (".yaml", ".yml") and yaml:
+            suffix = path.suffix.lower()
+            yaml = _yaml() if suffix != ".json" else None
+            if suffix in (".yaml", ".yml") and yaml:
                 data = yaml.safe_load(path.read_text(encoding="utf-8")) or {}
-            elif path.suffix.lower() == ".json":
+            elif suffix == ".json":
                 data = json.loads(path.read_text(encoding="utf-8"))
             else:
                 # tenta YAML, se falhar, tenta JSON
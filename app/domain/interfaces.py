@@ -1,7 +1,7 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
-from typing import Iterable, Optional
-from .models import User, Condo
+from typing import Iterable, Iterator, List, Optional, Tuple
+from .models import User, Condo, ChargingSession, Page, RfidEntry
 
 
 
@@ -9,10 +9,14 @@ from .models import User, Condo
 class IDatabase(ABC):
     @abstractmethod
     def connect(self):
-        """Retorna uma conexão (sqlite3.Connection compatível)."""
+        """Context manager que empresta uma conexão (sqlite3.Connection compatível)."""
         raise NotImplementedError
 
 
+    def close(self) -> None:
+        """Libera os recursos do banco (conexões abertas)."""
+
+
 
 
 class IUserRepository(ABC):
@@ -20,6 +24,13 @@ class IUserRepository(ABC):
     def create(self, user: User) -> int: ...
 
 
+    @abstractmethod
+    def create_many(
+        self, users: Iterable[User], batch_size: int = 1000, commit_every: int = 0
+    ) -> Tuple[int, List[Tuple[int, str]]]:
+        """Insere vários usuários; retorna (criados, [(índice, erro)])."""
+
+
     @abstractmethod
     def get_by_id(self, user_id: int) -> Optional[User]: ...
 
@@ -28,10 +39,25 @@ class IUserRepository(ABC):
     def get_by_name(self, name: str) -> Optional[User]: ...
 
 
+    @abstractmethod
+    def get_by_rfid(self, rfid_code: str) -> Optional[User]:
+        """Usuário dono do RFID (já normalizado em minúsculas)."""
+
+
     @abstractmethod
     def list_all(self) -> Iterable[User]: ...
 
 
+    @abstractmethod
+    def iter_all(self, chunk_size: int = 1000) -> Iterator[User]:
+        """Percorre todos os usuários por id, em blocos, sem materializar a tabela."""
+
+
+    @abstractmethod
+    def list_page(self, after_id: Optional[int] = None, limit: int = 100) -> Page[User]:
+        """Até ``limit`` usuários com id > ``after_id``, em ordem de id."""
+
+
     @abstractmethod
     def update(self, user: User) -> None: ...
 
@@ -40,10 +66,37 @@ class IUserRepository(ABC):
     def delete(self, user_id: int) -> None: ...
 
 
+    def iter_rfid_entries(self, chunk_size: int = 10_000) -> Iterator[Tuple[str, RfidEntry]]:
+        """(rfid, RfidEntry) de todos os usuários; bancos podem otimizar a leitura."""
+        for u in self.iter_all(chunk_size):
+            yield u.rfid_code, RfidEntry(u.id, u.condo_id, u.vehicle_type)  # type: ignore[arg-type]
+
+
     @abstractmethod
     def count_by_condo(self, condo_name: str) -> int: ...
 
 
+    @abstractmethod
+    def count_by_condo_id(self, condo_id: int) -> int: ...
+
+
+
+
+class IUserListener(ABC):
+    """Recebe avisos do ``UserService`` após cada escrita bem-sucedida."""
+
+    def user_saved(self, user: User) -> None:
+        """Usuário criado ou atualizado (``user.id`` preenchido)."""
+
+
+    def user_deleted(self, user_id: int) -> None:
+        """Usuário removido."""
+
+
+    def users_imported(self) -> None:
+        """Importação em lote concluída (os ids criados não são conhecidos)."""
+
+
 
 
 class ICondoRepository(ABC):
@@ -51,6 +104,13 @@ class ICondoRepository(ABC):
     def create(self, condo: Condo) -> int: ...
 
 
+    @abstractmethod
+    def create_many(
+        self, condos: Iterable[Condo], batch_size: int = 1000, commit_every: int = 0
+    ) -> Tuple[int, List[Tuple[int, str]]]:
+        """Insere vários condomínios; retorna (criados, [(índice, erro)])."""
+
+
     @abstractmethod
     def get_by_id(self, condo_id: int) -> Optional[Condo]: ...
 
@@ -63,9 +123,50 @@ class ICondoRepository(ABC):
     def list_all(self) -> Iterable[Condo]: ...
 
 
+    @abstractmethod
+    def iter_all(self, chunk_size: int = 1000) -> Iterator[Condo]:
+        """Percorre todos os condomínios por id, em blocos, sem materializar a tabela."""
+
+
+    @abstractmethod
+    def list_page(self, after_id: Optional[int] = None, limit: int = 100) -> Page[Condo]:
+        """Até ``limit`` condomínios com id > ``after_id``, em ordem de id."""
+
+
     @abstractmethod
     def update(self, condo: Condo) -> None: ...
 
 
     @abstractmethod
-    def delete(self, condo_id: int) -> None: ...
\ No newline at end of file
+    def delete(self, condo_id: int) -> None: ...
+
+
+
+
+class IChargingSessionRepository(ABC):
+    """Histórico de recargas (somente apêndice).
+
+    Gravar uma sessão também atualiza ``last_*`` do usuário quando ela é a
+    mais recente, mantendo a leitura da última medida O(1). Só sessões com o
+    mesmo ``transaction_id`` (não nulo) do mesmo usuário são tratadas como
+    reenvio e ignoradas.
+    """
+
+    @abstractmethod
+    def append(self, session: ChargingSession) -> None: ...
+
+
+    @abstractmethod
+    def append_many(self, sessions: Iterable[ChargingSession]) -> Tuple[int, List[Tuple[int, str]]]:
+        """Grava várias sessões; retorna (gravadas, [(índice, erro)]). Reenvios
+        ignorados não contam como gravados nem como erro."""
+
+
+    @abstractmethod
+    def list_by_user(self, user_id: int, limit: Optional[int] = None) -> List[ChargingSession]:
+        """Sessões do usuário, da mais recente para a mais antiga."""
+
+
+    def pending_last(self, user_id: int) -> Optional[ChargingSession]:
+        """Sessão mais recente ainda não persistida (implementações com buffer)."""
+        return None
@@ -1,11 +1,19 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Optional
+from typing import Generic, List, NamedTuple, Optional, TypeVar
 
+T = TypeVar("T")
 
 
 
-@dataclass
+
+# slots=True: sem ``__dict__`` por instância (menos memória e atributos mais
+# rápidos em listagens grandes). Os repositórios SQLite montam os dois modelos
+# por posição; a ordem dos campos é a mesma das colunas selecionadas.
+# Não são congelados (frozen=True): os serviços alteram o objeto lido e o
+# devolvem ao ``update`` (ex.: ``last_*`` em set_last_measure, edição de
+# cadastro no menu). Leituras que precisam de imutabilidade usam ``RfidEntry``.
+@dataclass(slots=True)
 class User:
     id: Optional[int]
     name: str
@@ -17,11 +25,12 @@ class User:
     last_cost: Optional[float] = None
     last_energy: Optional[float] = None
     last_time_minutes: Optional[float] = None
+    condo_id: Optional[int] = None # FK para condos.id; ``condo`` guarda o nome para exibição
 
 
 
 
-@dataclass
+@dataclass(slots=True)
 class Condo:
     id: Optional[int]
     name: str
@@ -29,4 +38,41 @@ class Condo:
     chargers_count: int
     charger_type: str # Lento | Rápido
     state: str
-    energy_price: float
\ No newline at end of file
+    energy_price: float
+
+
+
+
+@dataclass
+class ChargingSession:
+    user_id: int
+    started_at: int # epoch em milissegundos
+    ended_at: int # epoch em milissegundos
+    energy_kwh: float
+    cost: float
+    duration_minutes: float
+    condo_id: Optional[int] = None # resolvido a partir do usuário se ausente
+    transaction_id: Optional[str] = None # chave de idempotência (ex.: transação OCPP); sem ela, nunca deduplica
+
+
+
+
+
+class RfidEntry(NamedTuple):
+    """O que o carregador precisa saber para liberar uma recarga.
+
+    NamedTuple (e não dataclass congelada): imutável e ~2,5x mais barato de
+    criar, o que pesa ao indexar milhões de tags."""
+    user_id: int
+    condo_id: Optional[int]
+    vehicle_type: str
+
+
+
+
+@dataclass
+class Page(Generic[T]):
+    """Página de uma listagem por chave (keyset): use ``next_after_id`` como
+    ``after_id`` da próxima chamada; ``None`` indica a última página."""
+    items: List[T]
+    next_after_id: Optional[int] = None
@@ -0,0 +1,125 @@
+from __future__ import annotations
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import replace
+from typing import Dict, Hashable, Iterable, Iterator, List, Optional, Tuple
+from ..domain.interfaces import ICondoRepository
+from ..domain.models import Condo, Page
+
+
+class CachedCondoRepository(ICondoRepository):
+    """Cache read-through (LRU, TTL opcional) na frente de um ``ICondoRepository``.
+
+    ``get_by_id``/``get_by_name`` são servidos da memória, inclusive ausências
+    (cache negativo). Escritas feitas por este objeto invalidam as entradas
+    afetadas; alterações feitas por outros processos só são vistas após o TTL.
+    """
+
+    def __init__(self, inner: ICondoRepository, max_size: int = 1024, ttl_seconds: Optional[float] = None) -> None:
+        if max_size < 1:
+            raise ValueError("max_size deve ser >= 1.")
+        self.inner = inner
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, Tuple[float, Optional[Condo]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._negative_hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+        self._generation = 0  # muda a cada invalidação; evita gravar leitura obsoleta
+
+    # --- leituras -------------------------------------------------------
+    def get_by_id(self, condo_id: int) -> Optional[Condo]:
+        return self._get(("id", condo_id), lambda: self.inner.get_by_id(condo_id))
+
+    def get_by_name(self, name: str) -> Optional[Condo]:
+        return self._get(("name", name), lambda: self.inner.get_by_name(name))
+
+    def list_all(self) -> Iterable[Condo]:
+        return self.inner.list_all()
+
+    def iter_all(self, chunk_size: int = 1000) -> Iterator[Condo]:
+        return self.inner.iter_all(chunk_size)
+
+    def list_page(self, after_id: Optional[int] = None, limit: int = 100) -> Page[Condo]:
+        return self.inner.list_page(after_id, limit)
+
+    # --- escritas (invalidam) --------------------------------------------
+    def create(self, condo: Condo) -> int:
+        try:
+            return self.inner.create(condo)
+        finally:
+            self._invalidate(("name", condo.name))
+
+    def create_many(
+        self, condos: Iterable[Condo], batch_size: int = 1000, commit_every: int = 0
+    ) -> Tuple[int, List[Tuple[int, str]]]:
+        try:
+            return self.inner.create_many(condos, batch_size, commit_every)
+        finally:
+            self.clear()
+
+    def update(self, condo: Condo) -> None:
+        # o nome antigo não é conhecido aqui; atualizações são raras, então limpa tudo
+        try:
+            self.inner.update(condo)
+        finally:
+            self.clear()
+
+    def delete(self, condo_id: int) -> None:
+        try:
+            self.inner.delete(condo_id)
+        finally:
+            self.clear()
+
+    # --- gestão ---------------------------------------------------------
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._invalidations += len(self._entries)
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "hits": self._hits,
+                "negative_hits": self._negative_hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "invalidations": self._invalidations,
+            }
+
+    def _get(self, key: Hashable, load) -> Optional[Condo]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (entry[0] == 0.0 or entry[0] > now):
+                self._entries.move_to_end(key)
+                if entry[1] is None:
+                    self._negative_hits += 1
+                    return None
+                self._hits += 1
+                return replace(entry[1])
+            self._misses += 1
+            generation = self._generation
+        condo = load()
+        expires = now + self.ttl_seconds if self.ttl_seconds else 0.0
+        with self._lock:
+            if generation == self._generation:
+                self._entries[key] = (expires, condo)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+                    self._evictions += 1
+        # cópia: quem chama pode alterar o objeto antes de um update
+        return replace(condo) if condo is not None else None
+
+    def _invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._generation += 1
+            if self._entries.pop(key, None) is not None:
+                self._invalidations += 1
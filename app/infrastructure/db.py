@@ -1,35 +1,182 @@
 from __future__ import annotations
+import queue
 import sqlite3
+import threading
+from contextlib import contextmanager
 from pathlib import Path
 import logging
-from typing import Optional
+from typing import TYPE_CHECKING, Dict, Iterator, Optional
 from ..domain.interfaces import IDatabase
-from ..schema_sql import SCHEMA_SQL # type: ignore
+from .migrations import MigrationRunner
+
+if TYPE_CHECKING:
+    from .sqltrace import QueryTracer
 
 
 logger = logging.getLogger(__name__)
 
+JOURNAL_MODES = {"WAL", "DELETE", "TRUNCATE", "PERSIST", "MEMORY", "OFF"}
+
 
 
 
 class SQLiteDatabase(IDatabase):
-    def __init__(self, db_path: str) -> None:
+    """Banco SQLite com pool de conexões de longa duração.
+
+    Cada ``connect()`` empresta uma conexão do pool (criando-a sob demanda até
+    ``pool_size``) e a devolve ao sair do bloco ``with``: commit em caso de
+    sucesso, rollback em caso de exceção.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        pool_size: int = 5,
+        busy_timeout_ms: int = 5000,
+        journal_mode: str = "WAL",
+        acquire_timeout: float = 30.0,
+        slow_query_ms: Optional[float] = None,
+        explain_slow: bool = True,
+    ) -> None:
+        if pool_size < 1:
+            raise ValueError("pool_size deve ser >= 1.")
+        if journal_mode and journal_mode.upper() not in JOURNAL_MODES:
+            raise ValueError(f"journal_mode inválido: {journal_mode}")
         self.db_path = db_path
+        self.pool_size = pool_size
+        self.busy_timeout_ms = busy_timeout_ms
+        self.journal_mode = journal_mode
+        self.acquire_timeout = acquire_timeout
+        # slow_query_ms=None: conexões sqlite3 comuns, sem nenhum custo de rastreio
+        self.tracer: Optional["QueryTracer"] = None
+        if slow_query_ms is not None:
+            from .sqltrace import QueryTracer
+            self.tracer = QueryTracer(slow_query_ms, explain=explain_slow)
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue(maxsize=pool_size)
+        self._lock = threading.Lock()
+        self._closed = False
+        self._created = 0
+        self._in_use = 0
+        self._acquired = 0
+        self._waits = 0
         Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
         self._ensure_schema()
 
 
-    def connect(self) -> sqlite3.Connection:
-        conn = sqlite3.connect(self.db_path)
+    @contextmanager
+    def connect(self) -> Iterator[sqlite3.Connection]:
+        conn = self._acquire()
+        try:
+            yield conn
+            if conn.in_transaction:
+                conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            if self.tracer is not None:
+                conn.finish_traces()  # type: ignore[attr-defined]
+            self._release(conn)
+
+
+    def close(self) -> None:
+        """Fecha todas as conexões ociosas; as emprestadas fecham ao serem devolvidas."""
+        with self._lock:
+            self._closed = True
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self._lock:
+                self._created -= 1
+        logger.debug("Pool de conexões fechado.")
+
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "pool_size": self.pool_size,
+                "created": self._created,
+                "in_use": self._in_use,
+                "idle": self._idle.qsize(),
+                "acquired": self._acquired,
+                "waits": self._waits,
+            }
+
+
+    def _acquire(self) -> sqlite3.Connection:
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Banco de dados já foi fechado.")
+            self._acquired += 1
+            create = self._idle.empty() and self._created < self.pool_size
+            if create:
+                self._created += 1
+            elif self._idle.empty():
+                self._waits += 1
+        if create:
+            try:
+                conn = self._open()
+            except BaseException:
+                with self._lock:
+                    self._created -= 1
+                raise
+        else:
+            try:
+                conn = self._idle.get(timeout=self.acquire_timeout)
+            except queue.Empty:
+                raise TimeoutError("Nenhuma conexão disponível no pool.") from None
+        with self._lock:
+            self._in_use += 1
+        return conn
+
+
+    def _release(self, conn: sqlite3.Connection) -> None:
+        with self._lock:
+            self._in_use -= 1
+            closed = self._closed
+            if closed:
+                self._created -= 1
+        if closed:
+            conn.close()
+        else:
+            self._idle.put_nowait(conn)
+
+
+    def _open(self) -> sqlite3.Connection:
+        if self.tracer is not None:
+            from .sqltrace import TracingConnection
+            conn = sqlite3.connect(self.db_path, check_same_thread=False, factory=TracingConnection)
+            conn.tracer = self.tracer
+        else:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
         conn.row_factory = sqlite3.Row
+        conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)}")
+        conn.execute("PRAGMA foreign_keys = ON")
+        if self.journal_mode:
+            conn.execute(f"PRAGMA journal_mode = {self.journal_mode}")
+        logger.debug("Nova conexão SQLite aberta (%s/%s).", self._created, self.pool_size)
         return conn
 
 
     def _ensure_schema(self) -> None:
-        conn = sqlite3.connect(self.db_path)
-        try:
-            conn.executescript(SCHEMA_SQL)
-            conn.commit()
-            logger.debug("Esquema do banco verificado/criado.")
-        finally:
-            conn.close()
\ No newline at end of file
+        runner = MigrationRunner(self.db_path)
+        # caminho rápido: banco já atualizado custa só um PRAGMA, numa conexão
+        # que já fica no pool para o primeiro uso
+        conn = self._open()
+        version = int(conn.execute("PRAGMA user_version").fetchone()[0])
+        if self.tracer is not None:
+            conn.finish_traces()  # type: ignore[attr-defined]
+        with self._lock:
+            self._created += 1
+        self._idle.put_nowait(conn)
+        if version >= runner.latest_version:
+            logger.debug("Esquema do banco já está atualizado.")
+            return
+        applied = runner.migrate()
+        if applied:
+            logger.debug("Esquema do banco migrado: versões %s.", applied)
+        else:
+            logger.debug("Esquema do banco já está atualizado.")
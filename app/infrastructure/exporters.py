@@ -0,0 +1,75 @@
+from __future__ import annotations
+import csv
+import os
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from ..domain.models import User, Condo
+
+USER_HEADER = ["ID", "Nome", "RFID", "Apartamento", "Condomínio", "FinalPlaca", "Tipo", "UltEnergia", "UltCusto", "UltTempoMin"]
+CONDO_HEADER = ["ID", "Nome", "Apts", "QtdeCarreg", "Tipo", "UF", "PrecoKWh"]
+USAGE_HEADER = ["Usuarios", "ComMedida", "EnergiaKWh", "CustoTotal", "TempoMin"]
+
+
+def user_row(u: User) -> List[Any]:
+    return [u.id, u.name, u.rfid_code, u.apartment, u.condo, u.plate_ending, u.vehicle_type, u.last_energy, u.last_cost, u.last_time_minutes]
+
+
+def condo_row(c: Condo) -> List[Any]:
+    return [c.id, c.name, c.apartments_count, c.chargers_count, c.charger_type, c.state, c.energy_price]
+
+
+class CsvExporter:
+    """Exporta registros para CSV em streaming (memória constante).
+
+    O arquivo é escrito num temporário e renomeado ao final; se não houver
+    registros, nenhum arquivo é criado.
+    """
+
+    def __init__(self, export_dir: str, delimiter: str = ";") -> None:
+        self.export_dir = Path(export_dir)
+        self.delimiter = delimiter
+
+    def export_users(self, users: Iterable[User], echo: Optional[Callable[[str], None]] = None) -> Tuple[Optional[Path], int]:
+        return self._export("users.csv", USER_HEADER, (user_row(u) for u in users), echo)
+
+    def export_condos(self, condos: Iterable[Condo], echo: Optional[Callable[[str], None]] = None) -> Tuple[Optional[Path], int]:
+        return self._export("condos.csv", CONDO_HEADER, (condo_row(c) for c in condos), echo)
+
+    def export_usage(
+        self, by: str, totals: Dict[str, Dict[str, float]], echo: Optional[Callable[[str], None]] = None
+    ) -> Tuple[Optional[Path], int]:
+        """Totais de ``UserTable.group_sum`` (um grupo por linha) em ``usage_by_<by>.csv``."""
+        rows = (
+            [key, t["users"], t["measured"], round(t["last_energy"], 3), round(t["last_cost"], 2), round(t["last_time_minutes"], 1)]
+            for key, t in sorted(totals.items())
+        )
+        return self._export(f"usage_by_{by}.csv", [by] + USAGE_HEADER, rows, echo)
+
+    def _export(
+        self,
+        filename: str,
+        header: Sequence[str],
+        rows: Iterable[List[Any]],
+        echo: Optional[Callable[[str], None]],
+    ) -> Tuple[Optional[Path], int]:
+        self.export_dir.mkdir(parents=True, exist_ok=True)
+        path = self.export_dir / filename
+        tmp = path.with_name(path.name + ".tmp")
+        count = 0
+        try:
+            with tmp.open("w", encoding="utf-8", newline="") as f:
+                w = csv.writer(f, delimiter=self.delimiter)
+                w.writerow(header)
+                for row in rows:
+                    if echo is not None:
+                        echo(self.delimiter.join(str(v) for v in row))
+                    w.writerow(row)
+                    count += 1
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+        if not count:
+            tmp.unlink()
+            return None, 0
+        os.replace(tmp, path)
+        return path, count
@@ -1,8 +1,72 @@
 from __future__ import annotations
+import importlib
+import io
+import sys
+from contextlib import contextmanager
 from pathlib import Path
-from typing import List, Dict
+from typing import Dict, Iterator, List, Optional, TextIO, Tuple
 from ..domain.models import Condo
 
+STDIN_PATH = "-"
+
+# módulos de compressão só são importados quando um arquivo compactado aparece
+_COMPRESSION_MODULES = {
+    ".gz": "gzip",
+    ".bz2": "bz2",
+    ".xz": "lzma",
+}
+
+
+@contextmanager
+def open_text(path: str, encoding: str = "utf-8") -> Iterator[TextIO]:
+    """Abre ``path`` em modo texto. ``-`` lê da entrada padrão e as extensões
+    .gz, .bz2 e .xz são descompactadas em streaming."""
+    if path == STDIN_PATH:
+        stream = io.TextIOWrapper(sys.stdin.buffer, encoding=encoding)
+        try:
+            yield stream
+        finally:
+            stream.detach()
+        return
+    module = _COMPRESSION_MODULES.get(Path(path).suffix.lower())
+    if module:
+        with importlib.import_module(module).open(path, "rt", encoding=encoding) as f:
+            yield f
+    else:
+        with open(path, "r", encoding=encoding) as f:
+            yield f
+
+
+# (número da linha, motivo) das linhas mal formadas, quando o chamador prefere
+# seguir lendo em vez de abortar no meio do arquivo
+Rejected = List[Tuple[int, str]]
+
+
+def _reject(rejected: Optional[Rejected], idx: int, line: str, reason: str) -> None:
+    if rejected is None:
+        raise ValueError(f"Linha {idx} inválida: '{line}'. {reason}")
+    rejected.append((idx, f"Linha inválida. {reason}"))
+
+
+def _iter_fields(
+    path: str, encoding: str, hint: str, rejected: Optional[Rejected] = None
+) -> Iterator[Tuple[int, str, List[str]]]:
+    with open_text(path, encoding) as f:
+        for idx, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            parts = [x.strip() for x in line.split(";")]
+            if len(parts) != 6:
+                _reject(rejected, idx, line, f"Esperado 6 campos: {hint}")
+                continue
+            yield idx, line, parts
+
+
+def _check_exists(path: str) -> None:
+    if path != STDIN_PATH and not Path(path).exists():
+        raise FileNotFoundError(f"Arquivo não encontrado: {path}")
+
 
 class CondoFileLoader:
     """Lê condomínios de um arquivo .txt no formato:
@@ -13,23 +77,20 @@ class CondoFileLoader:
     """
 
     @staticmethod
-    def load_from_txt(path: str, encoding: str = "utf-8") -> List[Condo]:
-        p = Path(path)
-        if not p.exists():
-            raise FileNotFoundError(f"Arquivo não encontrado: {path}")
-        condos: List[Condo] = []
-        for idx, line in enumerate(p.read_text(encoding=encoding).splitlines(), start=1):
-            line = line.strip()
-            if not line or line.startswith("#"):
-                continue
-            parts = [x.strip() for x in line.split(";")]
-            if len(parts) != 6:
-                raise ValueError(
-                    f"Linha {idx} inválida: '{line}'. Esperado 6 campos: nome;tipo;qtde;estado;preco;apts"
-                )
+    def iter_txt(
+        path: str, encoding: str = "utf-8", rejected: Optional[Rejected] = None
+    ) -> Iterator[Tuple[int, Condo]]:
+        """Gera (número da linha, Condo) sob demanda, sem carregar o arquivo em memória.
+        Linhas mal formadas levantam ``ValueError``, ou vão para ``rejected`` e são puladas."""
+        _check_exists(path)
+        return CondoFileLoader._parse(path, encoding, rejected)
+
+    @staticmethod
+    def _parse(path: str, encoding: str, rejected: Optional[Rejected]) -> Iterator[Tuple[int, Condo]]:
+        for idx, line, parts in _iter_fields(path, encoding, "nome;tipo;qtde;estado;preco;apts", rejected):
             name, charger_type, chargers_count, state, price, apts = parts
-            condos.append(
-                Condo(
+            try:
+                condo = Condo(
                     id=None,
                     name=name,
                     charger_type=charger_type,
@@ -38,8 +99,14 @@ class CondoFileLoader:
                     energy_price=float(price),
                     apartments_count=int(apts),
                 )
-            )
-        return condos
+            except ValueError as e:
+                _reject(rejected, idx, line, str(e))
+                continue
+            yield idx, condo
+
+    @staticmethod
+    def load_from_txt(path: str, encoding: str = "utf-8") -> List[Condo]:
+        return [c for _, c in CondoFileLoader.iter_txt(path, encoding)]
 
 
 class UserFileLoader:
@@ -52,27 +119,27 @@ class UserFileLoader:
     """
 
     @staticmethod
-    def load_from_txt(path: str, encoding: str = "utf-8") -> List[Dict[str, str]]:
-        p = Path(path)
-        if not p.exists():
-            raise FileNotFoundError(f"Arquivo não encontrado: {path}")
-        users: List[Dict[str, str]] = []
-        for idx, line in enumerate(p.read_text(encoding=encoding).splitlines(), start=1):
-            line = line.strip()
-            if not line or line.startswith("#"):
-                continue
-            parts = [x.strip() for x in line.split(";")]
-            if len(parts) != 6:
-                raise ValueError(
-                    f"Linha {idx} inválida: '{line}'. Esperado 6 campos: nome;ap;condo;placa;tipo;rfid"
-                )
+    def iter_txt(
+        path: str, encoding: str = "utf-8", rejected: Optional[Rejected] = None
+    ) -> Iterator[Tuple[int, Dict[str, str]]]:
+        """Gera (número da linha, registro) sob demanda, sem carregar o arquivo em memória.
+        Linhas mal formadas levantam ``ValueError``, ou vão para ``rejected`` e são puladas."""
+        _check_exists(path)
+        return UserFileLoader._parse(path, encoding, rejected)
+
+    @staticmethod
+    def _parse(path: str, encoding: str, rejected: Optional[Rejected]) -> Iterator[Tuple[int, Dict[str, str]]]:
+        for idx, _, parts in _iter_fields(path, encoding, "nome;ap;condo;placa;tipo;rfid", rejected):
             name, apartment, condo, plate_ending, vehicle_type, rfid = parts
-            users.append({
+            yield idx, {
                 "name": name,
                 "apartment": apartment,
                 "condo": condo,
                 "plate_ending": plate_ending,
                 "vehicle_type": vehicle_type,
                 "rfid_code": rfid,
-            })
-        return users
\ No newline at end of file
+            }
+
+    @staticmethod
+    def load_from_txt(path: str, encoding: str = "utf-8") -> List[Dict[str, str]]:
+        return [r for _, r in UserFileLoader.iter_txt(path, encoding)]
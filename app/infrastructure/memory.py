@@ -0,0 +1,430 @@
+"""Backend em memória com índices, para instâncias efêmeras e testes rápidos.
+
+Diferente dos mocks, segue as restrições do esquema SQLite: ``rfid_code`` e
+``condos.name`` únicos, ``condo_id`` obrigatório e existente (resolvido pelo
+nome como no ``INSERT``), condomínio com moradores não pode ser excluído e
+sessões somem com o usuário. As violações levantam ``sqlite3.IntegrityError``
+com a mesma mensagem do SQLite, então serviços e testes não distinguem os
+backends.
+
+Os três repositórios compartilham um ``MemoryStore`` (um ``RLock`` para tudo)
+com índices por nome, condomínio e RFID. Leituras devolvem cópias: alterar um
+``User`` só tem efeito via ``update``, como no banco. ``save``/``load`` gravam um
+instantâneo JSON (escrita atômica).
+"""
+from __future__ import annotations
+import json
+import logging
+import os
+import sqlite3
+import threading
+from bisect import bisect_left, bisect_right
+from dataclasses import fields, replace
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from ..domain.interfaces import IChargingSessionRepository, ICondoRepository, IDatabase, IUserRepository
+from ..domain.models import ChargingSession, Condo, Page, RfidEntry, User
+from ..utils.repository import create_each, make_page, page_args
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+
+# colunas NOT NULL do esquema (condo_id é tratado à parte)
+USER_REQUIRED = ("name", "apartment", "plate_ending", "vehicle_type", "rfid_code")
+CONDO_REQUIRED = tuple(f.name for f in fields(Condo) if f.name != "id")
+# ``condo`` não é gravado: o nome vem do condomínio, como no JOIN do SQLite
+USER_STORED = tuple(f.name for f in fields(User) if f.name != "condo")
+SESSION_STORED = tuple(f.name for f in fields(ChargingSession))
+
+
+def _integrity(message: str) -> sqlite3.IntegrityError:
+    return sqlite3.IntegrityError(message)
+
+
+def _check_not_null(obj: Any, table: str, names: Tuple[str, ...]) -> None:
+    for name in names:
+        if getattr(obj, name) is None:
+            raise _integrity(f"NOT NULL constraint failed: {table}.{name}")
+
+
+class MemoryStore(IDatabase):
+    """Tabelas e índices compartilhados pelos repositórios em memória."""
+
+    def __init__(self, snapshot_path: Optional[str] = None) -> None:
+        self.snapshot_path = snapshot_path
+        self.lock = threading.RLock()
+        self.condos: Dict[int, Condo] = {}
+        self.users: Dict[int, User] = {}
+        self.sessions: Dict[int, List[ChargingSession]] = {}  # user_id -> sessões em ordem de gravação
+        self.session_txs: Set[Tuple[int, str]] = set()  # (user_id, transaction_id): índice único parcial
+        self.newest_ended_at: Dict[int, int] = {}  # user_id -> maior ended_at gravado (decide last_*)
+        # ids em ordem crescente (AUTOINCREMENT: nunca reutilizados) para páginas por chave
+        self.user_ids: List[int] = []
+        self.condo_ids: List[int] = []
+        self.user_seq = 0
+        self.condo_seq = 0
+        self.condo_by_name: Dict[str, int] = {}
+        self.users_by_name: Dict[str, Set[int]] = {}
+        self.users_by_condo: Dict[int, Set[int]] = {}
+        self.user_by_rfid: Dict[str, int] = {}
+
+    def connect(self):  # type: ignore[override]
+        raise RuntimeError("MemoryStore não fornece conexão SQL.")
+
+    def close(self) -> None:
+        """Grava o instantâneo em ``snapshot_path`` (se configurado)."""
+        if self.snapshot_path:
+            self.save(self.snapshot_path)
+
+    def stats(self) -> Dict[str, float]:
+        with self.lock:
+            return {
+                "users": len(self.users),
+                "condos": len(self.condos),
+                "sessions": sum(len(s) for s in self.sessions.values()),
+            }
+
+    # --- usuários -------------------------------------------------------
+
+    def user_view(self, stored: User) -> User:
+        """Cópia para o chamador, com o nome atual do condomínio."""
+        return replace(stored, condo=self.condos[stored.condo_id].name)  # type: ignore[index]
+
+    def resolve_condo_id(self, user: User) -> int:
+        # mesma regra do INSERT: condo_id tem precedência, senão busca pelo nome
+        cid = user.condo_id if user.condo_id is not None else self.condo_by_name.get(user.condo)
+        if cid is None:
+            raise _integrity("NOT NULL constraint failed: users.condo_id")
+        if cid not in self.condos:
+            raise _integrity("FOREIGN KEY constraint failed")
+        return cid
+
+    def index_user(self, u: User) -> None:
+        self.users_by_name.setdefault(u.name, set()).add(u.id)  # type: ignore[arg-type]
+        self.users_by_condo.setdefault(u.condo_id, set()).add(u.id)  # type: ignore[arg-type]
+        self.user_by_rfid[u.rfid_code] = u.id  # type: ignore[assignment]
+
+    def unindex_user(self, u: User) -> None:
+        _discard(self.users_by_name, u.name, u.id)
+        _discard(self.users_by_condo, u.condo_id, u.id)
+        self.user_by_rfid.pop(u.rfid_code, None)
+
+    # --- instantâneo ----------------------------------------------------
+
+    def save(self, path: str) -> None:
+        with self.lock:
+            data = {
+                "version": SNAPSHOT_VERSION,
+                "seq": {"users": self.user_seq, "condos": self.condo_seq},
+                "condos": [[getattr(c, f.name) for f in fields(Condo)] for c in self.condos.values()],
+                "users": [[getattr(u, name) for name in USER_STORED] for u in self.users.values()],
+                "sessions": [
+                    [getattr(s, name) for name in SESSION_STORED]
+                    for by_user in self.sessions.values() for s in by_user
+                ],
+            }
+        target = Path(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_name(target.name + ".tmp")
+        tmp.write_text(json.dumps(data, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp, target)
+        logger.info("Instantâneo em memória gravado em %s (%s usuários)", path, len(data["users"]))
+
+    @classmethod
+    def load(cls, path: str, snapshot_path: Optional[str] = None) -> "MemoryStore":
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+        if data.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"Versão de instantâneo não suportada: {data.get('version')}")
+        store = cls(snapshot_path)
+        for row in data["condos"]:
+            c = Condo(*row)
+            store.condos[c.id] = c  # type: ignore[index]
+            store.condo_ids.append(c.id)  # type: ignore[arg-type]
+            store.condo_by_name[c.name] = c.id  # type: ignore[assignment]
+        for row in data["users"]:
+            u = User(condo="", **dict(zip(USER_STORED, row)))
+            store.users[u.id] = u  # type: ignore[index]
+            store.user_ids.append(u.id)  # type: ignore[arg-type]
+            store.index_user(u)
+        for row in data["sessions"]:
+            s = ChargingSession(*row)
+            store.sessions.setdefault(s.user_id, []).append(s)
+            if s.transaction_id is not None:
+                store.session_txs.add((s.user_id, s.transaction_id))
+            if s.ended_at >= store.newest_ended_at.get(s.user_id, s.ended_at):
+                store.newest_ended_at[s.user_id] = s.ended_at
+        store.condo_ids.sort()
+        store.user_ids.sort()
+        store.user_seq = data["seq"]["users"]
+        store.condo_seq = data["seq"]["condos"]
+        return store
+
+    @classmethod
+    def open(cls, snapshot_path: Optional[str]) -> "MemoryStore":
+        """Carrega ``snapshot_path`` se existir (senão começa vazio) e grava nele ao fechar."""
+        if snapshot_path and Path(snapshot_path).exists():
+            return cls.load(snapshot_path, snapshot_path)
+        return cls(snapshot_path)
+
+
+def _discard(index: Dict[Any, Set[int]], key: Any, item_id: Any) -> None:
+    ids = index.get(key)
+    if ids is not None:
+        ids.discard(item_id)
+        if not ids:
+            del index[key]
+
+
+def _remove_id(ids: List[int], item_id: int) -> None:
+    i = bisect_left(ids, item_id)
+    if i < len(ids) and ids[i] == item_id:
+        del ids[i]
+
+
+class MemoryUserRepository(IUserRepository):
+    def __init__(self, store: MemoryStore) -> None:
+        self.store = store
+
+    def create(self, user: User) -> int:
+        s = self.store
+        _check_not_null(user, "users", USER_REQUIRED)
+        with s.lock:
+            cid = s.resolve_condo_id(user)
+            if user.rfid_code in s.user_by_rfid:
+                raise _integrity("UNIQUE constraint failed: users.rfid_code")
+            s.user_seq += 1
+            stored = replace(user, id=s.user_seq, condo_id=cid, condo="")
+            s.users[stored.id] = stored  # type: ignore[index]
+            s.user_ids.append(stored.id)  # type: ignore[arg-type]
+            s.index_user(stored)
+            return s.user_seq
+
+    def create_many(
+        self, users: Iterable[User], batch_size: int = 1000, commit_every: int = 0
+    ) -> Tuple[int, List[Tuple[int, str]]]:
+        created, errors = create_each(self.create, users, sqlite3.DatabaseError)
+        logger.info("Inserção em lote de usuários (memória): %s criados, %s falhas", created, len(errors))
+        return created, errors
+
+    def _get(self, user_id: Optional[int]) -> Optional[User]:
+        with self.store.lock:
+            u = self.store.users.get(user_id)  # type: ignore[arg-type]
+            return self.store.user_view(u) if u is not None else None
+
+    def get_by_id(self, user_id: int) -> Optional[User]:
+        return self._get(user_id)
+
+    def get_by_name(self, name: str) -> Optional[User]:
+        with self.store.lock:
+            ids = self.store.users_by_name.get(name)
+            # homônimos: o de menor id, como a busca pelo índice idx_users_name
+            return self._get(min(ids)) if ids else None
+
+    def get_by_rfid(self, rfid_code: str) -> Optional[User]:
+        with self.store.lock:
+            return self._get(self.store.user_by_rfid.get(rfid_code))
+
+    def list_all(self) -> Iterable[User]:
+        with self.store.lock:
+            view = self.store.user_view
+            return [view(u) for u in self.store.users.values()]
+
+    def iter_all(self, chunk_size: int = 1000) -> Iterator[User]:
+        s = self.store
+        with s.lock:
+            ids = list(s.user_ids)
+        for i in range(0, len(ids), chunk_size):
+            with s.lock:
+                chunk = [s.user_view(s.users[uid]) for uid in ids[i:i + chunk_size] if uid in s.users]
+            yield from chunk
+
+    def iter_rfid_entries(self, chunk_size: int = 10_000) -> Iterator[Tuple[str, RfidEntry]]:
+        with self.store.lock:
+            entries = [(u.rfid_code, RfidEntry(u.id, u.condo_id, u.vehicle_type)) for u in self.store.users.values()]  # type: ignore[arg-type]
+        return iter(entries)
+
+    def list_page(self, after_id: Optional[int] = None, limit: int = 100) -> Page[User]:
+        after, n = page_args(after_id, limit)
+        s = self.store
+        with s.lock:
+            start = bisect_right(s.user_ids, after)
+            items = [s.user_view(s.users[uid]) for uid in s.user_ids[start:start + n]]
+        return make_page(items, limit)
+
+    def update(self, user: User) -> None:
+        assert user.id is not None, "User.id é obrigatório para update"
+        s = self.store
+        _check_not_null(user, "users", USER_REQUIRED)
+        with s.lock:
+            old = s.users.get(user.id)
+            if old is None:
+                return
+            cid = s.resolve_condo_id(user)
+            owner = s.user_by_rfid.get(user.rfid_code)
+            if owner is not None and owner != user.id:
+                raise _integrity("UNIQUE constraint failed: users.rfid_code")
+            stored = replace(user, condo_id=cid, condo="")
+            s.unindex_user(old)
+            s.users[user.id] = stored
+            s.index_user(stored)
+
+    def delete(self, user_id: int) -> None:
+        s = self.store
+        with s.lock:
+            old = s.users.pop(user_id, None)
+            if old is None:
+                return
+            s.unindex_user(old)
+            _remove_id(s.user_ids, user_id)
+            for session in s.sessions.pop(user_id, ()):  # ON DELETE CASCADE
+                s.session_txs.discard((user_id, session.transaction_id))  # type: ignore[arg-type]
+            s.newest_ended_at.pop(user_id, None)
+
+    def count_by_condo(self, condo_name: str) -> int:
+        with self.store.lock:
+            cid = self.store.condo_by_name.get(condo_name)
+            return len(self.store.users_by_condo.get(cid, ())) if cid is not None else 0
+
+    def count_by_condo_id(self, condo_id: int) -> int:
+        with self.store.lock:
+            return len(self.store.users_by_condo.get(condo_id, ()))
+
+
+class MemoryCondoRepository(ICondoRepository):
+    def __init__(self, store: MemoryStore) -> None:
+        self.store = store
+
+    def create(self, condo: Condo) -> int:
+        s = self.store
+        _check_not_null(condo, "condos", CONDO_REQUIRED)
+        with s.lock:
+            if condo.name in s.condo_by_name:
+                raise _integrity("UNIQUE constraint failed: condos.name")
+            s.condo_seq += 1
+            stored = replace(condo, id=s.condo_seq)
+            s.condos[s.condo_seq] = stored
+            s.condo_ids.append(s.condo_seq)
+            s.condo_by_name[stored.name] = s.condo_seq
+            return s.condo_seq
+
+    def create_many(
+        self, condos: Iterable[Condo], batch_size: int = 1000, commit_every: int = 0
+    ) -> Tuple[int, List[Tuple[int, str]]]:
+        created, errors = create_each(self.create, condos, sqlite3.DatabaseError)
+        logger.info("Inserção em lote de condomínios (memória): %s criados, %s falhas", created, len(errors))
+        return created, errors
+
+    def get_by_id(self, condo_id: int) -> Optional[Condo]:
+        with self.store.lock:
+            c = self.store.condos.get(condo_id)
+            return replace(c) if c is not None else None
+
+    def get_by_name(self, name: str) -> Optional[Condo]:
+        with self.store.lock:
+            cid = self.store.condo_by_name.get(name)
+            return replace(self.store.condos[cid]) if cid is not None else None
+
+    def list_all(self) -> Iterable[Condo]:
+        with self.store.lock:
+            return [replace(c) for c in self.store.condos.values()]
+
+    def iter_all(self, chunk_size: int = 1000) -> Iterator[Condo]:
+        return iter(self.list_all())
+
+    def list_page(self, after_id: Optional[int] = None, limit: int = 100) -> Page[Condo]:
+        after, n = page_args(after_id, limit)
+        s = self.store
+        with s.lock:
+            start = bisect_right(s.condo_ids, after)
+            items = [replace(s.condos[cid]) for cid in s.condo_ids[start:start + n]]
+        return make_page(items, limit)
+
+    def update(self, condo: Condo) -> None:
+        assert condo.id is not None, "Condo.id é obrigatório para update"
+        s = self.store
+        _check_not_null(condo, "condos", CONDO_REQUIRED)
+        with s.lock:
+            old = s.condos.get(condo.id)
+            if old is None:
+                return
+            owner = s.condo_by_name.get(condo.name)
+            if owner is not None and owner != condo.id:
+                raise _integrity("UNIQUE constraint failed: condos.name")
+            del s.condo_by_name[old.name]
+            s.condos[condo.id] = replace(condo)
+            s.condo_by_name[condo.name] = condo.id
+
+    def delete(self, condo_id: int) -> None:
+        s = self.store
+        with s.lock:
+            old = s.condos.get(condo_id)
+            if old is None:
+                return
+            if s.users_by_condo.get(condo_id):
+                raise _integrity("FOREIGN KEY constraint failed")  # ON DELETE RESTRICT
+            del s.condos[condo_id]
+            del s.condo_by_name[old.name]
+            _remove_id(s.condo_ids, condo_id)
+
+
+class MemorySessionRepository(IChargingSessionRepository):
+    """Histórico de recargas; grava ``last_*`` do usuário quando a sessão é a mais recente."""
+
+    def __init__(self, store: MemoryStore) -> None:
+        self.store = store
+
+    def _insert(self, session: ChargingSession) -> bool:
+        s = self.store
+        user = s.users[session.user_id]
+        if session.transaction_id is not None:
+            key = (session.user_id, session.transaction_id)
+            if key in s.session_txs:  # INSERT OR IGNORE no índice único (user_id, transaction_id)
+                return False
+            s.session_txs.add(key)
+        condo_id = session.condo_id if session.condo_id is not None else user.condo_id
+        s.sessions.setdefault(session.user_id, []).append(replace(session, condo_id=condo_id))
+        return True
+
+    def _update_last(self, session: ChargingSession) -> None:
+        """Chamada para toda sessão gravada (em lote, para a mais recente de cada
+        usuário), o que mantém ``newest_ended_at`` em dia sem varrer o histórico."""
+        s = self.store
+        user = s.users[session.user_id]
+        newest = s.newest_ended_at.get(session.user_id)
+        if newest is not None and newest > session.ended_at:
+            return
+        s.newest_ended_at[session.user_id] = session.ended_at
+        user.last_energy = session.energy_kwh
+        user.last_cost = session.cost
+        user.last_time_minutes = session.duration_minutes
+
+    def append(self, session: ChargingSession) -> None:
+        with self.store.lock:
+            if session.user_id not in self.store.users:
+                raise ValueError("Usuário não encontrado.")
+            if not self._insert(session):
+                logger.debug("Sessão reenviada ignorada: usuário %s, transação %s", session.user_id, session.transaction_id)
+                return
+            self._update_last(session)
+
+    def append_many(self, sessions: Iterable[ChargingSession]) -> Tuple[int, List[Tuple[int, str]]]:
+        items = list(sessions)
+        with self.store.lock:
+            users = self.store.users
+            errors = [(i, "Usuário não encontrado.") for i, s in enumerate(items) if s.user_id not in users]
+            written = [s for s in items if s.user_id in users and self._insert(s)]
+            newest: Dict[int, ChargingSession] = {}
+            for s in written:
+                cur = newest.get(s.user_id)
+                if cur is None or s.ended_at >= cur.ended_at:
+                    newest[s.user_id] = s
+            for s in newest.values():
+                self._update_last(s)
+        return len(written), errors
+
+    def list_by_user(self, user_id: int, limit: Optional[int] = None) -> List[ChargingSession]:
+        with self.store.lock:
+            # estável: no mesmo ended_at, a gravada por último vem primeiro (como ``id DESC``)
+            items = sorted(reversed(self.store.sessions.get(user_id, [])), key=lambda s: -s.ended_at)
+            return [replace(s) for s in (items if limit is None else items[:limit])]
@@ -0,0 +1,79 @@
+from __future__ import annotations
+import logging
+import sqlite3
+from dataclasses import dataclass
+from typing import Iterator, List, Sequence, Tuple
+from ..schema_sql import MIGRATIONS # type: ignore
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    description: str
+    sql: str
+
+
+DEFAULT_MIGRATIONS: List[Migration] = [Migration(*m) for m in MIGRATIONS]
+
+
+def _statements(sql: str) -> Iterator[str]:
+    buf = ""
+    for line in sql.splitlines(keepends=True):
+        buf += line
+        if sqlite3.complete_statement(buf):
+            yield buf.strip()
+            buf = ""
+    if buf.strip():
+        raise ValueError(f"Instrução SQL incompleta na migração: {buf.strip()!r}")
+
+
+class MigrationRunner:
+    """Aplica migrações numeradas de forma idempotente, usando ``PRAGMA user_version``."""
+
+    def __init__(self, db_path: str, migrations: Sequence[Migration] = DEFAULT_MIGRATIONS) -> None:
+        self.db_path = db_path
+        self.migrations = sorted(migrations, key=lambda m: m.version)
+
+    @property
+    def latest_version(self) -> int:
+        return self.migrations[-1].version if self.migrations else 0
+
+    def current_version(self) -> int:
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return int(conn.execute("PRAGMA user_version").fetchone()[0])
+        finally:
+            conn.close()
+
+    def status(self) -> List[Tuple[Migration, bool]]:
+        current = self.current_version()
+        return [(m, m.version <= current) for m in self.migrations]
+
+    def migrate(self) -> List[int]:
+        """Aplica as migrações pendentes; retorna as versões aplicadas."""
+        conn = sqlite3.connect(self.db_path, isolation_level=None)
+        applied: List[int] = []
+        try:
+            if int(conn.execute("PRAGMA user_version").fetchone()[0]) >= self.latest_version:
+                return applied
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                # relê a versão já com o lock de escrita (outro processo pode ter migrado)
+                current = int(conn.execute("PRAGMA user_version").fetchone()[0])
+                for m in self.migrations:
+                    if m.version <= current:
+                        continue
+                    for stmt in _statements(m.sql):
+                        conn.execute(stmt)
+                    conn.execute(f"PRAGMA user_version = {int(m.version)}")
+                    applied.append(m.version)
+                    logger.info("Migração %03d aplicada: %s", m.version, m.description)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        finally:
+            conn.close()
+        return applied
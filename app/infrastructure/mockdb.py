@@ -1,7 +1,16 @@
 from __future__ import annotations
-from typing import Dict, Iterable, Optional
-from ..domain.interfaces import IUserRepository, ICondoRepository, IDatabase
-from ..domain.models import User, Condo
+from dataclasses import replace
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from ..domain.interfaces import IUserRepository, ICondoRepository, IChargingSessionRepository, IDatabase
+from ..domain.models import User, Condo, ChargingSession, Page
+from ..utils.repository import create_each, make_page, page_args
+
+def _page(data: Dict[int, object], after_id: Optional[int], limit: int) -> Page:
+    # mesmas regras do SQLite (inclusive o teto MAX_PAGE_SIZE)
+    after, fetch = page_args(after_id, limit)
+    ids = sorted(i for i in data if i > after)[:fetch]
+    return make_page([data[i] for i in ids], limit)
+
 
 class InMemoryDatabase(IDatabase):
     # Apenas para cumprir a interface; não expõe conexão real
@@ -17,10 +26,16 @@ class MockUserRepository(IUserRepository):
     def create(self, user: User) -> int:
         uid = self._seq
         self._seq += 1
-        self._data[uid] = User(id=uid, **{k: v for k, v in user.__dict__.items() if k != "id"})
+        self._data[uid] = replace(user, id=uid)
         return uid
 
 
+    def create_many(
+        self, users: Iterable[User], batch_size: int = 1000, commit_every: int = 0
+    ) -> Tuple[int, List[Tuple[int, str]]]:
+        return create_each(self.create, users)
+
+
     def get_by_id(self, user_id: int) -> Optional[User]:
         return self._data.get(user_id)
 
@@ -32,10 +47,25 @@ class MockUserRepository(IUserRepository):
         return None
 
 
+    def get_by_rfid(self, rfid_code: str) -> Optional[User]:
+        for u in self._data.values():
+            if u.rfid_code == rfid_code:
+                return u
+        return None
+
+
     def list_all(self) -> Iterable[User]:
         return list(self._data.values())
 
 
+    def iter_all(self, chunk_size: int = 1000) -> Iterator[User]:
+        return iter(list(self._data.values()))
+
+
+    def list_page(self, after_id: Optional[int] = None, limit: int = 100) -> Page[User]:
+        return _page(self._data, after_id, limit)
+
+
     def update(self, user: User) -> None:
         assert user.id is not None
         if user.id in self._data:
@@ -49,6 +79,10 @@ class MockUserRepository(IUserRepository):
     def count_by_condo(self, condo_name: str) -> int:
         return sum(1 for u in self._data.values() if u.condo == condo_name)
 
+
+    def count_by_condo_id(self, condo_id: int) -> int:
+        return sum(1 for u in self._data.values() if u.condo_id == condo_id)
+
 class MockCondoRepository(ICondoRepository):
     def __init__(self) -> None:
         self._data: Dict[int, Condo] = {}
@@ -58,10 +92,16 @@ class MockCondoRepository(ICondoRepository):
     def create(self, condo: Condo) -> int:
         cid = self._seq
         self._seq += 1
-        self._data[cid] = Condo(id=cid, **{k: v for k, v in condo.__dict__.items() if k != "id"})
+        self._data[cid] = replace(condo, id=cid)
         return cid
 
 
+    def create_many(
+        self, condos: Iterable[Condo], batch_size: int = 1000, commit_every: int = 0
+    ) -> Tuple[int, List[Tuple[int, str]]]:
+        return create_each(self.create, condos)
+
+
     def get_by_id(self, condo_id: int) -> Optional[Condo]:
         return self._data.get(condo_id)
 
@@ -77,6 +117,14 @@ class MockCondoRepository(ICondoRepository):
         return list(self._data.values())
 
 
+    def iter_all(self, chunk_size: int = 1000) -> Iterator[Condo]:
+        return iter(list(self._data.values()))
+
+
+    def list_page(self, after_id: Optional[int] = None, limit: int = 100) -> Page[Condo]:
+        return _page(self._data, after_id, limit)
+
+
     def update(self, condo: Condo) -> None:
         assert condo.id is not None
         if condo.id in self._data:
@@ -84,4 +132,37 @@ class MockCondoRepository(ICondoRepository):
 
 
     def delete(self, condo_id: int) -> None:
-        self._data.pop(condo_id, None)
\ No newline at end of file
+        self._data.pop(condo_id, None)
+
+class MockChargingSessionRepository(IChargingSessionRepository):
+    def __init__(self, users: MockUserRepository) -> None:
+        self.users = users
+        self._data: List[ChargingSession] = []
+
+
+    def append(self, session: ChargingSession) -> None:
+        user = self.users.get_by_id(session.user_id)
+        if not user:
+            raise ValueError("Usuário não encontrado.")
+        mine = [s for s in self._data if s.user_id == session.user_id]
+        if session.transaction_id is not None and any(s.transaction_id == session.transaction_id for s in mine):
+            return
+        if session.condo_id is None:
+            session.condo_id = user.condo_id
+        self._data.append(session)
+        if all(s.ended_at <= session.ended_at for s in mine):
+            user.last_energy = session.energy_kwh
+            user.last_cost = session.cost
+            user.last_time_minutes = session.duration_minutes
+
+
+    def append_many(self, sessions: Iterable[ChargingSession]) -> Tuple[int, List[Tuple[int, str]]]:
+        before = len(self._data)
+        _, errors = create_each(self.append, sessions)
+        return len(self._data) - before, errors  # reenvios ignorados não contam
+
+
+    def list_by_user(self, user_id: int, limit: Optional[int] = None) -> List[ChargingSession]:
+        # estável: no mesmo ended_at, a gravada por último vem primeiro
+        items = sorted((s for s in reversed(self._data) if s.user_id == user_id), key=lambda s: s.ended_at, reverse=True)
+        return items if limit is None else items[:limit]
@@ -1,11 +1,148 @@
 from __future__ import annotations
 import logging
-from typing import Iterable, Optional, List
-from ..domain.interfaces import IUserRepository, ICondoRepository, IDatabase
-from ..domain.models import User, Condo
+import sqlite3
+from itertools import islice, starmap
+from typing import Any, Iterable, Iterator, Optional, List, Sequence, Tuple
+from ..domain.interfaces import IUserRepository, ICondoRepository, IChargingSessionRepository, IDatabase
+from ..domain.models import User, Condo, ChargingSession, Page, RfidEntry
+from ..utils.repository import make_page, page_args
 
 logger = logging.getLogger(__name__)
 
+# condo_id tem precedência; sem ele, o id é resolvido pelo nome do condomínio
+CONDO_ID_EXPR = "COALESCE(?, (SELECT id FROM condos WHERE name = ?))"
+
+INSERT_USER_SQL = f"""
+    INSERT INTO users(name, apartment, condo_id, plate_ending, vehicle_type, rfid_code, last_cost, last_energy, last_time_minutes)
+    VALUES (?, ?, {CONDO_ID_EXPR}, ?, ?, ?, ?, ?, ?)
+"""
+
+# As colunas seguem a ordem dos campos de User/Condo: os modelos são montados
+# por posição a partir de tuplas, sem sqlite3.Row nem dict por linha.
+SELECT_USER_SQL = """
+    SELECT u.id, u.name, u.apartment, c.name AS condo, u.plate_ending, u.vehicle_type, u.rfid_code,
+           u.last_cost, u.last_energy, u.last_time_minutes, u.condo_id
+    FROM users u JOIN condos c ON c.id = u.condo_id
+"""
+
+SELECT_CONDO_SQL = """
+    SELECT id, name, apartments_count, chargers_count, charger_type, state, energy_price FROM condos
+"""
+
+INSERT_CONDO_SQL = """
+    INSERT INTO condos(name, apartments_count, chargers_count, charger_type, state, energy_price)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+
+# INSERT ... SELECT resolve condo_id a partir do usuário e não grava nada se ele não existir;
+# OR IGNORE descarta só reenvios com o mesmo transaction_id (índice único parcial).
+INSERT_SESSION_SQL = """
+    INSERT OR IGNORE INTO charging_sessions(user_id, started_at, ended_at, condo_id, energy_kwh, cost, duration_minutes, transaction_id)
+    SELECT id, ?, ?, COALESCE(?, condo_id), ?, ?, ?, ? FROM users WHERE id = ?
+"""
+
+UPDATE_LAST_MEASURE_SQL = """
+    UPDATE users SET last_energy = ?, last_cost = ?, last_time_minutes = ?
+    WHERE id = ? AND NOT EXISTS (
+        SELECT 1 FROM charging_sessions WHERE user_id = ? AND ended_at > ?
+    )
+"""
+
+
+def _user_params(user: User) -> Tuple[Any, ...]:
+    return (
+        user.name,
+        user.apartment,
+        user.condo_id,
+        user.condo,
+        user.plate_ending,
+        user.vehicle_type,
+        user.rfid_code,
+        user.last_cost,
+        user.last_energy,
+        user.last_time_minutes,
+    )
+
+
+def _condo_params(condo: Condo) -> Tuple[Any, ...]:
+    return (
+        condo.name,
+        condo.apartments_count,
+        condo.chargers_count,
+        condo.charger_type,
+        condo.state,
+        condo.energy_price,
+    )
+
+
+def _session_params(s: ChargingSession) -> Tuple[Any, ...]:
+    return (s.started_at, s.ended_at, s.condo_id, s.energy_kwh, s.cost, s.duration_minutes, s.transaction_id, s.user_id)
+
+
+def _last_measure_params(s: ChargingSession) -> Tuple[Any, ...]:
+    return (s.energy_kwh, s.cost, s.duration_minutes, s.user_id, s.user_id, s.ended_at)
+
+
+def _tuples(conn: sqlite3.Connection, sql: str, params: Sequence[Any] = ()) -> sqlite3.Cursor:
+    """Executa ``sql`` num cursor que devolve tuplas puras (ignora o row_factory da conexão)."""
+    cur = conn.cursor()
+    cur.row_factory = None
+    return cur.execute(sql, params)
+
+
+def _bulk_insert(
+    db: IDatabase,
+    sql: str,
+    rows: Iterable[Sequence[Any]],
+    batch_size: int,
+    commit_every: int,
+) -> Tuple[int, List[Tuple[int, str]]]:
+    """Insere ``rows`` com ``executemany`` em lotes, numa única transação.
+
+    Cada lote roda dentro de um SAVEPOINT; se o lote falhar, ele é desfeito e
+    reaplicado linha a linha (um SAVEPOINT por linha) para isolar as linhas
+    inválidas. ``commit_every`` > 0 faz commits intermediários a cada N linhas.
+    Retorna (criados, [(índice, erro)]) com índices relativos à entrada.
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size deve ser >= 1.")
+    created = 0
+    errors: List[Tuple[int, str]] = []
+    offset = 0
+    pending = 0
+    it = iter(rows)
+    with db.connect() as conn:
+        while True:
+            batch = list(islice(it, batch_size))
+            if not batch:
+                break
+            if not conn.in_transaction:
+                conn.execute("BEGIN")
+            conn.execute("SAVEPOINT bulk_batch")
+            try:
+                conn.executemany(sql, batch)
+                created += len(batch)
+            except sqlite3.DatabaseError:
+                conn.execute("ROLLBACK TO bulk_batch")
+                for i, row in enumerate(batch):
+                    conn.execute("SAVEPOINT bulk_row")
+                    try:
+                        conn.execute(sql, row)
+                        created += 1
+                    except sqlite3.DatabaseError as e:
+                        conn.execute("ROLLBACK TO bulk_row")
+                        errors.append((offset + i, str(e)))
+                    conn.execute("RELEASE bulk_row")
+            conn.execute("RELEASE bulk_batch")
+            offset += len(batch)
+            pending += len(batch)
+            if commit_every and pending >= commit_every:
+                conn.commit()
+                pending = 0
+        conn.commit()
+    return created, errors
+
 
 class UserRepository(IUserRepository):
     def __init__(self, db: IDatabase) -> None:
@@ -14,65 +151,78 @@ class UserRepository(IUserRepository):
     def create(self, user: User) -> int:
         logger.debug("Criando usuário: %s", user)
         with self.db.connect() as conn:
-            cur = conn.execute(
-                """
-                INSERT INTO users(name, apartment, condo, plate_ending, vehicle_type, rfid_code, last_cost, last_energy, last_time_minutes)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    user.name,
-                    user.apartment,
-                    user.condo,
-                    user.plate_ending,
-                    user.vehicle_type,
-                    user.rfid_code,
-                    user.last_cost,
-                    user.last_energy,
-                    user.last_time_minutes,
-                ),
-            )
+            cur = conn.execute(INSERT_USER_SQL, _user_params(user))
             conn.commit()
             uid = int(cur.lastrowid)
             logger.info("Usuário criado com ID %s", uid)
             return uid
 
+    def create_many(
+        self, users: Iterable[User], batch_size: int = 1000, commit_every: int = 0
+    ) -> Tuple[int, List[Tuple[int, str]]]:
+        created, errors = _bulk_insert(
+            self.db, INSERT_USER_SQL, (_user_params(u) for u in users), batch_size, commit_every
+        )
+        logger.info("Inserção em lote de usuários: %s criados, %s falhas", created, len(errors))
+        return created, errors
+
     def get_by_id(self, user_id: int) -> Optional[User]:
         with self.db.connect() as conn:
-            row = conn.execute("SELECT * FROM users WHERE id = ?", (user_id,)).fetchone()
-            return User(**row) if row else None
+            row = _tuples(conn, SELECT_USER_SQL + " WHERE u.id = ?", (user_id,)).fetchone()
+            return User(*row) if row else None
 
     def get_by_name(self, name: str) -> Optional[User]:
         with self.db.connect() as conn:
-            row = conn.execute("SELECT * FROM users WHERE name = ?", (name,)).fetchone()
-            return User(**row) if row else None
+            row = _tuples(conn, SELECT_USER_SQL + " WHERE u.name = ?", (name,)).fetchone()
+            return User(*row) if row else None
+
+    def get_by_rfid(self, rfid_code: str) -> Optional[User]:
+        with self.db.connect() as conn:
+            row = _tuples(conn, SELECT_USER_SQL + " WHERE u.rfid_code = ?", (rfid_code,)).fetchone()
+            return User(*row) if row else None
 
     def list_all(self) -> Iterable[User]:
         with self.db.connect() as conn:
-            rows = conn.execute("SELECT * FROM users ORDER BY id").fetchall()
-            return [User(**row) for row in rows]
+            return list(starmap(User, _tuples(conn, SELECT_USER_SQL + " ORDER BY u.id").fetchall()))
+
+    def iter_all(self, chunk_size: int = 1000) -> Iterator[User]:
+        with self.db.connect() as conn:
+            cur = _tuples(conn, SELECT_USER_SQL + " ORDER BY u.id")
+            while True:
+                rows = cur.fetchmany(chunk_size)
+                if not rows:
+                    return
+                yield from starmap(User, rows)
+
+    def iter_rfid_entries(self, chunk_size: int = 10_000) -> Iterator[Tuple[str, RfidEntry]]:
+        # só as colunas do índice, sem JOIN e sem montar User: ~10x mais rápido que iter_all
+        with self.db.connect() as conn:
+            cur = _tuples(conn, "SELECT rfid_code, id, condo_id, vehicle_type FROM users")
+            while True:
+                rows = cur.fetchmany(chunk_size)
+                if not rows:
+                    break
+                for rfid, uid, condo_id, vtype in rows:
+                    yield rfid, RfidEntry(uid, condo_id, vtype)
+
+    def list_page(self, after_id: Optional[int] = None, limit: int = 100) -> Page[User]:
+        with self.db.connect() as conn:
+            rows = _tuples(
+                conn, SELECT_USER_SQL + " WHERE u.id > ? ORDER BY u.id LIMIT ?", page_args(after_id, limit)
+            ).fetchall()
+            return make_page(list(starmap(User, rows)), limit)
 
     def update(self, user: User) -> None:
         assert user.id is not None, "User.id é obrigatório para update"
         logger.debug("Atualizando usuário ID %s: %s", user.id, user)
         with self.db.connect() as conn:
             conn.execute(
-                """
-                UPDATE users SET name=?, apartment=?, condo=?, plate_ending=?, vehicle_type=?,
+                f"""
+                UPDATE users SET name=?, apartment=?, condo_id={CONDO_ID_EXPR}, plate_ending=?, vehicle_type=?,
                                 rfid_code=?, last_cost=?, last_energy=?, last_time_minutes=?
                 WHERE id=?
                 """,
-                (
-                    user.name,
-                    user.apartment,
-                    user.condo,
-                    user.plate_ending,
-                    user.vehicle_type,
-                    user.rfid_code,
-                    user.last_cost,
-                    user.last_energy,
-                    user.last_time_minutes,
-                    user.id,
-                ),
+                _user_params(user) + (user.id,),
             )
             conn.commit()
 
@@ -84,7 +234,15 @@ class UserRepository(IUserRepository):
 
     def count_by_condo(self, condo_name: str) -> int:
         with self.db.connect() as conn:
-            row = conn.execute("SELECT COUNT(*) as c FROM users WHERE condo=?", (condo_name,)).fetchone()
+            row = conn.execute(
+                "SELECT COUNT(*) as c FROM users WHERE condo_id = (SELECT id FROM condos WHERE name = ?)",
+                (condo_name,),
+            ).fetchone()
+            return int(row["c"]) if row else 0
+
+    def count_by_condo_id(self, condo_id: int) -> int:
+        with self.db.connect() as conn:
+            row = conn.execute("SELECT COUNT(*) as c FROM users WHERE condo_id=?", (condo_id,)).fetchone()
             return int(row["c"]) if row else 0
 
 
@@ -95,39 +253,50 @@ class CondoRepository(ICondoRepository):
     def create(self, condo: Condo) -> int:
         logger.debug("Criando condomínio: %s", condo)
         with self.db.connect() as conn:
-            cur = conn.execute(
-                """
-                INSERT INTO condos(name, apartments_count, chargers_count, charger_type, state, energy_price)
-                VALUES (?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    condo.name,
-                    condo.apartments_count,
-                    condo.chargers_count,
-                    condo.charger_type,
-                    condo.state,
-                    condo.energy_price,
-                ),
-            )
+            cur = conn.execute(INSERT_CONDO_SQL, _condo_params(condo))
             conn.commit()
             cid = int(cur.lastrowid)
             logger.info("Condomínio criado com ID %s", cid)
             return cid
 
+    def create_many(
+        self, condos: Iterable[Condo], batch_size: int = 1000, commit_every: int = 0
+    ) -> Tuple[int, List[Tuple[int, str]]]:
+        created, errors = _bulk_insert(
+            self.db, INSERT_CONDO_SQL, (_condo_params(c) for c in condos), batch_size, commit_every
+        )
+        logger.info("Inserção em lote de condomínios: %s criados, %s falhas", created, len(errors))
+        return created, errors
+
     def get_by_id(self, condo_id: int) -> Optional[Condo]:
         with self.db.connect() as conn:
-            row = conn.execute("SELECT * FROM condos WHERE id = ?", (condo_id,)).fetchone()
-            return Condo(**row) if row else None
+            row = _tuples(conn, SELECT_CONDO_SQL + " WHERE id = ?", (condo_id,)).fetchone()
+            return Condo(*row) if row else None
 
     def get_by_name(self, name: str) -> Optional[Condo]:
         with self.db.connect() as conn:
-            row = conn.execute("SELECT * FROM condos WHERE name = ?", (name,)).fetchone()
-            return Condo(**row) if row else None
+            row = _tuples(conn, SELECT_CONDO_SQL + " WHERE name = ?", (name,)).fetchone()
+            return Condo(*row) if row else None
 
     def list_all(self) -> Iterable[Condo]:
         with self.db.connect() as conn:
-            rows = conn.execute("SELECT * FROM condos ORDER BY id").fetchall()
-            return [Condo(**row) for row in rows]
+            return list(starmap(Condo, _tuples(conn, SELECT_CONDO_SQL + " ORDER BY id").fetchall()))
+
+    def iter_all(self, chunk_size: int = 1000) -> Iterator[Condo]:
+        with self.db.connect() as conn:
+            cur = _tuples(conn, SELECT_CONDO_SQL + " ORDER BY id")
+            while True:
+                rows = cur.fetchmany(chunk_size)
+                if not rows:
+                    return
+                yield from starmap(Condo, rows)
+
+    def list_page(self, after_id: Optional[int] = None, limit: int = 100) -> Page[Condo]:
+        with self.db.connect() as conn:
+            rows = _tuples(
+                conn, SELECT_CONDO_SQL + " WHERE id > ? ORDER BY id LIMIT ?", page_args(after_id, limit)
+            ).fetchall()
+            return make_page(list(starmap(Condo, rows)), limit)
 
     def update(self, condo: Condo) -> None:
         assert condo.id is not None, "Condo.id é obrigatório para update"
@@ -154,4 +323,65 @@ class CondoRepository(ICondoRepository):
         logger.debug("Deletando condomínio ID %s", condo_id)
         with self.db.connect() as conn:
             conn.execute("DELETE FROM condos WHERE id=?", (condo_id,))
-            conn.commit()
\ No newline at end of file
+            conn.commit()
+
+
+class ChargingSessionRepository(IChargingSessionRepository):
+    # limite seguro de parâmetros por consulta no SQLite
+    MAX_PARAMS = 500
+
+    def __init__(self, db: IDatabase) -> None:
+        self.db = db
+
+    def append(self, session: ChargingSession) -> None:
+        with self.db.connect() as conn:
+            cur = conn.execute(INSERT_SESSION_SQL, _session_params(session))
+            if cur.rowcount == 0:
+                if conn.execute("SELECT 1 FROM users WHERE id = ?", (session.user_id,)).fetchone() is None:
+                    raise ValueError("Usuário não encontrado.")
+                logger.debug("Sessão reenviada ignorada: usuário %s, transação %s", session.user_id, session.transaction_id)
+                return
+            conn.execute(UPDATE_LAST_MEASURE_SQL, _last_measure_params(session))
+            conn.commit()
+
+    def append_many(self, sessions: Iterable[ChargingSession]) -> Tuple[int, List[Tuple[int, str]]]:
+        items = list(sessions)
+        if not items:
+            return 0, []
+        with self.db.connect() as conn:
+            ids = list({s.user_id for s in items})
+            known: set = set()
+            for i in range(0, len(ids), self.MAX_PARAMS):
+                part = ids[i:i + self.MAX_PARAMS]
+                marks = ",".join("?" * len(part))
+                known.update(r[0] for r in conn.execute(f"SELECT id FROM users WHERE id IN ({marks})", part))
+            errors = [(i, "Usuário não encontrado.") for i, s in enumerate(items) if s.user_id not in known]
+            # uma linha por vez (mesma transação) para saber quais reenvios foram ignorados:
+            # só as sessões realmente gravadas contam e podem virar last_*
+            written: List[ChargingSession] = []
+            for s in items:
+                if s.user_id in known and conn.execute(INSERT_SESSION_SQL, _session_params(s)).rowcount:
+                    written.append(s)
+            # uma única atualização de last_* por usuário: a sessão mais recente do lote
+            newest: dict = {}
+            for s in written:
+                cur = newest.get(s.user_id)
+                if cur is None or s.ended_at >= cur.ended_at:
+                    newest[s.user_id] = s
+            conn.executemany(UPDATE_LAST_MEASURE_SQL, [_last_measure_params(s) for s in newest.values()])
+            conn.commit()
+        logger.debug("Sessões gravadas em lote: %s (%s usuários), %s falhas", len(written), len(newest), len(errors))
+        return len(written), errors
+
+    def list_by_user(self, user_id: int, limit: Optional[int] = None) -> List[ChargingSession]:
+        with self.db.connect() as conn:
+            # colunas na ordem dos campos de ChargingSession
+            rows = _tuples(
+                conn,
+                """
+                SELECT user_id, started_at, ended_at, energy_kwh, cost, duration_minutes, condo_id, transaction_id
+                FROM charging_sessions WHERE user_id = ? ORDER BY ended_at DESC, id DESC LIMIT ?
+                """,
+                (user_id, -1 if limit is None else limit),
+            ).fetchall()
+            return list(starmap(ChargingSession, rows))
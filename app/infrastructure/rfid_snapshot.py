@@ -0,0 +1,149 @@
+from __future__ import annotations
+import mmap
+import os
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import BinaryIO, Iterable, Optional, Tuple
+from ..utils.validators import validate_rfid
+
+# Cabeçalho: magic, versão, tamanho do registro, quantidade de registros.
+# Registros: (rfid, user_id) como dois uint32 big-endian, ordenados por rfid,
+# de modo que a busca binária não precisa decodificar o arquivo inteiro.
+MAGIC = b"EVRF"
+FORMAT_VERSION = 1
+_HEADER = struct.Struct(">4sHHI")
+_RECORD = struct.Struct(">II")
+_KEY = struct.Struct(">I")
+HEADER_SIZE = _HEADER.size
+RECORD_SIZE = _RECORD.size
+
+
+def write_snapshot(entries: Iterable[Tuple[str, int]], path: str) -> int:
+    """Grava ``(rfid, user_id)`` ordenados em ``path`` e retorna o total.
+
+    O arquivo é escrito ao lado do destino e trocado com ``os.replace``:
+    leitores com o arquivo antigo mapeado continuam íntegros.
+    """
+    keys = []
+    for rfid, user_id in entries:
+        if not 0 < user_id <= 0xFFFFFFFF:
+            raise ValueError(f"ID de usuário fora do intervalo: {user_id}")
+        keys.append(int(validate_rfid(rfid), 16) << 32 | user_id)
+    keys.sort()
+    records = array("I")
+    previous = None
+    for key in keys:
+        rfid = key >> 32
+        if rfid == previous:
+            raise ValueError(f"RFID duplicado: {rfid:08x}")
+        previous = rfid
+        records.append(rfid)
+        records.append(key & 0xFFFFFFFF)
+    if sys.byteorder == "little":
+        records.byteswap()
+    target = Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(target.name + ".tmp")
+    try:
+        with open(tmp, "wb") as f:
+            f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, RECORD_SIZE, len(keys)))
+            records.tofile(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, target)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    return len(keys)
+
+
+class RfidSnapshot:
+    """Leitor do snapshot: ``mmap`` + busca binária, sem carregar registros.
+
+    ``refresh()`` reabre o arquivo se ele tiver sido trocado por um novo
+    ``write_snapshot`` (detectado por inode/mtime).
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._file: Optional[BinaryIO] = None
+        self._mm: Optional[mmap.mmap] = None
+        self._count = 0
+        self._stamp: Tuple[int, int] = (0, 0)
+        self._swap(*self._open())
+
+    def lookup(self, rfid_code: str) -> Optional[int]:
+        """ID do usuário dono do RFID ou ``None`` (tag desconhecida ou inválida)."""
+        try:
+            key = int(validate_rfid(rfid_code), 16)
+        except ValueError:
+            return None
+        mm = self._mm
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            off = HEADER_SIZE + mid * RECORD_SIZE
+            found = _KEY.unpack_from(mm, off)[0]  # type: ignore[arg-type]
+            if found < key:
+                lo = mid + 1
+            elif found > key:
+                hi = mid
+            else:
+                return _KEY.unpack_from(mm, off + 4)[0]  # type: ignore[arg-type]
+        return None
+
+    def refresh(self) -> bool:
+        """Reabre o arquivo se ele mudou; retorna ``True`` quando recarregou."""
+        if _stamp(self.path) == self._stamp:
+            return False
+        opened = self._open()  # se o novo arquivo for inválido, mantém o atual
+        self.close()
+        self._swap(*opened)
+        return True
+
+    def close(self) -> None:
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __enter__(self) -> "RfidSnapshot":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _swap(self, f: BinaryIO, mm: mmap.mmap, count: int, stamp: Tuple[int, int]) -> None:
+        self._file, self._mm, self._count, self._stamp = f, mm, count, stamp
+
+    def _open(self) -> Tuple[BinaryIO, mmap.mmap, int, Tuple[int, int]]:
+        f = open(self.path, "rb")
+        try:
+            st = os.fstat(f.fileno())
+            stamp, size = (st.st_ino, st.st_mtime_ns), st.st_size
+            if size < HEADER_SIZE:
+                raise ValueError(f"Snapshot RFID inválido: {self.path}")
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, record_size, count = _HEADER.unpack_from(mm, 0)
+            if magic != MAGIC or version != FORMAT_VERSION or record_size != RECORD_SIZE:
+                mm.close()
+                raise ValueError(f"Snapshot RFID inválido ou de outra versão: {self.path}")
+            if size != HEADER_SIZE + count * RECORD_SIZE:
+                mm.close()
+                raise ValueError(f"Snapshot RFID truncado: {self.path}")
+        except BaseException:
+            f.close()
+            raise
+        return f, mm, count, stamp
+
+
+def _stamp(path: str) -> Tuple[int, int]:
+    st = os.stat(path)
+    return st.st_ino, st.st_mtime_ns
@@ -0,0 +1,212 @@
+"""Log de consultas lentas do SQLite.
+
+``sqlite3`` não tem hook de profile com duração; por isso as conexões do pool
+passam a ser ``TracingConnection`` e seus cursores ``TracingCursor``, que medem
+``execute`` + as leituras do resultado. Ao terminar (fim do resultado,
+``close()``, próximo ``execute`` ou devolução da conexão ao pool), a duração
+total e as linhas vão para o ``QueryTracer``; acima do limite, o comando é
+registrado no log com o ``EXPLAIN QUERY PLAN`` — ``SCAN users`` denuncia índice
+faltando. O registro acontece sempre na thread que tomou a conexão emprestada,
+nunca na coleta de lixo do cursor.
+"""
+from __future__ import annotations
+import logging
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# só comandos DML têm plano; PRAGMA/BEGIN/CREATE são ignorados pelo EXPLAIN
+_EXPLAINABLE = re.compile(r"^\s*(SELECT|WITH|INSERT|UPDATE|DELETE|REPLACE)\b", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+
+class QueryTracer:
+    """Agrega duração e linhas por comando SQL e registra os lentos.
+
+    ``threshold_ms=0`` registra todos. Planos são capturados uma vez por texto
+    de comando (cache LRU de ``plan_cache_size``).
+    """
+
+    def __init__(self, threshold_ms: float = 100.0, explain: bool = True, plan_cache_size: int = 256) -> None:
+        self.threshold_ms = threshold_ms
+        self.explain = explain
+        self.plan_cache_size = plan_cache_size
+        self._plans: "OrderedDict[str, str]" = OrderedDict()
+        self._by_sql: Dict[str, List[float]] = {}  # sql -> [execuções, total_ms, max_ms, linhas]
+        self._lock = threading.Lock()
+        self._statements = 0
+        self._slow = 0
+        self._total_ms = 0.0
+
+    def record(self, conn: sqlite3.Connection, sql: str, params: Any, elapsed_ms: float, rows: int) -> None:
+        text = _WHITESPACE.sub(" ", sql).strip()
+        slow = elapsed_ms >= self.threshold_ms
+        with self._lock:
+            self._statements += 1
+            self._total_ms += elapsed_ms
+            agg = self._by_sql.get(text)
+            if agg is None:
+                agg = self._by_sql[text] = [0, 0.0, 0.0, 0]
+            agg[0] += 1
+            agg[1] += elapsed_ms
+            agg[2] = max(agg[2], elapsed_ms)
+            agg[3] += rows
+            if slow:
+                self._slow += 1
+        if not slow:
+            return
+        plan = self._plan(conn, text, params) if self.explain else None
+        logger.warning(
+            "Consulta lenta (%.1f ms, %d linha(s)): %s%s",
+            elapsed_ms, rows, text, f" | plano: {plan}" if plan else "",
+        )
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "statements": self._statements,
+                "slow": self._slow,
+                "total_ms": round(self._total_ms, 3),
+                "distinct": len(self._by_sql),
+            }
+
+    def top(self, n: int = 10) -> List[Dict[str, Any]]:
+        """Comandos que mais consumiram tempo no total."""
+        with self._lock:
+            items = sorted(self._by_sql.items(), key=lambda kv: -kv[1][1])[:n]
+        return [
+            {"sql": sql, "calls": int(c), "total_ms": round(t, 3), "max_ms": round(m, 3), "rows": int(r)}
+            for sql, (c, t, m, r) in items
+        ]
+
+    def _plan(self, conn: sqlite3.Connection, sql: str, params: Any) -> Optional[str]:
+        if params is None or not _EXPLAINABLE.match(sql):  # executemany: sem um conjunto de parâmetros
+            return None
+        with self._lock:
+            plan = self._plans.get(sql)
+            if plan is not None:
+                self._plans.move_to_end(sql)
+                return plan
+        try:
+            # execute da classe base: o próprio EXPLAIN não é rastreado
+            rows = sqlite3.Connection.execute(conn, "EXPLAIN QUERY PLAN " + sql, params).fetchall()
+        except sqlite3.Error as e:
+            return f"(indisponível: {e})"
+        plan = "; ".join(str(r[-1]) for r in rows)
+        with self._lock:
+            self._plans[sql] = plan
+            if len(self._plans) > self.plan_cache_size:
+                self._plans.popitem(last=False)
+        return plan
+
+
+class TracingCursor(sqlite3.Cursor):
+    def __init__(self, conn: "TracingConnection") -> None:
+        super().__init__(conn)
+        self._tracer: QueryTracer = conn.tracer
+        self._pending: Optional[Tuple[str, Any]] = None
+        self._elapsed = 0.0
+        self._rows = 0
+
+    def execute(self, sql: str, parameters: Any = ()) -> "TracingCursor":
+        self._finish()
+        start = time.perf_counter()
+        super().execute(sql, parameters)
+        self._elapsed = time.perf_counter() - start
+        self._pending, self._rows = (sql, parameters), 0
+        if self.description is None:  # escrita/DDL: não há resultado a ler
+            self._rows = max(self.rowcount, 0)
+            self._finish()
+        else:  # ex.: get_by_* lê só a primeira linha; fica para a devolução da conexão
+            self.connection.pending_cursors.add(self)
+        return self
+
+    def executemany(self, sql: str, seq_of_parameters: Any) -> "TracingCursor":
+        self._finish()
+        start = time.perf_counter()
+        super().executemany(sql, seq_of_parameters)
+        self._elapsed = time.perf_counter() - start
+        self._pending, self._rows = (sql, None), max(self.rowcount, 0)
+        self._finish()
+        return self
+
+    def fetchone(self) -> Any:
+        start = time.perf_counter()
+        row = super().fetchone()
+        self._read(start, 0 if row is None else 1, row is None)
+        return row
+
+    def fetchmany(self, size: int = -1) -> List[Any]:
+        start = time.perf_counter()
+        rows = super().fetchmany(size if size >= 0 else self.arraysize)
+        self._read(start, len(rows), not rows)
+        return rows
+
+    def fetchall(self) -> List[Any]:
+        start = time.perf_counter()
+        rows = super().fetchall()
+        self._read(start, len(rows), True)
+        return rows
+
+    def __next__(self) -> Any:
+        start = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._read(start, 0, True)
+            raise
+        self._read(start, 1, False)
+        return row
+
+    def close(self) -> None:
+        self._finish()
+        super().close()
+
+    def _read(self, start: float, rows: int, done: bool) -> None:
+        if self._pending is None:
+            return
+        self._elapsed += time.perf_counter() - start
+        self._rows += rows
+        if done:
+            self._finish()
+
+    def _finish(self) -> None:
+        pending, self._pending = self._pending, None
+        if pending is not None:
+            self.connection.pending_cursors.discard(self)
+            sql, params = pending
+            self._tracer.record(self.connection, sql, params, self._elapsed * 1000, self._rows)
+
+
+class TracingConnection(sqlite3.Connection):
+    """Conexão cujos ``execute``/``executemany``/``cursor`` passam pelo ``QueryTracer``.
+
+    ``tracer`` deve ser atribuído logo após ``sqlite3.connect(..., factory=TracingConnection)``.
+    """
+
+    tracer: QueryTracer
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        # cursores com resultado ainda não lido até o fim
+        self.pending_cursors: Set[TracingCursor] = set()
+
+    def finish_traces(self) -> None:
+        """Registra os comandos ainda abertos. O pool chama antes de devolver a
+        conexão, enquanto ela ainda pertence à thread que a usou."""
+        for cur in list(self.pending_cursors):
+            cur._finish()
+
+    def cursor(self, factory: Any = TracingCursor) -> sqlite3.Cursor:  # type: ignore[override]
+        return super().cursor(factory)
+
+    def execute(self, sql: str, parameters: Any = ()) -> sqlite3.Cursor:  # type: ignore[override]
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql: str, seq_of_parameters: Any) -> sqlite3.Cursor:  # type: ignore[override]
+        return self.cursor().executemany(sql, seq_of_parameters)
@@ -0,0 +1,218 @@
+from __future__ import annotations
+import atexit
+import itertools
+import logging
+import threading
+import time
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+from ..domain.interfaces import IChargingSessionRepository
+from ..domain.models import ChargingSession
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindSessionRepository(IChargingSessionRepository):
+    """Fila write-behind na frente de um ``IChargingSessionRepository``.
+
+    ``append`` apenas enfileira; uma thread grava em lote (``append_many``)
+    quando a fila atinge ``max_batch`` ou a sessão mais antiga passa de
+    ``flush_interval`` segundos. Com ``coalesce=True`` só a medida mais recente
+    (maior ``ended_at``) de cada usuário é mantida. Com ``user_exists`` (por
+    exemplo ``RfidAuthorizationService.has_user``, que consulta a memória),
+    ``append`` recusa usuários inexistentes na hora, como o repositório
+    síncrono, em vez de aceitar a medida e descartá-la no flush. ``close()``
+    (também registrado no ``atexit``) tenta o flush final.
+    """
+
+    def __init__(
+        self,
+        inner: IChargingSessionRepository,
+        max_batch: int = 500,
+        flush_interval: float = 0.5,
+        max_pending: int = 100_000,
+        coalesce: bool = False,
+        user_exists: Optional[Callable[[int], bool]] = None,
+    ) -> None:
+        if max_batch < 1 or max_pending < 1:
+            raise ValueError("max_batch e max_pending devem ser >= 1.")
+        self.inner = inner
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.coalesce = coalesce
+        self.user_exists = user_exists
+        self._pending: Dict[Hashable, Tuple[float, ChargingSession]] = {}
+        self._latest: Dict[int, ChargingSession] = {}
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._closed = False
+        self._submitted = 0
+        self._coalesced = 0
+        self._flushed = 0
+        self._failed = 0
+        self._batches = 0
+        self._last_flush_ms = 0.0
+        self._thread = threading.Thread(target=self._run, name="evcharge-write-behind", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+
+    def append(self, session: ChargingSession) -> None:
+        if self.user_exists is not None and not self.user_exists(session.user_id):
+            raise ValueError("Usuário não encontrado.")
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Fila de medidas já foi fechada.")
+            while len(self._pending) >= self.max_pending and not self._closed:
+                # backpressure: o produtor espera a gravação liberar espaço
+                self._cond.notify_all()
+                self._cond.wait(self.flush_interval)
+            if self._closed:
+                raise RuntimeError("Fila de medidas já foi fechada.")
+            if self._enqueue(session, time.monotonic()):
+                self._coalesced += 1
+            latest = self._latest.get(session.user_id)
+            if latest is None or session.ended_at >= latest.ended_at:
+                self._latest[session.user_id] = session
+            self._submitted += 1
+            if len(self._pending) >= self.max_batch:
+                self._cond.notify_all()
+
+
+    def append_many(self, sessions: Iterable[ChargingSession]) -> Tuple[int, List[Tuple[int, str]]]:
+        count = 0
+        errors: List[Tuple[int, str]] = []
+        for i, s in enumerate(sessions):
+            try:
+                self.append(s)
+            except ValueError as e:
+                errors.append((i, str(e)))
+            else:
+                count += 1
+        return count, errors
+
+
+    def list_by_user(self, user_id: int, limit: Optional[int] = None) -> List[ChargingSession]:
+        self.flush()
+        return self.inner.list_by_user(user_id, limit)
+
+
+    def pending_last(self, user_id: int) -> Optional[ChargingSession]:
+        with self._cond:
+            return self._latest.get(user_id)
+
+
+    def flush(self) -> int:
+        """Grava tudo o que está pendente; retorna o número de sessões enviadas."""
+        total = 0
+        with self._flush_lock:
+            while True:
+                with self._cond:
+                    if not self._pending:
+                        break
+                    batch = list(itertools.islice(self._pending.values(), self.max_batch))
+                    for key in list(itertools.islice(self._pending.keys(), len(batch))):
+                        del self._pending[key]
+                    self._cond.notify_all()
+                total += self._write([s for _, s in batch])
+        return total
+
+
+    def close(self) -> None:
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+        try:
+            self.flush()
+        finally:
+            atexit.unregister(self.close)
+            depth = self.stats()["depth"]
+            if depth:
+                logger.error("Fila de medidas encerrada com %s medidas não gravadas (descartadas).", depth)
+        logger.debug("Fila de medidas encerrada: %s", self.stats())
+
+
+    def stats(self) -> Dict[str, float]:
+        with self._cond:
+            oldest = min((t for t, _ in self._pending.values()), default=None)
+            return {
+                "depth": len(self._pending),
+                "lag_ms": round((time.monotonic() - oldest) * 1000, 3) if oldest is not None else 0.0,
+                "submitted": self._submitted,
+                "coalesced": self._coalesced,
+                "flushed": self._flushed,
+                "failed": self._failed,
+                "batches": self._batches,
+                "last_flush_ms": round(self._last_flush_ms, 3),
+            }
+
+
+    def _write(self, batch: List[ChargingSession]) -> int:
+        t0 = time.perf_counter()
+        try:
+            written, errors = self.inner.append_many(batch)
+        except Exception:
+            logger.exception("Falha ao gravar lote de %s medidas; recolocando na fila.", len(batch))
+            with self._cond:
+                now = time.monotonic()
+                for s in batch:
+                    self._enqueue(s, now)
+            raise
+        elapsed = (time.perf_counter() - t0) * 1000
+        for idx, msg in errors:
+            logger.warning("Medida descartada (usuário %s): %s", batch[idx].user_id, msg)
+        with self._cond:
+            self._flushed += written
+            self._failed += len(errors)
+            self._batches += 1
+            self._last_flush_ms = elapsed
+            for s in batch:
+                if self._latest.get(s.user_id) is s:
+                    del self._latest[s.user_id]
+        return written
+
+
+    def _enqueue(self, session: ChargingSession, enqueued_at: float) -> bool:
+        """Põe ``session`` na fila (com ``_cond`` já adquirido). Retorna True se
+        havia medida pendente do mesmo usuário (modo ``coalesce``): fica a de
+        maior ``ended_at``, para uma medida atrasada não sobrescrever a nova."""
+        key: Hashable = session.user_id if self.coalesce else next(self._seq)
+        current = self._pending.get(key)
+        if current is None:
+            self._pending[key] = (enqueued_at, session)
+            return False
+        if session.ended_at >= current[1].ended_at:
+            self._pending[key] = (current[0], session)
+        return True
+
+
+    def _wait_time(self) -> float:
+        """Segundos até o próximo flush (0 = já deve gravar)."""
+        if len(self._pending) >= self.max_batch:
+            return 0.0
+        # após uma falha a fila recebe o lote de volta no fim: a primeira
+        # entrada não é necessariamente a mais antiga
+        oldest = min((t for t, _ in self._pending.values()), default=None)
+        if oldest is None:
+            return self.flush_interval
+        return max(0.0, self.flush_interval - (time.monotonic() - oldest))
+
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._closed:
+                    timeout = self._wait_time()
+                    if timeout <= 0:
+                        break
+                    self._cond.wait(timeout)
+                if self._closed:
+                    return
+            try:
+                self.flush()
+            except Exception:
+                time.sleep(self.flush_interval)
@@ -1,6 +1,5 @@
 from __future__ import annotations
 import logging
-from logging.handlers import RotatingFileHandler
 from pathlib import Path
 from typing import Optional
 
@@ -19,6 +18,8 @@ def setup_logging(level: str = "INFO", filename: Optional[str] = None) -> None:
 
     # File handler (opcional)
     if filename:
+        from logging.handlers import RotatingFileHandler
+
         Path(filename).parent.mkdir(parents=True, exist_ok=True)
         fh = RotatingFileHandler(filename, maxBytes=1_000_000, backupCount=3, encoding="utf-8")
         fh.setLevel(log_level)
@@ -1,31 +1,58 @@
 from __future__ import annotations
+import time
+
+_T0 = time.perf_counter()
+
 import logging
+import os
+import sys
+from typing import List, Optional
 from .config import AppConfig
 from .logging_config import setup_logging
-from .infrastructure.db import SQLiteDatabase
-from .infrastructure.repositories import UserRepository, CondoRepository
-from .services.user_service import UserService
-from .services.condo_service import CondoService
-from .cli.menu import MenuCLI
 
-def main() -> None:
+# Serviços, menu, exportadores e servidores são importados sob demanda: comandos
+# curtos (cron, scripts) só pagam pelo que usam.
+
+def main(argv: Optional[List[str]] = None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+    t_imports = time.perf_counter()
     cfg = AppConfig.load("config.yaml")
+    t_config = time.perf_counter()
     setup_logging(cfg.log_level, cfg.log_file)
+    t_logging = time.perf_counter()
+    if [a for a in argv if a != "--profile"]:
+        from .cli.commands import run
+        startup = {
+            "imports": (t_imports - _T0) * 1000,
+            "config": (t_config - t_imports) * 1000,
+            "logging": (t_logging - t_config) * 1000,
+            "commands_import": (time.perf_counter() - t_logging) * 1000,
+        }
+        sys.exit(run(argv, cfg, startup))
     logging.getLogger(__name__).info("Iniciando EVCharge Manager")
 
-
-    # DI: injeta implementações concretas
-    db = SQLiteDatabase(cfg.database_path)
-    users_repo = UserRepository(db)
-    condos_repo = CondoRepository(db)
-
-
-    user_service = UserService(users_repo, condos_repo)
-    condo_service = CondoService(condos_repo, users_repo)
-
-
-    cli = MenuCLI(user_service, condo_service, export_dir=cfg.export_path)
-    cli.run()
+    from .bootstrap import build_context
+    from .cli.menu import MenuCLI
+    from .profiling import make_profiler
+
+    recorder = None
+    record_path = os.getenv("EVCHARGE_RECORD")
+    if record_path:
+        from .cli.replay import MenuRecorder
+        recorder = MenuRecorder(record_path)
+    ctx = build_context(cfg)
+    cli = MenuCLI(
+        ctx.user_service, ctx.condo_service, export_dir=cfg.export_path,
+        echo_rows=cfg.echo_rows, rfid_service=ctx.rfid_service,
+        profiler=make_profiler(cfg.export_path, "--profile" in argv),
+        recorder=recorder,
+    )
+    try:
+        cli.run()
+    finally:
+        ctx.close()
+        if recorder is not None:
+            recorder.close()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
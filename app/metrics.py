@@ -0,0 +1,324 @@
+"""Métricas em processo: contadores, gauges e histogramas de latência.
+
+Nada aqui é global: cada ``AppContext`` tem o seu ``MetricsRegistry``. Com as
+métricas desligadas nenhum objeto é instrumentado (custo zero no caminho
+quente); ligadas, ``instrument`` envolve os métodos públicos de uma instância
+e mede chamadas, erros e latência por ``component``/``method``.
+"""
+from __future__ import annotations
+import functools
+import inspect
+import os
+import threading
+import time
+from bisect import bisect_left
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+PREFIX = "evcharge"
+# segundos; cobre de um acerto no índice RFID (µs) a uma importação grande
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+Labels = Tuple[str, ...]
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, *labels: str) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        with self._lock:
+            return self._values.get(labels, 0.0)
+
+    def samples(self) -> List[Tuple[str, Labels, float]]:
+        with self._lock:
+            return [("", k, v) for k, v in sorted(self._values.items())]
+
+
+class Gauge(Counter):
+    def set(self, value: float, *labels: str) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+    def dec(self, amount: float = 1.0, *labels: str) -> None:
+        self.inc(-amount, *labels)
+
+
+class Histogram:
+    """Histograma cumulativo no formato Prometheus (``_bucket``, ``_sum``, ``_count``).
+
+    Cada conjunto de labels é uma lista ``[n_bucket..., n_inf, soma, máximo]``;
+    ``series()`` a devolve para o caminho quente gravar sem busca por labels.
+    """
+
+    def __init__(
+        self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Labels, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def series(self, *labels: str) -> List[float]:
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0, 0.0]
+            return series
+
+    def observe(self, value: float, *labels: str) -> None:
+        self.record(self.series(*labels), value)
+
+    def record(self, series: List[float], value: float) -> None:
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            series[i] += 1
+            series[-2] += value
+            if value > series[-1]:
+                series[-1] = value
+
+    def sum(self, *labels: str) -> float:
+        with self._lock:
+            return self._series[labels][-2] if labels in self._series else 0.0
+
+    def count(self, *labels: str) -> int:
+        with self._lock:
+            return int(sum(self._series[labels][:-2])) if labels in self._series else 0
+
+    def quantile(self, q: float, *labels: str) -> Optional[float]:
+        """Estimativa por interpolação linear dentro do bucket (como ``histogram_quantile``)."""
+        with self._lock:
+            series = list(self._series.get(labels, ()))
+        total = sum(series[:-2])
+        if not total:
+            return None
+        counts, highest = series[:-2], series[-1]
+        rank = q * total
+        seen = 0
+        for i, n in enumerate(counts):
+            if seen + n >= rank and n:
+                if i == len(self.buckets):
+                    return highest
+                lower = self.buckets[i - 1] if i else 0.0
+                # nunca acima do maior valor observado (poucas amostras num bucket largo)
+                return min(highest, lower + (self.buckets[i] - lower) * (rank - seen) / n)
+            seen += n
+        return highest
+
+    def label_sets(self) -> List[Labels]:
+        with self._lock:
+            return sorted(k for k, v in self._series.items() if any(v[:-2]))
+
+    def samples(self) -> List[Tuple[str, Labels, float]]:
+        out: List[Tuple[str, Labels, float]] = []
+        with self._lock:
+            items = [(k, list(v)) for k, v in sorted(self._series.items())]
+        for labels, series in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets, series):
+                cumulative += n
+                out.append(("_bucket", labels + (_fmt(bound),), cumulative))
+            total = cumulative + series[len(self.buckets)]
+            out.append(("_bucket", labels + ("+Inf",), total))
+            out.append(("_sum", labels, series[-2]))
+            out.append(("_count", labels, total))
+        return out
+
+
+class MetricsRegistry:
+    def __init__(self, enabled: bool = False) -> None:
+        self.enabled = enabled
+        self._metrics: Dict[str, Any] = {}
+        self._collectors: Dict[str, Callable[[], Mapping[str, float]]] = {}
+        self._lock = threading.Lock()
+        # o número de chamadas é o _count do histograma
+        self.errors = self.counter("errors_total", "Chamadas que terminaram com exceção.", ("component", "method"))
+        self.latency = self.histogram("call_seconds", "Latência das chamadas (s).", ("component", "method"))
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(f"{PREFIX}_{name}", help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(f"{PREFIX}_{name}", help, labelnames))
+
+    def histogram(
+        self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(f"{PREFIX}_{name}", help, labelnames, buckets))
+
+    def add_collector(self, name: str, stats: Callable[[], Mapping[str, float]]) -> None:
+        """Expõe um ``stats()`` existente (pool, cache, índice RFID...) como gauges
+        ``evcharge_<name>_<chave>``, lidos só na hora de exportar."""
+        with self._lock:
+            self._collectors[name] = stats
+
+    def collect(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            collectors = list(self._collectors.items())
+        return {name: {k: float(v) for k, v in fn().items()} for name, fn in collectors}
+
+    def render_prometheus(self) -> str:
+        """Texto no formato de exposição do Prometheus (0.0.4)."""
+        lines: List[str] = []
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for m in metrics:
+            kind = "histogram" if isinstance(m, Histogram) else "gauge" if isinstance(m, Gauge) else "counter"
+            lines.append(f"# HELP {m.name} {m.help}")
+            lines.append(f"# TYPE {m.name} {kind}")
+            names = m.labelnames + (("le",) if kind == "histogram" else ())
+            for suffix, labels, value in m.samples():
+                lines.append(f"{m.name}{suffix}{_labels(names, labels)} {_fmt(value)}")
+        for name, values in self.collect().items():
+            for key, value in values.items():
+                metric = f"{PREFIX}_{name}_{key}"
+                lines.append(f"# TYPE {metric} gauge")
+                lines.append(f"{metric} {_fmt(value)}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str) -> None:
+        """Grava atomicamente (para o textfile collector do node_exporter)."""
+        write_atomic(path, self.render_prometheus())
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """Uma linha por método chamado: chamadas, erros, total e p50/p99 (ms)."""
+        rows = []
+        for labels in self.latency.label_sets():
+            p50, p99 = self.latency.quantile(0.5, *labels), self.latency.quantile(0.99, *labels)
+            rows.append({
+                "component": labels[0],
+                "method": labels[1],
+                "calls": self.latency.count(*labels),
+                "errors": int(self.errors.value(*labels)),
+                "total_ms": round(self.latency.sum(*labels) * 1000, 3),
+                "p50_ms": round((p50 or 0.0) * 1000, 3),
+                "p99_ms": round((p99 or 0.0) * 1000, 3),
+            })
+        return rows
+
+    def _register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Métrica já registrada: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+
+def write_atomic(path: str, text: str) -> None:
+    """Escreve ao lado do destino e troca com ``os.replace``: quem lê nunca vê
+    um arquivo pela metade."""
+    target = Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(target.name + ".tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, target)
+
+
+def instrument(obj: Any, registry: MetricsRegistry, component: Optional[str] = None) -> Any:
+    """Troca os métodos públicos de ``obj`` (na instância) por versões medidas.
+
+    Chamadas internas via ``self.metodo`` também passam pela versão medida.
+    Em geradores, a latência cobre a iteração inteira, até o fim ou ``close()``.
+    Não faz nada com as métricas desligadas.
+    """
+    if not registry.enabled:
+        return obj
+    component = component or type(obj).__name__
+    for name, func in inspect.getmembers(type(obj), inspect.isfunction):
+        if name.startswith("_"):
+            continue
+        bound = getattr(obj, name)
+        wrapper = _wrap_generator if inspect.isgeneratorfunction(func) else _wrap
+        setattr(obj, name, wrapper(bound, registry, (component, name)))
+    return obj
+
+
+def _wrap(fn: Callable[..., Any], registry: MetricsRegistry, labels: Labels) -> Callable[..., Any]:
+    errors, record, series = registry.errors, registry.latency.record, registry.latency.series(*labels)
+    clock = time.perf_counter
+
+    @functools.wraps(fn)
+    def timed(*args: Any, **kwargs: Any) -> Any:
+        start = clock()
+        try:
+            return fn(*args, **kwargs)
+        except BaseException:
+            errors.inc(1.0, *labels)
+            raise
+        finally:
+            record(series, clock() - start)
+
+    return timed
+
+
+def _wrap_generator(fn: Callable[..., Iterator[Any]], registry: MetricsRegistry, labels: Labels) -> Callable[..., Any]:
+    errors, record, series = registry.errors, registry.latency.record, registry.latency.series(*labels)
+    clock = time.perf_counter
+
+    @functools.wraps(fn)
+    def timed(*args: Any, **kwargs: Any) -> Iterator[Any]:
+        start = clock()
+        try:
+            yield from fn(*args, **kwargs)
+        except GeneratorExit:
+            raise
+        except BaseException:
+            errors.inc(1.0, *labels)
+            raise
+        finally:
+            record(series, clock() - start)
+
+    return timed
+
+
+class PeriodicDump:
+    """Regrava o arquivo Prometheus a cada ``interval`` segundos (thread daemon);
+    com ``interval <= 0`` grava só no ``close()``."""
+
+    def __init__(self, registry: MetricsRegistry, path: str, interval: float) -> None:
+        self.registry = registry
+        self.path = path
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        if interval > 0:
+            self._thread = threading.Thread(target=self._run, name="evcharge-metrics", daemon=True)
+            self._thread.start()
+
+    def close(self) -> None:
+        """Para a thread e grava uma última vez."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.registry.write_prometheus(self.path)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.registry.write_prometheus(self.path)
+
+
+def _labels(names: Sequence[str], values: Labels) -> str:
+    if not values:
+        return ""
+    pairs = (f'{n}="{_escape(v)}"' for n, v in zip(names, values))
+    return "{" + ",".join(pairs) + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt(value: float) -> str:
+    return repr(int(value)) if float(value).is_integer() else repr(float(value))
@@ -0,0 +1,103 @@
+"""Perfilamento sob demanda (cProfile) de operações do menu e dos comandos em lote.
+
+Ligado por ``EVCHARGE_PROFILE=1`` ou pela flag ``--profile``. Cada operação gera,
+em ``<export_path>/profiles``, um ``.pstats`` (para ``snakeviz``/``pstats``) e um
+``.txt`` com as N funções mais caras, com o nome da operação e o tamanho dos
+dados (registros importados/exportados) no nome do arquivo.
+"""
+from __future__ import annotations
+import io
+import logging
+import os
+import re
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterator, Optional
+from .config import _as_bool
+
+if TYPE_CHECKING:
+    import cProfile
+
+logger = logging.getLogger(__name__)
+
+ENV_FLAG = "EVCHARGE_PROFILE"
+ENV_TOP = "EVCHARGE_PROFILE_TOP"
+
+
+class ProfileRun:
+    """Uma operação perfilada; ``size`` pode ser preenchido pela operação."""
+
+    def __init__(self, operation: str) -> None:
+        self.operation = operation
+        self.size: Optional[int] = None
+        self.elapsed: float = 0.0
+        self.pstats_path: Optional[Path] = None
+        self.summary_path: Optional[Path] = None
+
+
+class Profiler:
+    def __init__(self, out_dir: str, top_n: int = 40) -> None:
+        self.out_dir = Path(out_dir)
+        self.top_n = top_n
+        self.current: Optional[ProfileRun] = None
+
+    @contextmanager
+    def profile(self, operation: str) -> Iterator[ProfileRun]:
+        run = ProfileRun(operation)
+        if self.current is not None:  # cProfile não aninha: a operação externa já cobre esta
+            yield run
+            return
+        import cProfile
+
+        self.current = run
+        prof = cProfile.Profile()
+        start = time.perf_counter()
+        prof.enable()
+        try:
+            yield run
+        finally:
+            prof.disable()
+            run.elapsed = time.perf_counter() - start
+            self.current = None
+            self._write(prof, run)
+
+    def note_size(self, size: int) -> None:
+        """Registra o tamanho dos dados da operação em andamento (se houver)."""
+        if self.current is not None:
+            self.current.size = size
+
+    def _write(self, prof: "cProfile.Profile", run: ProfileRun) -> None:
+        import pstats
+
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        stem = f"{time.strftime('%Y%m%d-%H%M%S')}_{_slug(run.operation)}"
+        if run.size is not None:
+            stem += f"_{run.size}"
+        run.pstats_path = self.out_dir / f"{stem}.pstats"
+        run.summary_path = self.out_dir / f"{stem}.txt"
+        prof.dump_stats(str(run.pstats_path))
+        out = io.StringIO()
+        out.write(f"Operação: {run.operation}\n")
+        out.write(f"Tamanho: {run.size if run.size is not None else '-'}\n")
+        out.write(f"Tempo total: {run.elapsed:.3f} s\n\n")
+        for sort, title in (("cumulative", "tempo acumulado"), ("tottime", "tempo próprio")):
+            out.write(f"=== Top {self.top_n} por {title} ===\n")
+            pstats.Stats(prof, stream=out).strip_dirs().sort_stats(sort).print_stats(self.top_n)
+        run.summary_path.write_text(out.getvalue(), encoding="utf-8")
+        logger.info("Perfil de '%s' gravado em %s", run.operation, run.pstats_path)
+
+
+def profiling_enabled(flag: bool = False) -> bool:
+    return flag or _as_bool(os.getenv(ENV_FLAG, ""))
+
+
+def make_profiler(export_dir: str, flag: bool = False) -> Optional[Profiler]:
+    """``Profiler`` gravando em ``<export_dir>/profiles`` se ligado; senão ``None``."""
+    if not profiling_enabled(flag):
+        return None
+    return Profiler(os.path.join(export_dir, "profiles"), top_n=int(os.getenv(ENV_TOP, 40)))
+
+
+def _slug(name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]+", "-", name).strip("-") or "op"
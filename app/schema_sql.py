@@ -1,7 +1,5 @@
 # app/schema_sql.py
 SCHEMA_SQL = """
-PRAGMA foreign_keys = ON;
-
 CREATE TABLE IF NOT EXISTS condos (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     name TEXT NOT NULL UNIQUE,
@@ -26,3 +24,101 @@ CREATE TABLE IF NOT EXISTS users (
     FOREIGN KEY (condo) REFERENCES condos(name) ON UPDATE CASCADE ON DELETE RESTRICT
 );
 """
+
+# Migrações numeradas, aplicadas uma única vez em ordem (PRAGMA user_version).
+# Nunca altere uma migração já publicada: acrescente uma nova.
+MIGRATIONS = [
+    (1, "Esquema inicial (condos, users)", SCHEMA_SQL),
+    (2, "Índices para users.name e users.condo", """
+CREATE INDEX IF NOT EXISTS idx_users_name ON users(name);
+CREATE INDEX IF NOT EXISTS idx_users_condo ON users(condo);
+"""),
+    (3, "users.condo (TEXT) -> users.condo_id (INTEGER FK para condos.id)", """
+-- Usuários órfãos (condomínio renomeado quando a FK ainda não era aplicada)
+-- preservam o vínculo por meio de um condomínio provisório com o nome antigo.
+INSERT INTO condos(name, apartments_count, chargers_count, charger_type, state, energy_price)
+SELECT DISTINCT u.condo, 0, 0, 'Lento', '', 0
+FROM users u
+WHERE NOT EXISTS (SELECT 1 FROM condos c WHERE c.name = u.condo);
+
+CREATE TABLE users_new (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    apartment TEXT NOT NULL,
+    condo_id INTEGER NOT NULL REFERENCES condos(id) ON DELETE RESTRICT,
+    plate_ending TEXT NOT NULL, -- últimos 2 dígitos
+    vehicle_type TEXT NOT NULL, -- híbrido ou elétrico
+    rfid_code TEXT NOT NULL UNIQUE,
+    last_cost REAL,
+    last_energy REAL,
+    last_time_minutes REAL
+);
+
+INSERT INTO users_new(id, name, apartment, condo_id, plate_ending, vehicle_type, rfid_code, last_cost, last_energy, last_time_minutes)
+SELECT u.id, u.name, u.apartment, c.id, u.plate_ending, u.vehicle_type, u.rfid_code, u.last_cost, u.last_energy, u.last_time_minutes
+FROM users u JOIN condos c ON c.name = u.condo;
+
+-- preserva o contador AUTOINCREMENT (ids de usuários excluídos não são reutilizados)
+INSERT INTO sqlite_sequence(name, seq)
+SELECT 'users_new', seq FROM sqlite_sequence
+WHERE name = 'users' AND NOT EXISTS (SELECT 1 FROM sqlite_sequence WHERE name = 'users_new');
+UPDATE sqlite_sequence
+SET seq = MAX(seq, COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'users'), 0))
+WHERE name = 'users_new';
+
+DROP TABLE users;
+ALTER TABLE users_new RENAME TO users;
+CREATE INDEX idx_users_name ON users(name);
+CREATE INDEX idx_users_condo_id ON users(condo_id);
+"""),
+    (4, "Histórico de sessões de recarga (charging_sessions)", """
+-- Tabela de apêndice: chave clusterizada (user_id, ended_at), sem rowid e
+-- sem índices secundários. users.last_* passa a ser a projeção da sessão
+-- mais recente, mantida pelo próprio repositório na mesma transação.
+CREATE TABLE charging_sessions (
+    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    started_at INTEGER NOT NULL, -- epoch em milissegundos
+    ended_at INTEGER NOT NULL, -- epoch em milissegundos
+    condo_id INTEGER NOT NULL, -- condomínio do usuário no momento da recarga
+    energy_kwh REAL NOT NULL,
+    cost REAL NOT NULL,
+    duration_minutes REAL NOT NULL,
+    PRIMARY KEY (user_id, ended_at)
+) WITHOUT ROWID;
+
+-- a última medida já registrada vira a primeira sessão do histórico
+INSERT INTO charging_sessions(user_id, started_at, ended_at, condo_id, energy_kwh, cost, duration_minutes)
+SELECT id,
+       CAST(strftime('%s', 'now') AS INTEGER) * 1000 - CAST(ROUND(last_time_minutes * 60000) AS INTEGER),
+       CAST(strftime('%s', 'now') AS INTEGER) * 1000,
+       condo_id, last_energy, last_cost, last_time_minutes
+FROM users
+WHERE last_energy IS NOT NULL AND last_cost IS NOT NULL AND last_time_minutes IS NOT NULL;
+"""),
+    (5, "charging_sessions com chave substituta e transaction_id como chave de idempotência", """
+-- A chave (user_id, ended_at) descartava medidas distintas do mesmo usuário no
+-- mesmo milissegundo. Cada sessão ganha um id próprio; reenvios só são
+-- descartados quando trazem o mesmo transaction_id.
+CREATE TABLE charging_sessions_new (
+    id INTEGER PRIMARY KEY,
+    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    started_at INTEGER NOT NULL, -- epoch em milissegundos
+    ended_at INTEGER NOT NULL, -- epoch em milissegundos
+    condo_id INTEGER NOT NULL, -- condomínio do usuário no momento da recarga
+    energy_kwh REAL NOT NULL,
+    cost REAL NOT NULL,
+    duration_minutes REAL NOT NULL,
+    transaction_id TEXT -- ex.: transação OCPP; NULL = sem deduplicação
+);
+
+INSERT INTO charging_sessions_new(user_id, started_at, ended_at, condo_id, energy_kwh, cost, duration_minutes)
+SELECT user_id, started_at, ended_at, condo_id, energy_kwh, cost, duration_minutes
+FROM charging_sessions ORDER BY user_id, ended_at;
+
+DROP TABLE charging_sessions;
+ALTER TABLE charging_sessions_new RENAME TO charging_sessions;
+CREATE INDEX idx_sessions_user_ended ON charging_sessions(user_id, ended_at);
+CREATE UNIQUE INDEX idx_sessions_user_tx ON charging_sessions(user_id, transaction_id)
+    WHERE transaction_id IS NOT NULL;
+"""),
+]
@@ -0,0 +1,208 @@
+from __future__ import annotations
+import asyncio
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Optional
+from ..domain.models import RfidEntry
+from ..services.rfid_service import RfidAuthorizationService
+from ..services.user_service import UserService
+
+logger = logging.getLogger(__name__)
+
+MAX_LINE_BYTES = 64 * 1024
+
+Response = Dict[str, Any]
+
+
+class AuthorizationServer:
+    """Servidor TCP (asyncio) para carregadores, em JSON delimitado por linha.
+
+    Cada linha é um pedido ``{"id": ..., "op": ...}`` e recebe exatamente uma
+    linha de resposta, na mesma ordem dos pedidos (pipelining: o cliente pode
+    enviar vários sem esperar). Operações:
+
+    - ``authorize``: ``rfid`` e, opcionalmente, ``condo_id`` do carregador;
+    - ``measure``: ``user_id`` ou ``rfid``, ``energy_kwh``, ``cost``, ``minutes``;
+    - ``ping``.
+
+    Autorizações resolvidas pelo índice em memória respondem no próprio laço;
+    o que toca o SQLite roda num ``ThreadPoolExecutor``.
+    """
+
+    def __init__(
+        self,
+        user_service: UserService,
+        rfid_service: RfidAuthorizationService,
+        host: str = "127.0.0.1",
+        port: int = 8765,
+        max_workers: int = 8,
+        max_pipeline: int = 64,
+    ) -> None:
+        if max_pipeline < 1:
+            raise ValueError("max_pipeline deve ser >= 1.")
+        self.user_service = user_service
+        self.rfid_service = rfid_service
+        self.host = host
+        self.port = port
+        self.max_pipeline = max_pipeline
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="evcharge-auth")
+        self._server: Optional[asyncio.base_events.Server] = None
+        self._ops: Dict[str, Callable[[Dict[str, Any]], Awaitable[Response]]] = {
+            "authorize": self._op_authorize,
+            "measure": self._op_measure,
+            "ping": self._op_ping,
+        }
+        self._connections = 0
+        self._requests = 0
+        self._errors = 0
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle, self.host, self.port, limit=MAX_LINE_BYTES)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info("Servidor de autorização ouvindo em %s:%s", self.host, self.port)
+
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            await self.start()
+        async with self._server:  # type: ignore[union-attr]
+            await self._server.serve_forever()  # type: ignore[union-attr]
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        self.executor.shutdown(wait=True)
+
+    def stats(self) -> Dict[str, int]:
+        return {"connections": self._connections, "requests": self._requests, "errors": self._errors}
+
+    # --- conexão ------------------------------------------------------------
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._connections += 1
+        # fila limitada de respostas em andamento: preserva a ordem e aplica backpressure
+        pending: "asyncio.Queue[Optional[Awaitable[Response]]]" = asyncio.Queue(self.max_pipeline)
+        sender = asyncio.create_task(self._send(pending, writer))
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:  # linha acima de MAX_LINE_BYTES
+                    await pending.put(_done({"id": None, "ok": False, "error": "Pedido grande demais."}))
+                    break
+                if not line:
+                    break
+                if line.strip():
+                    await pending.put(self._dispatch(line))
+            await pending.put(None)
+            await sender
+        except ConnectionError:
+            sender.cancel()
+        except asyncio.CancelledError:
+            # servidor encerrando: não repassa o cancelamento ao callback do asyncio.streams
+            sender.cancel()
+        finally:
+            writer.close()
+            self._connections -= 1
+
+    async def _send(self, pending: "asyncio.Queue[Optional[Awaitable[Response]]]", writer: asyncio.StreamWriter) -> None:
+        broken = False
+        while True:
+            item = await pending.get()
+            if item is None:
+                break
+            resp = await item
+            if broken:
+                continue  # cliente sumiu: só esvazia a fila para o leitor não travar
+            try:
+                writer.write(json.dumps(resp, ensure_ascii=False).encode() + b"\n")
+                if pending.empty():
+                    await writer.drain()
+            except ConnectionError:
+                broken = True
+        if not broken:
+            try:
+                await writer.drain()
+            except ConnectionError:
+                pass
+
+    def _dispatch(self, line: bytes) -> Awaitable[Response]:
+        self._requests += 1
+        try:
+            req = json.loads(line)
+            if not isinstance(req, dict):
+                raise ValueError("Pedido deve ser um objeto JSON.")
+        except ValueError as e:
+            self._errors += 1
+            return _done({"id": None, "ok": False, "error": f"JSON inválido: {e}"})
+        op = self._ops.get(req.get("op"))  # type: ignore[arg-type]
+        if op is None:
+            self._errors += 1
+            return _done({"id": req.get("id"), "ok": False, "error": f"Operação desconhecida: {req.get('op')}"})
+        if req.get("op") == "authorize":
+            # caminho rápido: responde do índice sem criar tarefa nem usar thread
+            answered, entry = self.rfid_service.try_authorize(str(req.get("rfid", "")))
+            if answered:
+                try:
+                    return _done(_authorize_response(req, entry))
+                except (TypeError, ValueError):
+                    pass  # condo_id inválido: o caminho normal devolve o erro
+        return asyncio.ensure_future(self._guard(req, op))
+
+    async def _guard(self, req: Dict[str, Any], op: Callable[[Dict[str, Any]], Awaitable[Response]]) -> Response:
+        try:
+            resp = await op(req)
+        except (KeyError, TypeError, ValueError) as e:
+            self._errors += 1
+            msg = f"Campo obrigatório ausente: {e}" if isinstance(e, KeyError) else str(e)
+            return {"id": req.get("id"), "ok": False, "error": msg}
+        except Exception as e:
+            self._errors += 1
+            logger.exception("Erro ao processar %s", req.get("op"))
+            return {"id": req.get("id"), "ok": False, "error": f"Erro interno: {e}"}
+        resp["id"] = req.get("id")
+        return resp
+
+    async def _blocking(self, fn: Callable[..., Any], *args: Any) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+
+    # --- operações -------------------------------------------------------
+    async def _op_ping(self, req: Dict[str, Any]) -> Response:
+        return {"ok": True}
+
+    async def _op_authorize(self, req: Dict[str, Any]) -> Response:
+        entry = await self._blocking(self.rfid_service.authorize, str(req["rfid"]))
+        return _authorize_response(req, entry)
+
+    async def _op_measure(self, req: Dict[str, Any]) -> Response:
+        user_id = req.get("user_id")
+        if user_id is None:
+            entry = await self._blocking(self.rfid_service.authorize, str(req["rfid"]))
+            if entry is None:
+                raise ValueError("RFID não autorizado.")
+            user_id = entry.user_id
+        await self._blocking(
+            self.user_service.set_last_measure,
+            int(user_id), float(req["energy_kwh"]), float(req["cost"]), float(req["minutes"]),
+        )
+        return {"ok": True, "user_id": int(user_id)}
+
+
+def _authorize_response(req: Dict[str, Any], entry: Optional[RfidEntry]) -> Response:
+    resp: Response = {"id": req.get("id"), "ok": True, "authorized": False}
+    if entry is None:
+        resp["reason"] = "unknown_tag"
+        return resp
+    condo_id = req.get("condo_id")
+    if condo_id is not None and int(condo_id) != entry.condo_id:
+        resp["reason"] = "wrong_condo"
+        return resp
+    resp.update(authorized=True, user_id=entry.user_id, condo_id=entry.condo_id, vehicle_type=entry.vehicle_type)
+    return resp
+
+
+def _done(resp: Response) -> "asyncio.Future[Response]":
+    fut: "asyncio.Future[Response]" = asyncio.get_running_loop().create_future()
+    fut.set_result(resp)
+    return fut
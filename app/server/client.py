@@ -0,0 +1,66 @@
+from __future__ import annotations
+import asyncio
+import itertools
+import json
+from typing import Any, Dict, Optional
+from .auth_server import MAX_LINE_BYTES
+
+
+class AuthorizationClient:
+    """Cliente asyncio do ``AuthorizationServer``.
+
+    Vários ``request`` podem estar em andamento na mesma conexão (pipelining);
+    as respostas são casadas com os pedidos pelo campo ``id``.
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._reader = reader
+        self._writer = writer
+        self._ids = itertools.count(1)
+        self._waiting: Dict[int, "asyncio.Future[Dict[str, Any]]"] = {}
+        self._receiver = asyncio.create_task(self._receive())
+
+    @classmethod
+    async def connect(cls, host: str = "127.0.0.1", port: int = 8765) -> "AuthorizationClient":
+        reader, writer = await asyncio.open_connection(host, port, limit=MAX_LINE_BYTES)
+        return cls(reader, writer)
+
+    async def request(self, op: str, **fields: Any) -> Dict[str, Any]:
+        req_id = next(self._ids)
+        fut: "asyncio.Future[Dict[str, Any]]" = asyncio.get_running_loop().create_future()
+        self._waiting[req_id] = fut
+        self._writer.write(json.dumps({"id": req_id, "op": op, **fields}).encode() + b"\n")
+        await self._writer.drain()
+        return await fut
+
+    async def authorize(self, rfid: str, condo_id: Optional[int] = None) -> Dict[str, Any]:
+        return await self.request("authorize", rfid=rfid, condo_id=condo_id)
+
+    async def measure(self, rfid: str, energy_kwh: float, cost: float, minutes: float) -> Dict[str, Any]:
+        return await self.request("measure", rfid=rfid, energy_kwh=energy_kwh, cost=cost, minutes=minutes)
+
+    async def close(self) -> None:
+        self._writer.close()
+        try:
+            await self._writer.wait_closed()
+        except ConnectionError:
+            pass
+        await self._receiver
+
+    async def _receive(self) -> None:
+        error: BaseException = ConnectionError("Conexão encerrada pelo servidor.")
+        try:
+            while True:
+                line = await self._reader.readline()
+                if not line:
+                    break
+                resp = json.loads(line)
+                fut = self._waiting.pop(resp.get("id"), None)
+                if fut is not None and not fut.done():
+                    fut.set_result(resp)
+        except (ConnectionError, ValueError) as e:
+            error = e
+        for fut in self._waiting.values():
+            if not fut.done():
+                fut.set_exception(error)
+        self._waiting.clear()
@@ -0,0 +1,324 @@
+from __future__ import annotations
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import asdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Pattern, Tuple
+from urllib.parse import parse_qs, urlsplit
+from ..domain.models import Condo, Page
+from ..services.condo_service import CondoService
+from ..services.user_service import UserService
+
+logger = logging.getLogger(__name__)
+
+MAX_BODY_BYTES = 16 * 1024 * 1024
+
+Result = Tuple[int, Any]
+Handler = Callable[["HttpApi", "re.Match[str]", Dict[str, str], Any], Result]
+
+USER_FIELDS = ("name", "apartment", "condo", "plate_ending", "vehicle_type", "rfid_code")
+CONDO_FIELDS = ("name", "apartments_count", "chargers_count", "charger_type", "state", "energy_price")
+
+
+class HttpError(Exception):
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+class HttpApi:
+    """API HTTP/JSON (stdlib ``ThreadingHTTPServer``) sobre ``UserService`` e ``CondoService``.
+
+    Uma thread por conexão, com keep-alive (HTTP/1.1). Leituras rodam em
+    paralelo (pool de conexões SQLite em WAL); escritas passam por um único
+    ``write_lock``, já que o SQLite só aceita um escritor por vez e disputar o
+    lock do banco custaria ``busy_timeout``. Toda resposta traz
+    ``Server-Timing`` e ``X-Response-Time-Ms``.
+    """
+
+    def __init__(
+        self,
+        user_service: UserService,
+        condo_service: CondoService,
+        host: str = "127.0.0.1",
+        port: int = 8080,
+    ) -> None:
+        self.user_service = user_service
+        self.condo_service = condo_service
+        self.write_lock = threading.Lock()
+        handler = type("BoundApiHandler", (ApiHandler,), {"api": self})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self.host, self.port = self.httpd.server_address[:2]
+        self._thread: Optional[threading.Thread] = None
+
+    def serve_forever(self) -> None:
+        logger.info("API HTTP ouvindo em http://%s:%s", self.host, self.port)
+        self.httpd.serve_forever()
+
+    def start(self) -> None:
+        """Atende numa thread de fundo (testes e uso embutido)."""
+        self._thread = threading.Thread(target=self.serve_forever, name="evcharge-http", daemon=True)
+        self._thread.start()
+
+    def close(self) -> None:
+        if self._thread is not None:
+            self.httpd.shutdown()
+            self._thread.join()
+            self._thread = None
+        self.httpd.server_close()
+
+    # --- usuários -----------------------------------------------------------
+    def list_users(self, m, query, body) -> Result:
+        return 200, _page(self.user_service.list_users_page(*_page_args(query)))
+
+    def get_user(self, m, query, body) -> Result:
+        user = self.user_service.get_user("id", m["id"])
+        if user is None:
+            raise HttpError(404, "Usuário não encontrado.")
+        return 200, asdict(user)
+
+    def create_user(self, m, query, body) -> Result:
+        f = _fields(body, USER_FIELDS)
+        uid = self.user_service.register_user(
+            f["name"], f["apartment"], f["condo"], f["plate_ending"], f["vehicle_type"], f["rfid_code"]
+        )
+        return 201, {"id": uid}
+
+    def create_users_batch(self, m, query, body) -> Result:
+        ok, fail, errors = self.user_service.register_many(_items(body, "users"))
+        return 200, {"created": ok, "failed": fail, "errors": errors}
+
+    def update_user(self, m, query, body) -> Result:
+        user = self.user_service.get_user("id", m["id"])
+        if user is None:
+            raise HttpError(404, "Usuário não encontrado.")
+        for k in USER_FIELDS:
+            if k in _object(body):
+                setattr(user, k, str(body[k]))
+        self.user_service.update_user(user)
+        return 200, asdict(user)
+
+    def delete_user(self, m, query, body) -> Result:
+        if self.user_service.get_user("id", m["id"]) is None:
+            raise HttpError(404, "Usuário não encontrado.")
+        self.user_service.delete_user(int(m["id"]))
+        return 204, None
+
+    def list_measurements(self, m, query, body) -> Result:
+        uid = int(m["id"])
+        if self.user_service.get_user("id", m["id"]) is None:
+            raise HttpError(404, "Usuário não encontrado.")
+        limit = int(query["limit"]) if "limit" in query else None
+        return 200, {
+            "last": self.user_service.read_last_measure(uid),
+            "sessions": [asdict(s) for s in self.user_service.list_sessions(uid, limit)],
+        }
+
+    def create_measurement(self, m, query, body) -> Result:
+        f = _fields(body, ("energy_kwh", "cost", "minutes"))
+        self.user_service.set_last_measure(int(m["id"]), float(f["energy_kwh"]), float(f["cost"]), float(f["minutes"]))
+        return 201, {"user_id": int(m["id"])}
+
+    def create_measurements_batch(self, m, query, body) -> Result:
+        rows = [
+            (int(x["user_id"]), float(x["energy_kwh"]), float(x["cost"]), float(x["minutes"]))
+            for x in _items(body, "measurements")
+        ]
+        written, errors = self.user_service.record_measures(rows)
+        return 200, {"written": written, "errors": [{"index": i, "error": msg} for i, msg in errors]}
+
+    # --- condomínios -------------------------------------------------------
+    def list_condos(self, m, query, body) -> Result:
+        return 200, _page(self.condo_service.list_condos_page(*_page_args(query)))
+
+    def get_condo(self, m, query, body) -> Result:
+        condo = self.condo_service.get_condo("id", m["id"])
+        if condo is None:
+            raise HttpError(404, "Condomínio não encontrado.")
+        return 200, asdict(condo)
+
+    def create_condo(self, m, query, body) -> Result:
+        c = _condo(body)
+        cid = self.condo_service.register_condo(
+            c.name, c.apartments_count, c.chargers_count, c.charger_type, c.state, c.energy_price
+        )
+        return 201, {"id": cid}
+
+    def create_condos_batch(self, m, query, body) -> Result:
+        return 200, {"created": self.condo_service.register_many([_condo(x) for x in _items(body, "condos")])}
+
+    def update_condo(self, m, query, body) -> Result:
+        condo = self.condo_service.get_condo("id", m["id"])
+        if condo is None:
+            raise HttpError(404, "Condomínio não encontrado.")
+        merged = _condo({**asdict(condo), **_object(body)})
+        merged.id = condo.id
+        self.condo_service.update_condo(merged)
+        return 200, asdict(merged)
+
+    def delete_condo(self, m, query, body) -> Result:
+        ok, msg = self.condo_service.delete_condo(int(m["id"]))
+        if not ok:
+            raise HttpError(404 if "não encontrado" in msg else 409, msg)
+        return 204, None
+
+    def health(self, m, query, body) -> Result:
+        return 200, {"status": "ok"}
+
+
+# (método, rota, função, escreve?)
+ROUTES: List[Tuple[str, Pattern[str], Handler, bool]] = [
+    (method, re.compile(f"^{pattern}$"), fn, write)  # type: ignore[misc]
+    for method, pattern, fn, write in (
+        ("GET", r"/health", HttpApi.health, False),
+        ("GET", r"/users", HttpApi.list_users, False),
+        ("POST", r"/users", HttpApi.create_user, True),
+        ("POST", r"/users/batch", HttpApi.create_users_batch, True),
+        ("GET", r"/users/(?P<id>\d+)", HttpApi.get_user, False),
+        ("PUT", r"/users/(?P<id>\d+)", HttpApi.update_user, True),
+        ("DELETE", r"/users/(?P<id>\d+)", HttpApi.delete_user, True),
+        ("GET", r"/users/(?P<id>\d+)/measurements", HttpApi.list_measurements, False),
+        ("POST", r"/users/(?P<id>\d+)/measurements", HttpApi.create_measurement, True),
+        ("POST", r"/measurements/batch", HttpApi.create_measurements_batch, True),
+        ("GET", r"/condos", HttpApi.list_condos, False),
+        ("POST", r"/condos", HttpApi.create_condo, True),
+        ("POST", r"/condos/batch", HttpApi.create_condos_batch, True),
+        ("GET", r"/condos/(?P<id>\d+)", HttpApi.get_condo, False),
+        ("PUT", r"/condos/(?P<id>\d+)", HttpApi.update_condo, True),
+        ("DELETE", r"/condos/(?P<id>\d+)", HttpApi.delete_condo, True),
+    )
+]
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    api: HttpApi
+
+    def do_GET(self) -> None:
+        self._dispatch("GET")
+
+    def do_POST(self) -> None:
+        self._dispatch("POST")
+
+    def do_PUT(self) -> None:
+        self._dispatch("PUT")
+
+    def do_DELETE(self) -> None:
+        self._dispatch("DELETE")
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+    def _dispatch(self, method: str) -> None:
+        t0 = time.perf_counter()
+        url = urlsplit(self.path)
+        try:
+            body = self._read_body()
+            fn, match, write = self._route(method, url.path)
+            query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            if write:
+                with self.api.write_lock:
+                    status, payload = fn(self.api, match, query, body)
+            else:
+                status, payload = fn(self.api, match, query, body)
+        except HttpError as e:
+            status, payload = e.status, {"error": str(e)}
+        except sqlite3.IntegrityError as e:
+            status, payload = 409, {"error": str(e)}
+        except (KeyError, TypeError, ValueError) as e:
+            msg = f"Campo obrigatório ausente: {e}" if isinstance(e, KeyError) else str(e)
+            # serviços sinalizam registro inexistente com ValueError ("Usuário não encontrado.")
+            status, payload = (404 if isinstance(e, ValueError) and "não encontrado" in msg else 400), {"error": msg}
+        except Exception as e:
+            logger.exception("Erro em %s %s", method, url.path)
+            status, payload = 500, {"error": f"Erro interno: {e}"}
+        self._send(status, payload, (time.perf_counter() - t0) * 1000)
+
+    def _route(self, method: str, path: str) -> Tuple[Handler, "re.Match[str]", bool]:
+        allowed = False
+        for m, pattern, fn, write in ROUTES:
+            match = pattern.match(path.rstrip("/") or "/")
+            if match:
+                if m == method:
+                    return fn, match, write
+                allowed = True
+        raise HttpError(405 if allowed else 404, "Método não permitido." if allowed else "Rota não encontrada.")
+
+    def _read_body(self) -> Any:
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            self.close_connection = True  # sem tamanho válido não há como achar o fim do corpo
+            raise HttpError(400, "Content-Length inválido.")
+        if length > MAX_BODY_BYTES:
+            self.close_connection = True  # não vamos ler o corpo: a conexão não pode ser reaproveitada
+            raise HttpError(413, "Corpo grande demais.")
+        if not length:
+            return None
+        try:
+            return json.loads(self.rfile.read(length))
+        except ValueError as e:
+            raise HttpError(400, f"JSON inválido: {e}") from None
+
+    def _send(self, status: int, payload: Any, elapsed_ms: float) -> None:
+        data = b"" if payload is None else json.dumps(payload, ensure_ascii=False).encode()
+        self.send_response(status)
+        if data:
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("Server-Timing", f"app;dur={elapsed_ms:.3f}")
+        self.send_header("X-Response-Time-Ms", f"{elapsed_ms:.3f}")
+        if self.close_connection:
+            self.send_header("Connection", "close")  # avisa o cliente para não reaproveitar
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def _object(body: Any) -> Dict[str, Any]:
+    if not isinstance(body, dict):
+        raise HttpError(400, "Corpo deve ser um objeto JSON.")
+    return body
+
+
+def _fields(body: Any, names: Tuple[str, ...]) -> Dict[str, Any]:
+    body = _object(body)
+    missing = [n for n in names if n not in body]
+    if missing:
+        raise HttpError(400, f"Campos obrigatórios ausentes: {', '.join(missing)}")
+    return body
+
+
+def _items(body: Any, key: str) -> List[Dict[str, Any]]:
+    items = _object(body).get(key)
+    if not isinstance(items, list) or not all(isinstance(x, dict) for x in items):
+        raise HttpError(400, f"'{key}' deve ser uma lista de objetos.")
+    return items
+
+
+def _condo(body: Any) -> Condo:
+    f = _fields(body, CONDO_FIELDS)
+    return Condo(
+        id=None,
+        name=str(f["name"]),
+        apartments_count=int(f["apartments_count"]),
+        chargers_count=int(f["chargers_count"]),
+        charger_type=str(f["charger_type"]),
+        state=str(f["state"]),
+        energy_price=float(f["energy_price"]),
+    )
+
+
+def _page_args(query: Dict[str, str]) -> Tuple[Optional[int], int]:
+    after_id = int(query["after_id"]) if "after_id" in query else None
+    return after_id, int(query.get("limit", 100))
+
+
+def _page(page: Page) -> Dict[str, Any]:
+    return {"items": [asdict(x) for x in page.items], "next_after_id": page.next_after_id}
@@ -0,0 +1,255 @@
+from __future__ import annotations
+import asyncio
+import itertools
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from ..domain.models import RfidEntry
+from ..services.condo_service import CondoService
+from ..services.rfid_service import RfidAuthorizationService
+from ..services.user_service import UserService
+from .websocket import WebSocket, WebSocketError, server_handshake
+
+logger = logging.getLogger(__name__)
+
+SUBPROTOCOL = "ocpp1.6"
+CALL, CALLRESULT, CALLERROR = 2, 3, 4
+HEARTBEAT_INTERVAL_S = 300
+
+Payload = Dict[str, Any]
+
+
+class OcppError(Exception):
+    """Vira um CALLERROR com o ``code`` OCPP (ex.: FormationViolation)."""
+
+    def __init__(self, code: str, description: str) -> None:
+        super().__init__(description)
+        self.code = code
+
+
+@dataclass
+class Transaction:
+    transaction_id: int
+    charge_point: str
+    user_id: int
+    condo_id: Optional[int]
+    meter_start_wh: int
+    started_at: datetime
+    last_meter_wh: int
+
+
+class OcppCentralSystem:
+    """Central system OCPP 1.6-J simplificado sobre WebSocket (``ws://host:port/ocpp/<id>``).
+
+    Ações aceitas: BootNotification, Heartbeat, Authorize, StartTransaction,
+    MeterValues e StopTransaction. ``idTag`` é o RFID do usuário; ao encerrar a
+    transação, a energia (meterStop - meterStart), a duração e o custo (pelo
+    preço do condomínio) são gravados com ``UserService.set_last_measure``.
+    Transações abertas ficam só em memória.
+    """
+
+    def __init__(
+        self,
+        user_service: UserService,
+        condo_service: CondoService,
+        rfid_service: RfidAuthorizationService,
+        host: str = "127.0.0.1",
+        port: int = 9000,
+        max_workers: int = 8,
+    ) -> None:
+        self.user_service = user_service
+        self.condo_service = condo_service
+        self.rfid_service = rfid_service
+        self.host = host
+        self.port = port
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="evcharge-ocpp")
+        self.transactions: Dict[int, Transaction] = {}
+        self._tx_ids = itertools.count(1)
+        self._server: Optional[asyncio.base_events.Server] = None
+        self._actions: Dict[str, Callable[[str, Payload], Awaitable[Payload]]] = {
+            "BootNotification": self._boot_notification,
+            "Heartbeat": self._heartbeat,
+            "Authorize": self._authorize,
+            "StartTransaction": self._start_transaction,
+            "MeterValues": self._meter_values,
+            "StopTransaction": self._stop_transaction,
+        }
+        self._charge_points = 0
+        self._messages = 0
+        self._errors = 0
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info("Central OCPP ouvindo em ws://%s:%s/ocpp/<id>", self.host, self.port)
+
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            await self.start()
+        async with self._server:  # type: ignore[union-attr]
+            await self._server.serve_forever()  # type: ignore[union-attr]
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        self.executor.shutdown(wait=True)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "charge_points": self._charge_points,
+            "open_transactions": len(self.transactions),
+            "messages": self._messages,
+            "errors": self._errors,
+        }
+
+    # --- conexão ------------------------------------------------------------
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            path, _ = await server_handshake(reader, writer, (SUBPROTOCOL,))
+        except (WebSocketError, ConnectionError, asyncio.IncompleteReadError) as e:
+            logger.debug("Handshake OCPP recusado: %s", e)
+            writer.close()
+            return
+        charge_point = path.rstrip("/").rsplit("/", 1)[-1]
+        ws = WebSocket(reader, writer)
+        self._charge_points += 1
+        try:
+            while True:
+                text = await ws.recv()
+                if text is None:
+                    break
+                reply = await self._on_message(charge_point, text)
+                if reply is not None:
+                    await ws.send(reply)
+        except (WebSocketError, ConnectionError) as e:
+            logger.debug("Conexão OCPP de %s encerrada: %s", charge_point, e)
+        except asyncio.CancelledError:
+            pass  # servidor encerrando
+        finally:
+            self._charge_points -= 1
+            await ws.close()
+
+    async def _on_message(self, charge_point: str, text: str) -> Optional[str]:
+        self._messages += 1
+        try:
+            msg = json.loads(text)
+        except ValueError:
+            self._errors += 1
+            return json.dumps([CALLERROR, "", "FormationViolation", "JSON inválido.", {}])
+        if not isinstance(msg, list) or len(msg) < 3 or msg[0] not in (CALL, CALLRESULT, CALLERROR):
+            self._errors += 1
+            return json.dumps([CALLERROR, "", "FormationViolation", "Mensagem OCPP-J inválida.", {}])
+        if msg[0] != CALL:
+            return None  # respostas a chamadas da central: não enviamos nenhuma
+        unique_id = str(msg[1])
+        action = self._actions.get(msg[2])
+        try:
+            if action is None:
+                raise OcppError("NotImplemented", f"Ação não suportada: {msg[2]}")
+            payload = msg[3] if len(msg) > 3 else {}
+            if not isinstance(payload, dict):
+                raise OcppError("FormationViolation", "Payload deve ser um objeto.")
+            result = await action(charge_point, payload)
+        except OcppError as e:
+            self._errors += 1
+            return json.dumps([CALLERROR, unique_id, e.code, str(e), {}])
+        except (KeyError, TypeError, ValueError) as e:
+            self._errors += 1
+            code = "ProtocolError" if isinstance(e, KeyError) else "TypeConstraintViolation"
+            return json.dumps([CALLERROR, unique_id, code, str(e), {}])
+        except Exception as e:
+            self._errors += 1
+            logger.exception("Erro OCPP em %s/%s", charge_point, msg[2])
+            return json.dumps([CALLERROR, unique_id, "InternalError", str(e), {}])
+        return json.dumps([CALLRESULT, unique_id, result], ensure_ascii=False)
+
+    async def _blocking(self, fn: Callable[..., Any], *args: Any) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+
+    async def _lookup(self, id_tag: str) -> Optional[RfidEntry]:
+        answered, entry = self.rfid_service.try_authorize(id_tag)
+        if not answered:
+            entry = await self._blocking(self.rfid_service.authorize, id_tag)
+        return entry
+
+    # --- ações -----------------------------------------------------------
+    async def _boot_notification(self, charge_point: str, payload: Payload) -> Payload:
+        return {"status": "Accepted", "currentTime": _now(), "interval": HEARTBEAT_INTERVAL_S}
+
+    async def _heartbeat(self, charge_point: str, payload: Payload) -> Payload:
+        return {"currentTime": _now()}
+
+    async def _authorize(self, charge_point: str, payload: Payload) -> Payload:
+        entry = await self._lookup(str(payload["idTag"]))
+        return {"idTagInfo": {"status": "Accepted" if entry else "Invalid"}}
+
+    async def _start_transaction(self, charge_point: str, payload: Payload) -> Payload:
+        entry = await self._lookup(str(payload["idTag"]))
+        if entry is None:
+            return {"transactionId": 0, "idTagInfo": {"status": "Invalid"}}
+        meter_start = int(payload["meterStart"])
+        tx = Transaction(
+            transaction_id=next(self._tx_ids),
+            charge_point=charge_point,
+            user_id=entry.user_id,
+            condo_id=entry.condo_id,
+            meter_start_wh=meter_start,
+            started_at=_parse_ts(payload["timestamp"]),
+            last_meter_wh=meter_start,
+        )
+        self.transactions[tx.transaction_id] = tx
+        return {"transactionId": tx.transaction_id, "idTagInfo": {"status": "Accepted"}}
+
+    async def _meter_values(self, charge_point: str, payload: Payload) -> Payload:
+        tx = self.transactions.get(payload.get("transactionId"))  # type: ignore[arg-type]
+        if tx is not None:
+            wh = _energy_register(payload.get("meterValue", []))
+            if wh is not None:
+                tx.last_meter_wh = wh
+        return {}
+
+    async def _stop_transaction(self, charge_point: str, payload: Payload) -> Payload:
+        tx = self.transactions.get(int(payload["transactionId"]))
+        if tx is None:
+            raise OcppError("PropertyConstraintViolation", f"Transação desconhecida: {payload['transactionId']}")
+        meter_stop = int(payload.get("meterStop", tx.last_meter_wh))
+        energy_kwh = max(0, meter_stop - tx.meter_start_wh) / 1000
+        minutes = max(0.0, (_parse_ts(payload["timestamp"]) - tx.started_at).total_seconds() / 60)
+        await self._blocking(self._record, tx, energy_kwh, minutes)
+        # só sai da tabela depois de gravada: se a gravação falhar, o carregador
+        # reenvia o StopTransaction (a chave da sessão evita gravar duas vezes)
+        self.transactions.pop(tx.transaction_id, None)
+        return {"idTagInfo": {"status": "Accepted"}}
+
+    def _record(self, tx: Transaction, energy_kwh: float, minutes: float) -> None:
+        condo = self.condo_service.get_condo("id", str(tx.condo_id)) if tx.condo_id is not None else None
+        cost = round(energy_kwh * condo.energy_price, 2) if condo else 0.0
+        # ids de transação recomeçam a cada processo: o início da recarga completa a chave
+        key = f"ocpp:{tx.charge_point}:{tx.transaction_id}:{tx.started_at.isoformat()}"
+        self.user_service.set_last_measure(tx.user_id, energy_kwh, cost, minutes, transaction_id=key)
+
+
+def _energy_register(meter_values: List[Payload]) -> Optional[int]:
+    """Último valor de Energy.Active.Import.Register (Wh) nos MeterValues."""
+    wh = None
+    for mv in meter_values:
+        for sv in mv.get("sampledValue", []):
+            if sv.get("measurand", "Energy.Active.Import.Register") != "Energy.Active.Import.Register":
+                continue
+            value = float(sv["value"])
+            wh = int(value * 1000) if sv.get("unit") == "kWh" else int(value)
+    return wh
+
+
+def _parse_ts(value: str) -> datetime:
+    ts = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    return ts if ts.tzinfo else ts.replace(tzinfo=timezone.utc)
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
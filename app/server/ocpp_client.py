@@ -0,0 +1,40 @@
+from __future__ import annotations
+import asyncio
+import itertools
+import json
+from typing import Any, Dict
+from .ocpp import CALL, CALLERROR, CALLRESULT, SUBPROTOCOL, OcppError
+from .websocket import WebSocket, client_handshake
+
+
+class ChargePointClient:
+    """Carregador OCPP 1.6-J simulado: uma chamada por vez, como manda o protocolo."""
+
+    def __init__(self, ws: WebSocket, charge_point_id: str) -> None:
+        self.ws = ws
+        self.charge_point_id = charge_point_id
+        self._ids = itertools.count(1)
+
+    @classmethod
+    async def connect(cls, host: str, port: int, charge_point_id: str) -> "ChargePointClient":
+        reader, writer = await asyncio.open_connection(host, port)
+        await client_handshake(reader, writer, f"{host}:{port}", f"/ocpp/{charge_point_id}", SUBPROTOCOL)
+        return cls(WebSocket(reader, writer, mask=True), charge_point_id)
+
+    async def call(self, action: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        unique_id = str(next(self._ids))
+        await self.ws.send(json.dumps([CALL, unique_id, action, payload]))
+        while True:
+            text = await self.ws.recv()
+            if text is None:
+                raise ConnectionError("Central OCPP encerrou a conexão.")
+            msg = json.loads(text)
+            if msg[1] != unique_id:
+                continue
+            if msg[0] == CALLRESULT:
+                return msg[2]
+            if msg[0] == CALLERROR:
+                raise OcppError(msg[2], msg[3])
+
+    async def close(self) -> None:
+        await self.ws.close()
@@ -0,0 +1,187 @@
+"""WebSocket mínimo (RFC 6455) sobre ``asyncio`` streams, só com a stdlib.
+
+Cobre o que o OCPP-J usa: handshake com subprotocolo, mensagens de texto
+(inclusive fragmentadas), ping/pong e close. Sem extensões (compressão).
+"""
+from __future__ import annotations
+import asyncio
+import base64
+import hashlib
+import os
+import struct
+from typing import Dict, Optional, Tuple
+
+GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+MAX_MESSAGE_BYTES = 1024 * 1024
+
+OP_CONT, OP_TEXT, OP_BINARY, OP_CLOSE, OP_PING, OP_PONG = 0x0, 0x1, 0x2, 0x8, 0x9, 0xA
+
+
+class WebSocketError(Exception):
+    """Violação de protocolo ou handshake recusado."""
+
+
+def accept_key(key: str) -> str:
+    return base64.b64encode(hashlib.sha1((key + GUID).encode()).digest()).decode()
+
+
+async def _read_headers(reader: asyncio.StreamReader) -> Tuple[str, Dict[str, str]]:
+    start = (await reader.readline()).decode("latin-1").strip()
+    headers: Dict[str, str] = {}
+    while True:
+        line = (await reader.readline()).decode("latin-1")
+        if line in ("\r\n", "\n", ""):
+            break
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+    return start, headers
+
+
+async def server_handshake(
+    reader: asyncio.StreamReader, writer: asyncio.StreamWriter, subprotocols: Tuple[str, ...] = ()
+) -> Tuple[str, Optional[str]]:
+    """Aceita o upgrade HTTP; retorna (caminho, subprotocolo escolhido)."""
+    start, headers = await _read_headers(reader)
+    parts = start.split()
+    key = headers.get("sec-websocket-key")
+    if len(parts) < 2 or parts[0] != "GET" or "websocket" not in headers.get("upgrade", "").lower() or not key:
+        writer.write(b"HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+        await writer.drain()
+        raise WebSocketError("Pedido de upgrade WebSocket inválido.")
+    offered = [p.strip() for p in headers.get("sec-websocket-protocol", "").split(",") if p.strip()]
+    chosen = next((p for p in offered if p in subprotocols), None)
+    if subprotocols and offered and chosen is None:
+        writer.write(b"HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+        await writer.drain()
+        raise WebSocketError(f"Subprotocolo não suportado: {', '.join(offered)}")
+    response = (
+        "HTTP/1.1 101 Switching Protocols\r\n"
+        "Upgrade: websocket\r\n"
+        "Connection: Upgrade\r\n"
+        f"Sec-WebSocket-Accept: {accept_key(key)}\r\n"
+    )
+    if chosen:
+        response += f"Sec-WebSocket-Protocol: {chosen}\r\n"
+    writer.write((response + "\r\n").encode())
+    await writer.drain()
+    return parts[1], chosen
+
+
+async def client_handshake(
+    reader: asyncio.StreamReader, writer: asyncio.StreamWriter, host: str, path: str, subprotocol: Optional[str] = None
+) -> None:
+    key = base64.b64encode(os.urandom(16)).decode()
+    request = (
+        f"GET {path} HTTP/1.1\r\n"
+        f"Host: {host}\r\n"
+        "Upgrade: websocket\r\n"
+        "Connection: Upgrade\r\n"
+        f"Sec-WebSocket-Key: {key}\r\n"
+        "Sec-WebSocket-Version: 13\r\n"
+    )
+    if subprotocol:
+        request += f"Sec-WebSocket-Protocol: {subprotocol}\r\n"
+    writer.write((request + "\r\n").encode())
+    await writer.drain()
+    status, headers = await _read_headers(reader)
+    if " 101 " not in f"{status} " or headers.get("sec-websocket-accept") != accept_key(key):
+        raise WebSocketError(f"Handshake recusado: {status}")
+
+
+def encode_frame(payload: bytes, opcode: int = OP_TEXT, mask: bool = False) -> bytes:
+    """Um quadro final (FIN); clientes devem mascarar (``mask=True``)."""
+    n = len(payload)
+    head = bytearray([0x80 | opcode])
+    mask_bit = 0x80 if mask else 0
+    if n < 126:
+        head.append(mask_bit | n)
+    elif n < 1 << 16:
+        head.append(mask_bit | 126)
+        head += struct.pack(">H", n)
+    else:
+        head.append(mask_bit | 127)
+        head += struct.pack(">Q", n)
+    if mask:
+        key = os.urandom(4)
+        return bytes(head) + key + _xor(payload, key)
+    return bytes(head) + payload
+
+
+def _xor(data: bytes, key: bytes) -> bytes:
+    # XOR em blocos via int.from_bytes: muito mais rápido que byte a byte em Python
+    n = len(data)
+    if not n:
+        return data
+    full = (key * (n // 4 + 1))[:n]
+    return (int.from_bytes(data, "big") ^ int.from_bytes(full, "big")).to_bytes(n, "big")
+
+
+class WebSocket:
+    """Conexão estabelecida; ``mask=True`` no lado cliente."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, mask: bool = False) -> None:
+        self.reader = reader
+        self.writer = writer
+        self.mask = mask
+        self.closed = False
+
+    async def send(self, text: str) -> None:
+        self.writer.write(encode_frame(text.encode(), OP_TEXT, self.mask))
+        await self.writer.drain()
+
+    async def recv(self) -> Optional[str]:
+        """Próxima mensagem de texto; ``None`` quando a conexão é fechada."""
+        parts = []
+        size = 0
+        while True:
+            try:
+                fin, opcode, payload = await self._read_frame()
+            except (asyncio.IncompleteReadError, ConnectionError):
+                self.closed = True
+                return None
+            if opcode == OP_PING:
+                self.writer.write(encode_frame(payload, OP_PONG, self.mask))
+                continue
+            if opcode == OP_PONG:
+                continue
+            if opcode == OP_CLOSE:
+                await self.close(payload[:2] or b"\x03\xe8")
+                return None
+            if opcode not in (OP_TEXT, OP_BINARY, OP_CONT) or (opcode == OP_CONT) != bool(parts):
+                await self.close(struct.pack(">H", 1002))
+                raise WebSocketError("Sequência de quadros inválida.")
+            size += len(payload)
+            if size > MAX_MESSAGE_BYTES:
+                await self.close(struct.pack(">H", 1009))
+                raise WebSocketError("Mensagem grande demais.")
+            parts.append(payload)
+            if fin:
+                try:
+                    return b"".join(parts).decode("utf-8")
+                except UnicodeDecodeError:
+                    await self.close(struct.pack(">H", 1007))
+                    raise WebSocketError("Texto não é UTF-8 válido.") from None
+
+    async def close(self, code: bytes = b"\x03\xe8") -> None:
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            self.writer.write(encode_frame(code, OP_CLOSE, self.mask))
+            await self.writer.drain()
+        except ConnectionError:
+            pass
+        self.writer.close()
+
+    async def _read_frame(self) -> Tuple[bool, int, bytes]:
+        b1, b2 = await self.reader.readexactly(2)
+        n = b2 & 0x7F
+        if n == 126:
+            n = struct.unpack(">H", await self.reader.readexactly(2))[0]
+        elif n == 127:
+            n = struct.unpack(">Q", await self.reader.readexactly(8))[0]
+        if n > MAX_MESSAGE_BYTES:
+            raise WebSocketError("Quadro grande demais.")
+        key = await self.reader.readexactly(4) if b2 & 0x80 else b""
+        payload = await self.reader.readexactly(n)
+        return bool(b1 & 0x80), b1 & 0x0F, _xor(payload, key) if key else payload
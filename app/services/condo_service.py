@@ -1,17 +1,28 @@
 from __future__ import annotations
 import logging
-from typing import Optional, Iterable, Tuple
-from ..domain.models import Condo
+from typing import Iterator, List, Optional, Iterable, Tuple
+from ..domain.models import Condo, Page
 from ..domain.interfaces import ICondoRepository, IUserRepository
 from ..infrastructure.file_loader import CondoFileLoader
+from ..utils.iterables import chunked
 
 
 logger = logging.getLogger(__name__)
 
 class CondoService:
-    def __init__(self, condos: ICondoRepository, users: IUserRepository) -> None:
+    def __init__(
+        self,
+        condos: ICondoRepository,
+        users: IUserRepository,
+        batch_size: int = 1000,
+        commit_every: int = 0,
+        chunk_size: int = 50_000,
+    ) -> None:
         self.condos = condos
         self.users = users
+        self.batch_size = batch_size
+        self.commit_every = commit_every
+        self.chunk_size = chunk_size
 
     def register_condo(
         self,
@@ -39,16 +50,48 @@ class CondoService:
         logger.info("Condomínio '%s' cadastrado com ID %s", name, cid)
         return cid
 
-    def import_from_txt(self, path: str) -> int:
-        condos = CondoFileLoader.load_from_txt(path)
+    def import_from_txt(self, path: str, rejected: Optional[List[str]] = None) -> int:
+        """Importa condomínios de um TXT e retorna quantos foram criados. Com
+        ``rejected``, cada linha recusada (mal formada, nome repetido ou erro
+        do banco) é anotada ali como ``"linha N: motivo"`` e a leitura segue;
+        sem ela, uma linha mal formada levanta ``ValueError`` antes de qualquer
+        gravação (o arquivo é validado por inteiro numa primeira leitura)."""
+        bad_lines: Optional[List[Tuple[int, str]]] = [] if rejected is not None else None
+        if rejected is None:
+            for _ in CondoFileLoader.iter_txt(path):
+                pass
+        failures: List[Tuple[int, str]] = []
+        created = self._register_numbered(CondoFileLoader.iter_txt(path, rejected=bad_lines), failures)
+        if rejected is not None:
+            failures.extend(bad_lines or ())
+            rejected.extend(f"linha {i}: {msg}" for i, msg in sorted(failures, key=lambda f: f[0]))
+        logger.info("Importação concluída. %s condomínios criados, %s recusados.", created, len(failures))
+        return created
+
+    def register_many(self, condos: Iterable[Condo]) -> int:
+        """Cadastra em lote; nomes já existentes (ou repetidos) são ignorados."""
+        return self._register_numbered(enumerate(condos), [])
+
+    def _register_numbered(self, numbered: Iterable[Tuple[int, Condo]], failures: List[Tuple[int, str]]) -> int:
+        """Grava em blocos; os recusados vão para ``failures`` como (número, motivo)."""
+        seen = {c.name for c in self.condos.iter_all()}
         created = 0
-        for c in condos:
-            if self.condos.get_by_name(c.name):
-                logger.warning("Condomínio já existe e foi ignorado: %s", c.name)
-                continue
-            self.condos.create(c)
-            created += 1
-        logger.info("Importação concluída. %s condomínios criados.", created)
+        for chunk in chunked(numbered, self.chunk_size):
+            pending = []
+            pending_lines = []
+            for line_no, c in chunk:
+                if c.name in seen:
+                    logger.warning("Condomínio já existe e foi ignorado: %s", c.name)
+                    failures.append((line_no, "Já existe um condomínio com esse nome."))
+                    continue
+                seen.add(c.name)
+                pending.append(c)
+                pending_lines.append(line_no)
+            n, errors = self.condos.create_many(pending, batch_size=self.batch_size, commit_every=self.commit_every)
+            created += n
+            for idx, msg in errors:
+                logger.warning("Condomínio não importado (%s): %s", pending[idx].name, msg)
+                failures.append((pending_lines[idx], msg))
         return created
 
     def get_condo(self, by: str, value: str) -> Optional[Condo]:
@@ -62,6 +105,12 @@ class CondoService:
     def list_condos(self) -> Iterable[Condo]:
         return self.condos.list_all()
 
+    def iter_condos(self) -> Iterator[Condo]:
+        return self.condos.iter_all()
+
+    def list_condos_page(self, after_id: Optional[int] = None, limit: int = 100) -> Page[Condo]:
+        return self.condos.list_page(after_id, limit)
+
     def update_condo(self, condo: Condo) -> None:
         self.condos.update(condo)
         logger.info("Condomínio ID %s atualizado.", condo.id)
@@ -70,7 +119,7 @@ class CondoService:
         condo = self.condos.get_by_id(condo_id)
         if not condo:
             return False, "Condomínio não encontrado."
-        if self.users.count_by_condo(condo.name) > 0:
+        if self.users.count_by_condo_id(condo_id) > 0:
             return False, "Existem usuários vinculados a este condomínio; exclusão não permitida."
         self.condos.delete(condo_id)
         logger.info("Condomínio ID %s deletado.", condo_id)
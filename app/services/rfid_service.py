@@ -0,0 +1,166 @@
+from __future__ import annotations
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+from ..domain.interfaces import IUserListener, IUserRepository
+from ..domain.models import RfidEntry, User
+from ..utils.validators import validate_rfid
+
+logger = logging.getLogger(__name__)
+
+
+class RfidAuthorizationService(IUserListener):
+    """Autoriza recargas pelo RFID com um índice em memória (RFID -> RfidEntry).
+
+    O índice é montado na primeira consulta (``iter_rfid_entries``) e mantido em dia
+    pelos avisos do ``UserService`` (registre com ``add_listener``). Um RFID
+    ausente do índice ainda é conferido no banco, para enxergar cadastros
+    feitos por outro processo; se também não existir lá, a ausência fica em
+    cache por ``negative_ttl`` segundos.
+    """
+
+    def __init__(
+        self,
+        users: IUserRepository,
+        negative_ttl: float = 30.0,
+        negative_max_size: int = 100_000,
+    ) -> None:
+        if negative_max_size < 1:
+            raise ValueError("negative_max_size deve ser >= 1.")
+        self.users = users
+        self.negative_ttl = negative_ttl
+        self.negative_max_size = negative_max_size
+        self._index: Dict[str, RfidEntry] = {}
+        self._rfid_by_user: Dict[int, str] = {}
+        self._negative: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._loaded = False
+        self._writes = 0  # escritas vistas; detecta avisos concorrentes a um load()
+        # contadores sem lock: aproximados sob concorrência, suficientes para métricas
+        self._hits = 0
+        self._negative_hits = 0
+        self._fallbacks = 0
+        self._rejected = 0
+
+    def load(self, chunk_size: int = 10_000) -> int:
+        """(Re)constrói o índice a partir do repositório; retorna o total indexado."""
+        t0 = time.perf_counter()
+        with self._lock:
+            writes = self._writes
+        index: Dict[str, RfidEntry] = {}
+        by_user: Dict[int, str] = {}
+        for rfid, entry in self.users.iter_rfid_entries(chunk_size):
+            index[rfid] = entry
+            by_user[entry.user_id] = rfid
+        with self._lock:
+            self._index, self._rfid_by_user = index, by_user
+            self._negative.clear()
+            # um aviso chegou durante a leitura: o índice pode estar atrás; refaz na próxima consulta
+            self._loaded = writes == self._writes
+        logger.info("Índice RFID carregado: %s tags em %.0f ms", len(index), (time.perf_counter() - t0) * 1000)
+        return len(index)
+
+    def authorize(self, rfid_code: str) -> Optional[RfidEntry]:
+        """Dados do dono do RFID ou ``None`` se a tag for desconhecida/inválida."""
+        answered, entry = self.try_authorize(rfid_code)
+        if answered:
+            return entry
+        if not self._loaded:
+            with self._load_lock:
+                if not self._loaded:
+                    self.load()
+            answered, entry = self.try_authorize(rfid_code)
+            if answered:
+                return entry
+        key = validate_rfid(rfid_code)
+        self._fallbacks += 1
+        user = self.users.get_by_rfid(key)
+        if user is not None:
+            self.user_saved(user)
+            return self._index.get(key)
+        with self._lock:
+            self._negative[key] = time.monotonic() + self.negative_ttl
+            self._negative.move_to_end(key)
+            while len(self._negative) > self.negative_max_size:
+                self._negative.popitem(last=False)
+        return None
+
+    def try_authorize(self, rfid_code: str) -> Tuple[bool, Optional[RfidEntry]]:
+        """Versão sem E/S de ``authorize`` para laços de eventos: ``(True, resultado)``
+        quando a resposta sai da memória, ``(False, None)`` quando exige o banco."""
+        try:
+            key = validate_rfid(rfid_code)
+        except ValueError:
+            self._rejected += 1
+            return True, None
+        if not self._loaded:
+            return False, None
+        entry = self._index.get(key)
+        if entry is not None:
+            self._hits += 1
+            return True, entry
+        expires = self._negative.get(key)
+        if expires is not None and expires > time.monotonic():
+            self._negative_hits += 1
+            return True, None
+        return False, None
+
+    def has_user(self, user_id: int) -> bool:
+        """O usuário existe? Responde pelo índice em memória; só um id ausente
+        dele é conferido no banco (cadastro feito por outro processo)."""
+        if not self._loaded:
+            with self._load_lock:
+                if not self._loaded:
+                    self.load()
+        if user_id in self._rfid_by_user:
+            return True
+        self._fallbacks += 1
+        user = self.users.get_by_id(user_id)
+        if user is None:
+            return False
+        self.user_saved(user)
+        return True
+
+    # --- IUserListener ----------------------------------------------------
+    def user_saved(self, user: User) -> None:
+        if user.id is None:
+            return
+        with self._lock:
+            self._writes += 1
+            old = self._rfid_by_user.get(user.id)
+            if old is not None and old != user.rfid_code:
+                self._index.pop(old, None)
+            self._index[user.rfid_code] = _entry(user)
+            self._rfid_by_user[user.id] = user.rfid_code
+            self._negative.pop(user.rfid_code, None)
+
+    def user_deleted(self, user_id: int) -> None:
+        with self._lock:
+            self._writes += 1
+            rfid = self._rfid_by_user.pop(user_id, None)
+            if rfid is not None:
+                self._index.pop(rfid, None)
+
+    def users_imported(self) -> None:
+        # os ids criados não são conhecidos: reconstrói o índice na próxima consulta
+        with self._lock:
+            self._loaded = False
+            self._negative.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "indexed": len(self._index),
+                "negative_cached": len(self._negative),
+                "hits": self._hits,
+                "negative_hits": self._negative_hits,
+                "fallbacks": self._fallbacks,
+                "rejected": self._rejected,
+            }
+
+
+def _entry(user: User) -> RfidEntry:
+    return RfidEntry(user_id=user.id, condo_id=user.condo_id, vehicle_type=user.vehicle_type)  # type: ignore[arg-type]
@@ -1,18 +1,44 @@
 from __future__ import annotations
 import logging
-from typing import Optional, Iterable, Tuple
-from ..domain.models import User
-from ..domain.interfaces import IUserRepository, ICondoRepository
+import time
+from typing import Dict, Iterator, List, Optional, Iterable, Tuple
+from ..domain.models import User, Condo, ChargingSession, Page
+from ..domain.interfaces import IUserRepository, ICondoRepository, IChargingSessionRepository, IUserListener
 from ..infrastructure.file_loader import UserFileLoader
+from ..utils.iterables import chunked
 from ..utils.validators import validate_rfid, validate_vehicle_type
 
 logger = logging.getLogger(__name__)
 
 
 class UserService:
-    def __init__(self, users: IUserRepository, condos: ICondoRepository) -> None:
+    def __init__(
+        self,
+        users: IUserRepository,
+        condos: ICondoRepository,
+        batch_size: int = 1000,
+        commit_every: int = 0,
+        chunk_size: int = 50_000,
+        sessions: Optional[IChargingSessionRepository] = None,
+    ) -> None:
         self.users = users
         self.condos = condos
+        self.sessions = sessions
+        self.batch_size = batch_size
+        self.commit_every = commit_every
+        self.chunk_size = chunk_size
+        self._listeners: List[IUserListener] = []
+
+    def add_listener(self, listener: IUserListener) -> None:
+        """Registra quem precisa acompanhar criações/alterações/remoções de usuários."""
+        self._listeners.append(listener)
+
+    def _notify(self, event: str, *args) -> None:
+        for listener in self._listeners:
+            try:
+                getattr(listener, event)(*args)
+            except Exception:
+                logger.exception("Falha ao notificar %s sobre %s", type(listener).__name__, event)
 
     def register_user(
         self,
@@ -23,41 +49,100 @@ class UserService:
         vehicle_type: str,
         rfid_code: str,
     ) -> int:
+        user = self._build_user(
+            name, apartment, self.condos.get_by_name(condo_name), condo_name, plate_ending, vehicle_type, rfid_code
+        )
+        uid = self.users.create(user)
+        user.id = uid
+        self._notify("user_saved", user)
+        logger.info("Usuário '%s' cadastrado com ID %s", name, uid)
+        return uid
+
+    def _build_user(
+        self,
+        name: str,
+        apartment: str,
+        condo: Optional[Condo],
+        condo_name: str,
+        plate_ending: str,
+        vehicle_type: str,
+        rfid_code: str,
+    ) -> User:
         # valida existência do condomínio
-        if not self.condos.get_by_name(condo_name):
+        if not condo:
             logger.warning("Tentativa de cadastro em condomínio inexistente: %s", condo_name)
             raise ValueError("Condomínio não encontrado. Cadastre o condomínio primeiro.")
-        user = User(
+        return User(
             id=None,
             name=name,
             apartment=apartment,
-            condo=condo_name,
+            condo=condo.name,
             plate_ending=plate_ending,
             vehicle_type=validate_vehicle_type(vehicle_type),
             rfid_code=validate_rfid(rfid_code),
+            condo_id=condo.id,
         )
-        uid = self.users.create(user)
-        logger.info("Usuário '%s' cadastrado com ID %s", name, uid)
-        return uid
 
     def import_from_txt(self, path: str) -> Tuple[int, int, list[str]]:
         """Importa usuários de um TXT. Retorna (sucessos, falhas, erros).
         Regras: valida RFID, tipo de veículo e existência do condomínio.
+        O arquivo é lido em streaming e gravado em blocos de ``chunk_size``
+        linhas (``create_many``, uma transação por bloco); os erros citam a
+        linha do arquivo. Linhas mal formadas contam como falha e a leitura
+        continua (os blocos anteriores já foram gravados).
         """
-        records = UserFileLoader.load_from_txt(path)
-        ok, fail = 0, 0
-        errors: list[str] = []
-        for i, r in enumerate(records, start=1):
-            try:
-                self.register_user(
-                    r["name"], r["apartment"], r["condo"], r["plate_ending"], r["vehicle_type"], r["rfid_code"]
-                )
-                ok += 1
-            except Exception as e:
-                fail += 1
-                errors.append(f"linha {i}: {e}")
-        logger.info("Import usuários: ok=%s, falhas=%s", ok, fail)
-        return ok, fail, errors
+        rejected: List[Tuple[int, str]] = []
+        ok, failures = self._register_records(UserFileLoader.iter_txt(path, rejected=rejected), rejected)
+        logger.info("Import usuários: ok=%s, falhas=%s", ok, len(failures))
+        return ok, len(failures), [f"linha {i}: {msg}" for i, msg in failures]
+
+    def register_many(self, records: Iterable[Dict[str, str]]) -> Tuple[int, int, list[str]]:
+        """Cadastro em lote (mesmos campos do TXT: name, apartment, condo,
+        plate_ending, vehicle_type, rfid_code). Erros citam o índice do item."""
+        ok, failures = self._register_records(enumerate(records))
+        logger.info("Cadastro em lote de usuários: ok=%s, falhas=%s", ok, len(failures))
+        return ok, len(failures), [f"item {i}: {msg}" for i, msg in failures]
+
+    def _register_records(
+        self,
+        numbered: Iterable[Tuple[int, Dict[str, str]]],
+        rejected: Optional[List[Tuple[int, str]]] = None,
+    ) -> Tuple[int, List[Tuple[int, str]]]:
+        """``rejected`` recebe, do leitor, as linhas mal formadas lidas até aqui;
+        elas entram nas falhas do bloco em que apareceram."""
+        rejected = rejected if rejected is not None else []
+        condos: Dict[str, Optional[Condo]] = {}
+        ok = 0
+        all_failures: List[Tuple[int, str]] = []
+        for chunk in chunked(numbered, self.chunk_size):
+            pending: list[User] = []
+            pending_lines: list[int] = []
+            failures: list[Tuple[int, str]] = []
+            for line_no, r in chunk:
+                try:
+                    condo_name = r["condo"]
+                    if condo_name not in condos:
+                        condos[condo_name] = self.condos.get_by_name(condo_name)
+                    pending.append(self._build_user(
+                        r["name"], r["apartment"], condos[condo_name], condo_name,
+                        r["plate_ending"], r["vehicle_type"], r["rfid_code"],
+                    ))
+                    pending_lines.append(line_no)
+                except Exception as e:
+                    failures.append((line_no, str(e)))
+            created, db_errors = self.users.create_many(
+                pending, batch_size=self.batch_size, commit_every=self.commit_every
+            )
+            failures.extend((pending_lines[idx], msg) for idx, msg in db_errors)
+            failures.extend(rejected)
+            rejected.clear()
+            failures.sort(key=lambda f: f[0])
+            ok += created
+            all_failures.extend(failures)
+        all_failures.extend(rejected)  # linhas mal formadas depois do último registro válido
+        if ok:
+            self._notify("users_imported")
+        return ok, all_failures
 
     def get_user(self, by: str, value: str) -> Optional[User]:
         if by == "id":
@@ -70,23 +155,56 @@ class UserService:
     def list_users(self) -> Iterable[User]:
         return self.users.list_all()
 
+    def iter_users(self) -> Iterator[User]:
+        return self.users.iter_all()
+
+    def list_users_page(self, after_id: Optional[int] = None, limit: int = 100) -> Page[User]:
+        return self.users.list_page(after_id, limit)
+
     def update_user(self, user: User) -> None:
-        # se mudar o condomínio, checar existência
-        if user.condo and not self.condos.get_by_name(user.condo):
-            raise ValueError("Condomínio informado não existe.")
+        # se mudar o condomínio, checar existência (e resolver o id pelo nome)
+        if user.condo:
+            condo = self.condos.get_by_name(user.condo)
+            if not condo:
+                raise ValueError("Condomínio informado não existe.")
+            user.condo_id = condo.id
         # normalizações
         user.vehicle_type = validate_vehicle_type(user.vehicle_type)
         user.rfid_code = validate_rfid(user.rfid_code)
         self.users.update(user)
+        self._notify("user_saved", user)
         logger.info("Usuário ID %s atualizado.", user.id)
 
     def delete_user(self, user_id: int) -> None:
         self.users.delete(user_id)
+        self._notify("user_deleted", user_id)
         logger.info("Usuário ID %s deletado.", user_id)
 
     def set_last_measure(
-        self, user_id: int, energy_kwh: float, cost_r: float, time_minutes: float
+        self,
+        user_id: int,
+        energy_kwh: float,
+        cost_r: float,
+        time_minutes: float,
+        transaction_id: Optional[str] = None,
     ) -> None:
+        """Registra uma recarga encerrada agora. Com histórico de sessões
+        configurado, é um único apêndice (sem ler o usuário); sem ele,
+        sobrescreve ``last_*`` no cadastro. Um ``transaction_id`` já gravado
+        para o usuário faz do envio um reenvio, ignorado."""
+        if self.sessions is not None:
+            ended_at = int(time.time() * 1000)
+            self.sessions.append(ChargingSession(
+                user_id=user_id,
+                started_at=ended_at - int(round(time_minutes * 60_000)),
+                ended_at=ended_at,
+                energy_kwh=energy_kwh,
+                cost=cost_r,
+                duration_minutes=time_minutes,
+                transaction_id=transaction_id,
+            ))
+            logger.info("Sessão de recarga registrada para usuário ID %s.", user_id)
+            return
         user = self.users.get_by_id(user_id)
         if not user:
             raise ValueError("Usuário não encontrado.")
@@ -96,10 +214,53 @@ class UserService:
         self.users.update(user)
         logger.info("Última medida atualizada para usuário ID %s.", user_id)
 
+    def record_measures(
+        self, measures: Iterable[Tuple[int, float, float, float]]
+    ) -> Tuple[int, List[Tuple[int, str]]]:
+        """Várias medidas ``(user_id, energia, custo, minutos)`` de uma vez.
+        Com histórico de sessões, é um único ``append_many``: cada medida vira
+        uma sessão própria e, para o mesmo usuário, a última do lote vira
+        ``last_*``. Retorna (gravadas, [(índice, erro)])."""
+        if self.sessions is None:
+            ok = 0
+            errors: List[Tuple[int, str]] = []
+            for i, (user_id, energy_kwh, cost_r, time_minutes) in enumerate(measures):
+                try:
+                    self.set_last_measure(user_id, energy_kwh, cost_r, time_minutes)
+                    ok += 1
+                except ValueError as e:
+                    errors.append((i, str(e)))
+            return ok, errors
+        ended_at = int(time.time() * 1000)
+        written, errors = self.sessions.append_many(
+            ChargingSession(
+                user_id=user_id,
+                started_at=ended_at - int(round(time_minutes * 60_000)),
+                ended_at=ended_at,
+                energy_kwh=energy_kwh,
+                cost=cost_r,
+                duration_minutes=time_minutes,
+            )
+            for user_id, energy_kwh, cost_r, time_minutes in measures
+        )
+        logger.info("Lote de medidas: %s gravada(s), %s erro(s).", written, len(errors))
+        return written, errors
+
+    def list_sessions(self, user_id: int, limit: Optional[int] = None) -> List[ChargingSession]:
+        if self.sessions is None:
+            return []
+        return self.sessions.list_by_user(user_id, limit)
+
     def read_last_measure(self, user_id: int) -> str:
         user = self.users.get_by_id(user_id)
         if not user:
             raise ValueError("Usuário não encontrado.")
+        pending = self.sessions.pending_last(user_id) if self.sessions is not None else None
+        if pending is not None:
+            # medida aceita, mas ainda na fila write-behind
+            user.last_energy, user.last_cost, user.last_time_minutes = (
+                pending.energy_kwh, pending.cost, pending.duration_minutes
+            )
         if user.last_energy is None or user.last_cost is None or user.last_time_minutes is None:
             return "Usuário ainda não possui medidas de carregamento registradas."
         return (
@@ -0,0 +1,17 @@
+from __future__ import annotations
+from itertools import islice
+from typing import Iterable, Iterator, List, TypeVar
+
+T = TypeVar("T")
+
+
+def chunked(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    """Agrupa ``items`` em listas de até ``size`` elementos, consumindo sob demanda."""
+    if size < 1:
+        raise ValueError("size deve ser >= 1.")
+    it = iter(items)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
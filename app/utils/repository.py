@@ -0,0 +1,42 @@
+"""Regras comuns aos repositórios (SQLite, memória e mocks), para que os
+backends se comportem igual em paginação e inserção em lote."""
+from __future__ import annotations
+from typing import Any, Callable, Iterable, List, Optional, Tuple, Type, TypeVar, Union
+from ..domain.models import Page
+
+T = TypeVar("T")
+
+MAX_PAGE_SIZE = 1000
+
+
+def page_args(after_id: Optional[int], limit: int) -> Tuple[int, int]:
+    """``(after_id, limit + 1)`` validados para uma página por chave."""
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise ValueError(f"limit deve estar entre 1 e {MAX_PAGE_SIZE}.")
+    # busca um item a mais só para saber se existe próxima página
+    return (after_id or 0, limit + 1)
+
+
+def make_page(items: List[T], limit: int) -> Page[T]:
+    """Corta o item extra pedido por ``page_args`` e define ``next_after_id``."""
+    if len(items) > limit:
+        del items[limit:]
+        return Page(items, items[-1].id)  # type: ignore[attr-defined]
+    return Page(items, None)
+
+
+def create_each(
+    create: Callable[[T], Any],
+    items: Iterable[T],
+    catch: Union[Type[Exception], Tuple[Type[Exception], ...]] = Exception,
+) -> Tuple[int, List[Tuple[int, str]]]:
+    """Chama ``create`` item a item; retorna (criados, [(índice, erro)])."""
+    created = 0
+    errors: List[Tuple[int, str]] = []
+    for i, item in enumerate(items):
+        try:
+            create(item)
+            created += 1
+        except catch as e:
+            errors.append((i, str(e)))
+    return created, errors
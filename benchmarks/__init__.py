@@ -0,0 +1,6 @@
+"""Benchmarks do EVCharge Manager (somente biblioteca padrão).
+
+Execute a partir da raiz do projeto, por exemplo::
+
+    python -m benchmarks.bench_condo_fk --users 200000
+"""
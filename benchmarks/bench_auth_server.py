@@ -0,0 +1,109 @@
+"""Gerador de carga para o servidor de autorização (``python -m app.main serve``):
+muitas conexões simultâneas, cada uma com até ``--pipeline`` pedidos em voo.
+Sem ``--target``, sobe um servidor num subprocesso com um banco temporário."""
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from app.server.client import AuthorizationClient
+from benchmarks.bench_rfid_index import _build, _percentiles
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+async def _connection(host: str, port: int, requests: int, pipeline: int, tags: int, measure_ratio: float,
+                      rnd: random.Random, samples: list) -> int:
+    client = await AuthorizationClient.connect(host, port)
+    window = asyncio.Semaphore(pipeline)
+    clock = time.perf_counter_ns
+    errors = 0
+
+    async def one() -> None:
+        nonlocal errors
+        async with window:
+            rfid = f"{rnd.randrange(tags) * 2:08x}"
+            t0 = clock()
+            if rnd.random() < measure_ratio:
+                resp = await client.measure(rfid, 7.5, 5.0, 30)
+            else:
+                resp = await client.authorize(rfid)
+            samples.append(clock() - t0)
+            errors += not resp.get("ok")
+
+    await asyncio.gather(*(one() for _ in range(requests)))
+    await client.close()
+    return errors
+
+
+async def _load(host: str, port: int, args: argparse.Namespace) -> dict:
+    rnd = random.Random(args.seed)
+    samples: list = []
+    cpu0 = time.process_time()
+    t0 = time.perf_counter()
+    errors = await asyncio.gather(*(
+        _connection(host, port, args.requests, args.pipeline, args.tags, args.measure_ratio, rnd, samples)
+        for _ in range(args.connections)
+    ))
+    elapsed = time.perf_counter() - t0
+    return {
+        "connections": args.connections,
+        "pipeline": args.pipeline,
+        "requests": len(samples),
+        "errors": sum(errors),
+        "req_per_s": round(len(samples) / elapsed, 1),
+        "client_cpu_s": round(time.process_time() - cpu0, 2),
+        **_percentiles(samples),
+    }
+
+
+def _spawn(tmp: str, tags: int, command: str = "serve") -> "tuple[subprocess.Popen, int]":
+    db_path = Path(tmp) / "server.db"
+    _build(db_path, tags)
+    env = {**os.environ, "DB_PATH": str(db_path), "PYTHONPATH": str(ROOT), "LOG_LEVEL": "WARNING"}
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "app.main", command, "--port", "0"],
+        cwd=tmp, env=env, stdout=subprocess.PIPE, text=True,
+    )
+    line = proc.stdout.readline()  # "Servidor ouvindo em host:port"
+    if not line:
+        raise RuntimeError("Servidor não subiu.")
+    return proc, int(line.rsplit(":", 1)[1])
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--target", help="host:porta de um servidor já em execução.")
+    ap.add_argument("--tags", type=int, default=100_000)
+    ap.add_argument("--connections", type=int, default=500)
+    ap.add_argument("--requests", type=int, default=200, help="Pedidos por conexão.")
+    ap.add_argument("--pipeline", type=int, default=8)
+    ap.add_argument("--measure-ratio", type=float, default=0.1)
+    ap.add_argument("--seed", type=int, default=42)
+    args = ap.parse_args()
+    if args.target:
+        host, port = args.target.rsplit(":", 1)
+        print(json.dumps(asyncio.run(_load(host, int(port), args)), indent=2))
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        proc, port = _spawn(tmp, args.tags)
+        try:
+            result = asyncio.run(_load("127.0.0.1", port, args))
+        finally:
+            proc.terminate()
+            proc.wait()
+        usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+        result["server_cpu_s"] = round(usage.ru_utime + usage.ru_stime, 2)  # inclui a carga do índice
+        print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Compara o esquema legado (users.condo TEXT -> condos.name) com o atual
+(users.condo_id INTEGER -> condos.id): tamanho do arquivo e tempo das
+consultas por condomínio."""
+from __future__ import annotations
+import argparse
+import json
+import random
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+from app.infrastructure.migrations import DEFAULT_MIGRATIONS, MigrationRunner
+
+
+def _build(path: Path, version: int, users: int, condos: int, seed: int) -> None:
+    MigrationRunner(str(path), DEFAULT_MIGRATIONS[:version]).migrate()
+    rnd = random.Random(seed)
+    names = [f"Condomínio Residencial Jardim das Flores Bloco {i:04d}" for i in range(condos)]
+    conn = sqlite3.connect(str(path))
+    conn.executemany(
+        "INSERT INTO condos(name, apartments_count, chargers_count, charger_type, state, energy_price) VALUES (?, 100, 4, 'Lento', 'SP', 0.9)",
+        [(n,) for n in names],
+    )
+    condo_col = "condo" if version < 3 else "condo_id"
+    rows = []
+    for i in range(users):
+        c = rnd.randrange(condos)
+        rows.append((f"Morador {i}", str(i % 500), names[c] if version < 3 else c + 1, "11", "elétrico", f"{i:08x}"))
+    conn.executemany(
+        f"INSERT INTO users(name, apartment, {condo_col}, plate_ending, vehicle_type, rfid_code) VALUES (?, ?, ?, ?, ?, ?)",
+        rows,
+    )
+    conn.commit()
+    conn.execute("VACUUM")
+    conn.close()
+
+
+def _time(conn: sqlite3.Connection, sql: str, params_list) -> float:
+    t0 = time.perf_counter()
+    for params in params_list:
+        conn.execute(sql, params).fetchall()
+    return (time.perf_counter() - t0) / len(params_list) * 1e6
+
+
+def run(users: int, condos: int, lookups: int, seed: int) -> dict:
+    result = {"users": users, "condos": condos}
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, version in (("text_fk", 2), ("int_fk", 3)):
+            path = Path(tmp) / f"{label}.db"
+            _build(path, version, users, condos, seed)
+            conn = sqlite3.connect(str(path))
+            rnd = random.Random(seed)
+            picks = [rnd.randrange(condos) for _ in range(lookups)]
+            names = [(f"Condomínio Residencial Jardim das Flores Bloco {c:04d}",) for c in picks]
+            if version < 3:
+                count_sql = "SELECT COUNT(*) FROM users WHERE condo = ?"
+                join_sql = "SELECT u.id, c.energy_price FROM users u JOIN condos c ON c.name = u.condo WHERE u.condo = ?"
+                count_us = _time(conn, count_sql, names)
+            else:
+                count_sql = "SELECT COUNT(*) FROM users WHERE condo_id = ?"
+                join_sql = "SELECT u.id, c.energy_price FROM users u JOIN condos c ON c.id = u.condo_id WHERE c.name = ?"
+                count_us = _time(conn, count_sql, [(c + 1,) for c in picks])
+            result[label] = {
+                "file_bytes": path.stat().st_size,
+                "count_by_condo_us": round(count_us, 2),
+                "join_by_condo_name_us": round(_time(conn, join_sql, names), 2),
+            }
+            conn.close()
+    result["file_size_ratio"] = round(result["int_fk"]["file_bytes"] / result["text_fk"]["file_bytes"], 3)
+    return result
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--users", type=int, default=100_000)
+    ap.add_argument("--condos", type=int, default=300)
+    ap.add_argument("--lookups", type=int, default=200)
+    ap.add_argument("--seed", type=int, default=42)
+    args = ap.parse_args()
+    print(json.dumps(run(args.users, args.condos, args.lookups, args.seed), indent=2))
+
+
+if __name__ == "__main__":
+    main()
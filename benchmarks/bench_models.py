@@ -0,0 +1,106 @@
+"""Custo de montar os modelos em ``UserRepository.list_all``.
+
+Compara o caminho antigo (``sqlite3.Row`` + ``User(**row)`` num dataclass com
+``__dict__``) com o atual (tuplas + ``User(*row)`` num dataclass com slots):
+objetos/s (melhor de ``--repeat``) e bytes por objeto retido (tracemalloc,
+incluindo as strings de cada usuário; ``shallow_bytes`` é só a instância).
+
+    python -m benchmarks.bench_models --users 1000000
+"""
+from __future__ import annotations
+import argparse
+import dataclasses
+import gc
+import json
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, List
+
+from app.domain.models import User
+from app.infrastructure.db import SQLiteDatabase
+from app.infrastructure.repositories import SELECT_USER_SQL, UserRepository
+
+# mesmo modelo, sem slots: como era antes
+LegacyUser = dataclasses.make_dataclass(
+    "LegacyUser", [(f.name, f.type, f) for f in dataclasses.fields(User)]
+)
+
+
+def _build(db: SQLiteDatabase, users: int) -> None:
+    with db.connect() as conn:
+        conn.execute(
+            "INSERT INTO condos(name, apartments_count, chargers_count, charger_type, state, energy_price)"
+            " VALUES ('Omega', 100, 4, 'Lento', 'SP', 0.9)"
+        )
+        conn.executemany(
+            "INSERT INTO users(name, apartment, condo_id, plate_ending, vehicle_type, rfid_code, last_cost, last_energy,"
+            " last_time_minutes) VALUES (?, ?, 1, '11', 'elétrico', ?, 12.5, 15.0, 45.0)",
+            ((f"Morador {i}", f"{i % 300}A", f"{i:08x}") for i in range(users)),
+        )
+        conn.commit()
+
+
+def _legacy_list_all(db: SQLiteDatabase) -> List[object]:
+    with db.connect() as conn:
+        cur = conn.cursor()
+        cur.row_factory = sqlite3.Row
+        rows = cur.execute(SELECT_USER_SQL + " ORDER BY u.id").fetchall()
+        return [LegacyUser(**row) for row in rows]
+
+
+def _measure(fn: Callable[[], List[object]], repeat: int) -> dict:
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        t0 = time.perf_counter()
+        objs = fn()
+        best = min(best, time.perf_counter() - t0)
+        n = len(objs)
+        del objs
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objs = fn()
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    shallow = sys.getsizeof(objs[0]) + (sys.getsizeof(objs[0].__dict__) if hasattr(objs[0], "__dict__") else 0)
+    return {
+        "objects": n,
+        "seconds": round(best, 4),
+        "objects_per_s": round(n / best, 1),
+        "bytes_per_object": round(retained / n, 1),
+        "shallow_bytes": shallow,
+    }
+
+
+def run(users: int, repeat: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        db = SQLiteDatabase(str(Path(tmp) / "models.db"))
+        _build(db, users)
+        repo = UserRepository(db)
+        legacy = _measure(lambda: _legacy_list_all(db), repeat)
+        current = _measure(repo.list_all, repeat)
+        db.close()
+    return {
+        "users": users,
+        "row_kwargs_dict_dataclass": legacy,
+        "tuple_positional_slots": current,
+        "speedup": round(current["objects_per_s"] / legacy["objects_per_s"], 2),
+        "memory_ratio": round(current["bytes_per_object"] / legacy["bytes_per_object"], 3),
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--users", type=int, default=1_000_000)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+    print(json.dumps(run(args.users, args.repeat), indent=2))
+
+
+if __name__ == "__main__":
+    main()
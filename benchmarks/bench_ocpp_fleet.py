@@ -0,0 +1,104 @@
+"""Frota de carregadores OCPP 1.6-J simulados contra ``python -m app.main ocpp-server``:
+cada carregador faz BootNotification e depois ciclos Authorize -> StartTransaction
+-> MeterValues* -> StopTransaction. Mede mensagens/s e latência ponta a ponta.
+Sem ``--target``, sobe a central num subprocesso com um banco temporário."""
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import random
+import resource
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+from app.server.ocpp_client import ChargePointClient
+from benchmarks.bench_auth_server import _spawn
+from benchmarks.bench_rfid_index import _percentiles
+
+
+async def _charger(host: str, port: int, idx: int, args: argparse.Namespace, rnd: random.Random,
+                   samples: list, failures: list) -> None:
+    clock = time.perf_counter_ns
+
+    async def call(action: str, payload: dict) -> dict:
+        t0 = clock()
+        try:
+            return await cp.call(action, payload)
+        finally:
+            samples.append(clock() - t0)
+
+    await asyncio.sleep(rnd.random() * args.ramp_s)  # espalha as conexões
+    cp = await ChargePointClient.connect(host, port, f"CP-{idx:05d}")
+    try:
+        await call("BootNotification", {"chargePointVendor": "Sim", "chargePointModel": "Bench"})
+        meter = 0
+        ts = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        for _ in range(args.sessions):
+            tag = f"{rnd.randrange(args.tags) * 2:08x}"
+            if (await call("Authorize", {"idTag": tag}))["idTagInfo"]["status"] != "Accepted":
+                failures.append(tag)
+                continue
+            start = await call("StartTransaction", {
+                "connectorId": 1, "idTag": tag, "meterStart": meter, "timestamp": ts.isoformat(),
+            })
+            tx = start["transactionId"]
+            for _ in range(args.meter_values):
+                meter += rnd.randrange(100, 1000)
+                ts += timedelta(minutes=1)
+                await call("MeterValues", {"connectorId": 1, "transactionId": tx, "meterValue": [
+                    {"timestamp": ts.isoformat(), "sampledValue": [{"value": str(meter)}]},
+                ]})
+            await call("StopTransaction", {"transactionId": tx, "meterStop": meter, "timestamp": ts.isoformat()})
+    finally:
+        await cp.close()
+
+
+async def _fleet(host: str, port: int, args: argparse.Namespace) -> dict:
+    rnd = random.Random(args.seed)
+    samples: list = []
+    failures: list = []
+    cpu0 = time.process_time()
+    t0 = time.perf_counter()
+    await asyncio.gather(*(_charger(host, port, i, args, rnd, samples, failures) for i in range(args.chargers)))
+    elapsed = time.perf_counter() - t0
+    return {
+        "chargers": args.chargers,
+        "sessions": args.chargers * args.sessions,
+        "messages": len(samples),
+        "rejected_tags": len(failures),
+        "msg_per_s": round(len(samples) / elapsed, 1),
+        "elapsed_s": round(elapsed, 2),
+        "client_cpu_s": round(time.process_time() - cpu0, 2),
+        **_percentiles(samples),
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--target", help="host:porta de uma central já em execução.")
+    ap.add_argument("--tags", type=int, default=100_000)
+    ap.add_argument("--chargers", type=int, default=2000)
+    ap.add_argument("--sessions", type=int, default=3, help="Recargas por carregador.")
+    ap.add_argument("--meter-values", type=int, default=5, help="MeterValues por recarga.")
+    ap.add_argument("--ramp-s", type=float, default=1.0)
+    ap.add_argument("--seed", type=int, default=42)
+    args = ap.parse_args()
+    if args.target:
+        host, port = args.target.rsplit(":", 1)
+        print(json.dumps(asyncio.run(_fleet(host, int(port), args)), indent=2))
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        proc, port = _spawn(tmp, args.tags, "ocpp-server")
+        try:
+            result = asyncio.run(_fleet("127.0.0.1", port, args))
+        finally:
+            proc.terminate()
+            proc.wait()
+        usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+        result["server_cpu_s"] = round(usage.ru_utime + usage.ru_stime, 2)
+        print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Latência de autorização por RFID com o índice em memória: tempo de carga
+e p50/p99 das consultas (tags conhecidas e desconhecidas) para N tags."""
+from __future__ import annotations
+import argparse
+import json
+import random
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+from app.infrastructure.db import SQLiteDatabase
+from app.infrastructure.repositories import UserRepository
+from app.services.rfid_service import RfidAuthorizationService
+
+
+def _build(path: Path, tags: int) -> None:
+    SQLiteDatabase(str(path)).close()  # aplica as migrações
+    conn = sqlite3.connect(str(path))
+    conn.execute(
+        "INSERT INTO condos(name, apartments_count, chargers_count, charger_type, state, energy_price) VALUES ('Alpha', 100, 4, 'Lento', 'SP', 0.9)"
+    )
+    conn.executemany(
+        "INSERT INTO users(name, apartment, condo_id, plate_ending, vehicle_type, rfid_code) VALUES (?, '1', 1, '11', 'elétrico', ?)",
+        ((f"Morador {i}", f"{i * 2:08x}") for i in range(tags)),  # tags pares existem, ímpares não
+    )
+    conn.commit()
+    conn.close()
+
+
+def _percentiles(samples_ns: list) -> dict:
+    samples_ns.sort()
+    n = len(samples_ns)
+    return {
+        "p50_us": round(samples_ns[n // 2] / 1000, 3),
+        "p99_us": round(samples_ns[min(n - 1, int(n * 0.99))] / 1000, 3),
+        "max_us": round(samples_ns[-1] / 1000, 3),
+    }
+
+
+def _measure(service: RfidAuthorizationService, codes: list) -> dict:
+    samples = []
+    clock = time.perf_counter_ns
+    for code in codes:
+        t0 = clock()
+        service.authorize(code)
+        samples.append(clock() - t0)
+    return _percentiles(samples)
+
+
+def run(tags: int, lookups: int, seed: int) -> dict:
+    rnd = random.Random(seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "rfid.db"
+        _build(path, tags)
+        db = SQLiteDatabase(str(path))
+        service = RfidAuthorizationService(UserRepository(db))
+        t0 = time.perf_counter()
+        service.load()
+        load_ms = (time.perf_counter() - t0) * 1000
+        known = [f"{rnd.randrange(tags) * 2:08x}" for _ in range(lookups)]
+        unknown = [f"{rnd.randrange(tags) * 2 + 1:08x}" for _ in range(lookups)]
+        service.negative_max_size = max(service.negative_max_size, lookups)
+        result = {
+            "tags": tags,
+            "lookups": lookups,
+            "load_ms": round(load_ms, 1),
+            "known": _measure(service, known),
+            "unknown_first": _measure(service, unknown),  # cai no banco uma vez por tag
+            "unknown_cached": _measure(service, unknown),  # cache negativo
+            "stats": service.stats(),
+        }
+        db.close()
+    return result
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--tags", type=int, default=1_000_000)
+    ap.add_argument("--lookups", type=int, default=100_000)
+    ap.add_argument("--seed", type=int, default=42)
+    args = ap.parse_args()
+    print(json.dumps(run(args.tags, args.lookups, args.seed), indent=2))
+
+
+if __name__ == "__main__":
+    main()
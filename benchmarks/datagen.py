@@ -0,0 +1,81 @@
+"""Gera massas de dados sintéticas e reprodutíveis (mesma semente = mesmos arquivos)
+nos formatos do ``CondoFileLoader`` e do ``UserFileLoader``, mais um arquivo de
+medidas ``id_usuario;energia_kwh;custo;minutos`` (IDs na ordem de importação).
+
+    python -m benchmarks.datagen --scale 100k -o data/bench
+"""
+from __future__ import annotations
+import argparse
+import json
+import random
+from pathlib import Path
+from typing import Dict, Optional
+
+# usuários, condomínios, medidas
+SCALES: Dict[str, tuple] = {
+    "1k": (1_000, 20, 1_000),
+    "100k": (100_000, 500, 20_000),
+    "1M": (1_000_000, 2_000, 50_000),
+}
+
+FIRST_NAMES = ["Ana", "Bruno", "Carla", "Diego", "Elisa", "Fábio", "Gabriela", "Heitor", "Íris", "João", "Lívia", "Marcos"]
+LAST_NAMES = ["Silva", "Souza", "Oliveira", "Santos", "Pereira", "Lima", "Carvalho", "Gomes", "Ribeiro", "Almeida"]
+STATES = ["SP", "RJ", "MG", "PR", "SC", "RS", "BA", "PE", "DF", "GO"]
+VEHICLE_TYPES = ["elétrico", "híbrido", "ELÉTRICO", "Híbrido"]
+
+
+def generate(
+    out_dir: str,
+    users: int,
+    condos: int,
+    measurements: int,
+    seed: int = 42,
+) -> Dict[str, Path]:
+    """Escreve ``condos.txt``, ``users.txt`` e ``measurements.txt`` em ``out_dir``."""
+    rnd = random.Random(seed)
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    paths = {name: out / f"{name}.txt" for name in ("condos", "users", "measurements")}
+
+    condo_names = [f"Residencial {rnd.choice(LAST_NAMES)} {i:05d}" for i in range(condos)]
+    with paths["condos"].open("w", encoding="utf-8") as f:
+        for name in condo_names:
+            charger = rnd.choice(("Lento", "Rápido"))
+            price = round(rnd.uniform(0.6, 1.4), 2)
+            f.write(f"{name};{charger};{rnd.randint(1, 12)};{rnd.choice(STATES)};{price};{rnd.randint(20, 400)}\n")
+
+    # RFIDs únicos sem materializar um set de 2^32 valores
+    tags = rnd.sample(range(1 << 32), users)
+    with paths["users"].open("w", encoding="utf-8") as f:
+        for i, tag in enumerate(tags):
+            name = f"{rnd.choice(FIRST_NAMES)} {rnd.choice(LAST_NAMES)} {i}"
+            apt = f"{rnd.randint(1, 30)}{rnd.choice('ABCD')}"
+            condo = condo_names[rnd.randrange(condos)]
+            f.write(f"{name};{apt};{condo};{rnd.randint(0, 99):02d};{rnd.choice(VEHICLE_TYPES)};{tag:08x}\n")
+
+    with paths["measurements"].open("w", encoding="utf-8") as f:
+        for _ in range(measurements):
+            energy = round(rnd.uniform(2, 60), 2)
+            f.write(f"{rnd.randint(1, users)};{energy};{round(energy * rnd.uniform(0.6, 1.4), 2)};{rnd.randint(10, 480)}\n")
+    return paths
+
+
+def generate_scale(out_dir: str, scale: str, seed: int = 42, users: Optional[int] = None) -> Dict[str, Path]:
+    n_users, n_condos, n_measures = SCALES[scale]
+    if users is not None:
+        n_users, n_measures = users, min(n_measures, users)
+    return generate(out_dir, n_users, n_condos, n_measures, seed)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--scale", choices=sorted(SCALES), default="1k")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--output", "-o", default="bench_data")
+    args = ap.parse_args()
+    paths = generate_scale(args.output, args.scale, args.seed)
+    print(json.dumps({k: str(v) for k, v in paths.items()}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""Suíte de benchmarks dos repositórios/serviços sobre a massa do ``datagen``.
+
+Mede importação de condomínios e usuários, ``get_by_name``, ``get_by_id``,
+``count_by_condo``, exportação CSV e ``set_last_measure``: vazão, p50/p99 e pico
+de memória (tracemalloc, numa segunda execução para não distorcer os tempos).
+Gera JSON; ``--compare base.json`` mostra a variação e, com ``--fail-over``,
+sai com código 1 se alguma métrica piorar além do limite (%).
+
+    python -m benchmarks.suite --scale 100k -o bench-$(git rev-parse --short HEAD).json
+    python -m benchmarks.suite --scale 100k --compare bench-abc123.json --fail-over 15
+"""
+from __future__ import annotations
+import argparse
+import json
+import platform
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from app.infrastructure.db import SQLiteDatabase
+from app.infrastructure.exporters import CsvExporter
+from app.infrastructure.repositories import ChargingSessionRepository, CondoRepository, UserRepository
+from app.services.condo_service import CondoService
+from app.services.user_service import UserService
+from benchmarks.datagen import SCALES, generate_scale
+
+# métrica -> True se "maior é melhor"
+HIGHER_IS_BETTER = {"throughput_per_s": True, "p50_us": False, "p99_us": False, "peak_kib": False}
+
+
+class _Stack:
+    def __init__(self, path: Path) -> None:
+        self.db = SQLiteDatabase(str(path))
+        self.users = UserRepository(self.db)
+        self.condos = CondoRepository(self.db)
+        self.user_service = UserService(self.users, self.condos, sessions=ChargingSessionRepository(self.db))
+        self.condo_service = CondoService(self.condos, self.users)
+
+    def close(self) -> None:
+        self.db.close()
+
+
+def _percentiles(samples_ns: List[int]) -> Dict[str, float]:
+    samples_ns.sort()
+    n = len(samples_ns)
+    return {
+        "p50_us": round(samples_ns[n // 2] / 1000, 3),
+        "p99_us": round(samples_ns[min(n - 1, int(n * 0.99))] / 1000, 3),
+    }
+
+
+def _bulk(ops: int, fn: Callable[[], Any]) -> Dict[str, float]:
+    t0 = time.perf_counter()
+    fn()
+    seconds = time.perf_counter() - t0
+    return {"ops": ops, "seconds": round(seconds, 4), "throughput_per_s": round(ops / seconds, 1) if seconds else 0.0}
+
+
+def _lookups(fn: Callable[[Any], Any], args: Sequence[Any]) -> Dict[str, float]:
+    samples = []
+    clock = time.perf_counter_ns
+    t0 = time.perf_counter()
+    for a in args:
+        s = clock()
+        fn(a)
+        samples.append(clock() - s)
+    seconds = time.perf_counter() - t0
+    return {
+        "ops": len(args),
+        "seconds": round(seconds, 4),
+        "throughput_per_s": round(len(args) / seconds, 1) if seconds else 0.0,
+        **_percentiles(samples),
+    }
+
+
+def _peak_kib(fn: Callable[[], Any]) -> float:
+    tracemalloc.start()
+    try:
+        fn()
+        return round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+    finally:
+        tracemalloc.stop()
+
+
+def _read_measures(path: Path, limit: int) -> List[Tuple[int, float, float, float]]:
+    out = []
+    with path.open(encoding="utf-8") as f:
+        for line in f:
+            uid, e, c, t = line.rstrip("\n").split(";")
+            out.append((int(uid), float(e), float(c), float(t)))
+            if len(out) >= limit:
+                break
+    return out
+
+
+def run(scale: str, seed: int = 42, lookups: int = 20_000, memory: bool = True, users: Optional[int] = None) -> Dict[str, Any]:
+    rnd = random.Random(seed)
+    results: Dict[str, Dict[str, float]] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        tmpdir = Path(tmp)
+        paths = generate_scale(str(tmpdir / "data"), scale, seed, users)
+        n_users = sum(1 for _ in paths["users"].open(encoding="utf-8"))
+        n_condos = sum(1 for _ in paths["condos"].open(encoding="utf-8"))
+
+        stack = _Stack(tmpdir / "bench.db")
+        results["import_condos"] = _bulk(n_condos, lambda: stack.condo_service.import_from_txt(str(paths["condos"])))
+        imported: List[int] = []
+        results["import_users"] = _bulk(
+            n_users, lambda: imported.append(stack.user_service.import_from_txt(str(paths["users"]))[0])
+        )
+        if imported[0] != n_users:
+            raise RuntimeError(f"Importação incompleta: {imported[0]} de {n_users} usuários.")
+
+        with paths["users"].open(encoding="utf-8") as f:
+            names = [line.split(";", 1)[0] for line in f]
+        with paths["condos"].open(encoding="utf-8") as f:
+            condo_names = [line.split(";", 1)[0] for line in f]
+        n = min(lookups, n_users)
+        results["get_by_name"] = _lookups(stack.users.get_by_name, rnd.sample(names, n))
+        results["get_by_id"] = _lookups(stack.users.get_by_id, [rnd.randint(1, n_users) for _ in range(n)])
+        results["count_by_condo"] = _lookups(
+            stack.users.count_by_condo, [rnd.choice(condo_names) for _ in range(min(n, 2_000))]
+        )
+        exporter = CsvExporter(str(tmpdir / "export"))
+        results["export_users_csv"] = _bulk(n_users, lambda: exporter.export_users(stack.user_service.iter_users()))
+        measures = _read_measures(paths["measurements"], n)
+        results["set_last_measure"] = _lookups(lambda m: stack.user_service.set_last_measure(*m), measures)
+
+        if memory:
+            mem = _Stack(tmpdir / "memory.db")
+            results["import_condos"]["peak_kib"] = _peak_kib(lambda: mem.condo_service.import_from_txt(str(paths["condos"])))
+            results["import_users"]["peak_kib"] = _peak_kib(lambda: mem.user_service.import_from_txt(str(paths["users"])))
+            results["export_users_csv"]["peak_kib"] = _peak_kib(
+                lambda: exporter.export_users(mem.user_service.iter_users())
+            )
+            results["get_by_name"]["peak_kib"] = _peak_kib(lambda: [mem.users.get_by_name(x) for x in names[:1000]])
+            mem.close()
+        stack.close()
+
+    return {"meta": _meta(scale, seed, n_users, n_condos), "results": results}
+
+
+def _meta(scale: str, seed: int, users: int, condos: int) -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True, timeout=5
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "scale": scale,
+        "seed": seed,
+        "users": users,
+        "condos": condos,
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+    }
+
+
+def compare(base: Dict[str, Any], current: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Variação (%) de cada métrica comparável; ``worse`` indica piora."""
+    rows = []
+    for bench, metrics in current["results"].items():
+        old = base.get("results", {}).get(bench, {})
+        for metric, higher_better in HIGHER_IS_BETTER.items():
+            if metric not in metrics or not old.get(metric):
+                continue
+            delta = (metrics[metric] - old[metric]) / old[metric] * 100
+            rows.append({
+                "bench": bench,
+                "metric": metric,
+                "base": old[metric],
+                "current": metrics[metric],
+                "delta_pct": round(delta, 1),
+                "worse_pct": round(-delta if higher_better else delta, 1),
+            })
+    return rows
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--scale", choices=sorted(SCALES), default="1k")
+    ap.add_argument("--users", type=int, help="Sobrescreve o nº de usuários da escala.")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--lookups", type=int, default=20_000)
+    ap.add_argument("--no-memory", action="store_true", help="Pula a passada com tracemalloc.")
+    ap.add_argument("--output", "-o", help="Grava o JSON neste arquivo (além de imprimir).")
+    ap.add_argument("--compare", help="JSON de uma execução anterior para comparar.")
+    ap.add_argument("--fail-over", type=float, help="Sai com 1 se alguma métrica piorar mais que N%%.")
+    args = ap.parse_args(argv)
+
+    report = run(args.scale, args.seed, args.lookups, memory=not args.no_memory, users=args.users)
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    print(text)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+    if not args.compare:
+        return 0
+    rows = compare(json.loads(Path(args.compare).read_text(encoding="utf-8")), report)
+    failed = False
+    for r in rows:
+        flag = ""
+        if args.fail_over is not None and r["worse_pct"] > args.fail_over:
+            flag, failed = "  <-- REGRESSÃO", True
+        print(f"{r['bench']:<20}{r['metric']:<18}{r['base']:>14}{r['current']:>14}{r['delta_pct']:>+9.1f}%{flag}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
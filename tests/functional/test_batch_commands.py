@@ -0,0 +1,132 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from app.cli.commands import EXIT_FAILURE, EXIT_NOT_FOUND, EXIT_OK, EXIT_PARTIAL, EXIT_USAGE, run
+from app.config import AppConfig
+
+
+@pytest.fixture
+def cfg(tmp_path: Path) -> AppConfig:
+    return AppConfig({
+        "database": {"path": str(tmp_path / "batch.db")},
+        "cli": {"export_path": str(tmp_path / "exports")},
+    })
+
+
+@pytest.fixture
+def txt_files(tmp_path: Path):
+    condos = tmp_path / "condos.txt"
+    condos.write_text("Omega;Lento;2;SP;0.80;40\nSigma;Rápido;3;RJ;1.20;60\n", encoding="utf-8")
+    users = tmp_path / "users.txt"
+    users.write_text(
+        "Ana;1A;Omega;12;elétrico;aa000001\n"
+        "Bia;2B;Sigma;34;híbrido;aa000002\n",
+        encoding="utf-8",
+    )
+    return condos, users
+
+
+def test_import_export_and_measure_commands(cfg, txt_files, tmp_path: Path, capsys):
+    condos, users = txt_files
+    assert run(["import-condos", str(condos)], cfg) == EXIT_OK
+    assert run(["import-users", str(users)], cfg) == EXIT_OK
+    assert "2 criado(s), 0 falha(s)" in capsys.readouterr().out
+
+    assert run(["measure", "set", "1", "--energy", "10.5", "--cost", "8.4", "--minutes", "45"], cfg) == EXIT_OK
+    assert run(["measure", "get", "1"], cfg) == EXIT_OK
+    assert "10.5" in capsys.readouterr().out
+    assert run(["measure", "get", "999"], cfg) == EXIT_NOT_FOUND
+
+    assert run(["export", "users", "--format", "csv"], cfg) == EXIT_OK
+    assert "Bia" in (tmp_path / "exports" / "users.csv").read_text(encoding="utf-8")
+    out_dir = tmp_path / "other"
+    assert run(["export", "condos", "--dir", str(out_dir)], cfg) == EXIT_OK
+    assert "Sigma" in (out_dir / "condos.csv").read_text(encoding="utf-8")
+
+
+def test_exit_codes_for_partial_import_and_failures(cfg, txt_files, tmp_path: Path, capsys):
+    condos, users = txt_files
+    run(["import-condos", str(condos)], cfg)
+    users.write_text("Ana;1A;Omega;12;elétrico;aa000001\nZé;9Z;Inexistente;11;elétrico;aa000009\n", encoding="utf-8")
+    assert run(["import-users", str(users)], cfg) == EXIT_PARTIAL
+    capsys.readouterr()
+    condos.write_text("Omega;Lento;2;SP;0.80;40\nruim\nTau;Lento;2;SP;0.80;40\n", encoding="utf-8")
+    assert run(["import-condos", str(condos)], cfg) == EXIT_PARTIAL
+    out, err = capsys.readouterr()
+    assert "1 condomínio(s) importado(s)" in out
+    assert " - linha 1: Já existe" in err and " - linha 2: Linha inválida." in err
+    assert run(["import-users", str(tmp_path / "missing.txt")], cfg) == EXIT_FAILURE
+    assert "Erro:" in capsys.readouterr().err
+    with pytest.raises(SystemExit) as exc:
+        run(["measure", "set", "1"], cfg)
+    assert exc.value.code == EXIT_USAGE
+
+
+def test_run_script_shares_one_context_and_reports_timings(cfg, txt_files, tmp_path: Path, capsys):
+    condos, users = txt_files
+    script = tmp_path / "nightly.evc"
+    script.write_text(
+        "# carga noturna\n"
+        f"import-condos '{condos}'\n"
+        f"evcharge import-users '{users}'\n"
+        "\n"
+        "measure set 2 --energy 3 --cost 3.6 --minutes 10\n"
+        "export users\n",
+        encoding="utf-8",
+    )
+    assert run(["--timings", "run-script", str(script)], cfg) == EXIT_OK
+    err_lines = [json.loads(l) for l in capsys.readouterr().err.splitlines() if l.startswith("{")]
+    assert [l["exit"] for l in err_lines] == [0, 0, 0, 0, 0]
+    assert err_lines[1]["command"].startswith(f"{script}:3 import-users")
+    assert err_lines[-1]["command"].startswith("run-script")
+    assert all(l["elapsed_ms"] >= 0 for l in err_lines)
+
+
+def test_run_script_stops_on_failure_unless_keep_going(cfg, tmp_path: Path, capsys):
+    script = tmp_path / "bad.evc"
+    script.write_text("measure get 1\nmigrate --bogus\nrun-script x\nmigrate --status\n", encoding="utf-8")
+    assert run(["run-script", str(script)], cfg) == EXIT_NOT_FOUND
+    assert "Versão atual" not in capsys.readouterr().out
+    assert run(["run-script", "--keep-going", str(script)], cfg) == EXIT_NOT_FOUND
+    captured = capsys.readouterr()
+    assert "Versão atual" in captured.out
+    assert "não pode ser aninhado" in captured.err
+
+
+def test_report_sums_measures_by_group(cfg, txt_files, tmp_path: Path, capsys):
+    condos, users = txt_files
+    run(["import-condos", str(condos)], cfg)
+    run(["import-users", str(users)], cfg)
+    run(["measure", "set", "1", "--energy", "10", "--cost", "8", "--minutes", "45"], cfg)
+    capsys.readouterr()
+
+    assert run(["report", "--format", "json"], cfg) == EXIT_OK
+    totals = json.loads(capsys.readouterr().out)
+    assert totals["Omega"]["last_energy"] == 10 and totals["Sigma"]["measured"] == 0
+
+    assert run(["report", "--by", "vehicle_type", "--condo", "Sigma"], cfg) == EXIT_OK
+    out = capsys.readouterr().out
+    assert "híbrido" in out and "elétrico" not in out
+
+    assert run(["report", "--format", "csv", "--dir", str(tmp_path / "rep")], cfg) == EXIT_OK
+    lines = (tmp_path / "rep" / "usage_by_condo.csv").read_text(encoding="utf-8").splitlines()
+    assert lines[0].startswith("condo;Usuarios") and lines[1] == "Omega;1;1;10.0;8.0;45.0"
+
+
+def test_memory_backend_persists_through_snapshot(txt_files, tmp_path: Path, capsys):
+    cfg = AppConfig({
+        "database": {"backend": "memory", "snapshot_path": str(tmp_path / "mem.json")},
+        "cli": {"export_path": str(tmp_path / "exports")},
+    })
+    condos, users = txt_files
+    assert run(["import-condos", str(condos)], cfg) == EXIT_OK
+    assert run(["import-users", str(users)], cfg) == EXIT_OK
+    assert run(["measure", "set", "2", "--energy", "4", "--cost", "3", "--minutes", "20"], cfg) == EXIT_OK
+    capsys.readouterr()
+    assert run(["report", "--by", "vehicle_type", "--format", "json"], cfg) == EXIT_OK
+    assert json.loads(capsys.readouterr().out)["híbrido"]["last_energy"] == 4
+    assert run(["rfid-snapshot", "-o", str(tmp_path / "rfid.snap")], cfg) == EXIT_OK
+    assert "2 tag(s)" in capsys.readouterr().out
+    assert not (tmp_path / "evcharge.db").exists()
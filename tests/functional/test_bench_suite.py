@@ -0,0 +1,29 @@
+import json
+from benchmarks import suite
+from benchmarks.datagen import generate
+from app.infrastructure.file_loader import CondoFileLoader, UserFileLoader
+
+
+def test_datagen_is_reproducible_and_loadable(tmp_path):
+    a = generate(str(tmp_path / "a"), users=200, condos=5, measurements=50, seed=7)
+    b = generate(str(tmp_path / "b"), users=200, condos=5, measurements=50, seed=7)
+    for name in a:
+        assert a[name].read_bytes() == b[name].read_bytes()
+    assert len(CondoFileLoader.load_from_txt(str(a["condos"]))) == 5
+    assert len(UserFileLoader.load_from_txt(str(a["users"]))) == 200
+
+
+def test_suite_reports_every_benchmark_and_compares(tmp_path):
+    report = suite.run("1k", seed=1, lookups=50, users=300)
+    assert report["meta"]["users"] == 300
+    assert set(report["results"]) == {
+        "import_condos", "import_users", "get_by_name", "get_by_id",
+        "count_by_condo", "export_users_csv", "set_last_measure",
+    }
+    assert report["results"]["get_by_id"]["ops"] == 50
+    assert report["results"]["import_users"]["peak_kib"] > 0
+
+    base = json.loads(json.dumps(report))
+    base["results"]["get_by_id"]["throughput_per_s"] *= 2
+    rows = {(r["bench"], r["metric"]): r for r in suite.compare(base, report)}
+    assert rows[("get_by_id", "throughput_per_s")]["worse_pct"] == 50.0
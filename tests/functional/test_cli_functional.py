@@ -201,3 +201,22 @@ def test_update_condo_change_price_functional(cli_builder, monkeypatch, capsys):
     )
     assert "Condomínio atualizado." in out
     assert "Preço=R$ 1.230/kWh" in out
+
+
+def test_export_without_console_echo_and_empty_tables(cli_builder, monkeypatch, capsys):
+    cli, export_dir = cli_builder()
+    cli.echo_rows = False
+    out = run_cli_with_inputs(
+        cli,
+        [
+            "11", "12",  # tabelas vazias: nada é exportado
+            "1", "Zeta", "Rápido", "3", "SC", "1.05", "90",
+            "12",
+            "0",
+        ],
+        monkeypatch, capsys,
+    )
+    assert "Sem usuários cadastrados." in out and "Sem condomínios cadastrados." in out
+    assert not (export_dir / "users.csv").exists()
+    assert "1;Zeta;90" not in out  # sem eco das linhas
+    assert "Zeta" in (export_dir / "condos.csv").read_text(encoding="utf-8")
@@ -0,0 +1,105 @@
+import builtins
+import json
+from pathlib import Path
+
+import pytest
+
+from app.cli.commands import EXIT_OK, EXIT_PARTIAL, run
+from app.cli.replay import MenuRecorder, ScriptError, parse_script, replay
+from app.config import AppConfig
+
+
+def test_recorded_session_replays_through_the_same_handlers(cli_builder, tmp_path: Path, monkeypatch):
+    cli, _ = cli_builder()
+    script = tmp_path / "ops.jsonl"
+    cli.recorder = MenuRecorder(str(script))
+    inputs = iter([
+        "1", "Omega", "Lento", "2", "SP", "0.8", "40",
+        "3", "Ana", "1A", "Omega", "12", "elétrico", "aa000001",
+        "8", "1", "set", "10", "8", "45",
+        "4", "name", "Ana",
+        "0",
+    ])
+    monkeypatch.setattr(builtins, "input", lambda prompt="": next(inputs))
+    cli.run()
+    cli.recorder.close()
+
+    lines = script.read_text(encoding="utf-8").splitlines()
+    assert json.loads(lines[2]) == ["8", "1", "set", "10", "8", "45"]
+    operations = parse_script(lines)
+    assert [op for _, op, _ in operations] == ["1", "3", "8", "4"]
+
+    # só as consultas e medidas: cadastros repetidos falhariam por duplicidade
+    report = replay(cli, operations[2:], repeat=5)
+    assert report.error_count == 0
+    counts = {r["operation"]: r["count"] for r in report.rows()}
+    assert counts == {"medidas": 5, "consultar-usuario": 5}
+    assert cli.answer_source is None
+
+
+def test_replay_counts_failures_and_desync(cli_builder):
+    cli, _ = cli_builder()
+    operations = parse_script([
+        "# comentário",
+        '["4", "name", "Ninguém", "sobra"]',
+        '["9", "abc"]',
+        '["5", "id"]',
+        '["0"]',
+    ])
+    report = replay(cli, operations)
+    assert report.operations == 3
+    assert report.errors == {"consultar-usuario": 1, "excluir-usuario": 1, "consultar-condominio": 1}
+    assert "não usada" in report.first_error["consultar-usuario"]
+    assert "faltou resposta" in report.first_error["consultar-condominio"]
+    assert "Primeiro erro em excluir-usuario" in report.render()
+
+
+@pytest.mark.parametrize("line", ["{oops", '{"op": "1"}', "[]", '["1", 2]'])
+def test_parse_script_rejects_malformed_lines(line):
+    with pytest.raises(ScriptError, match="Linha 1"):
+        parse_script([line])
+
+
+def test_replay_command_reports_json(tmp_path: Path, capsys):
+    cfg = AppConfig({"database": {"path": str(tmp_path / "cfg.db")}, "cli": {"export_path": str(tmp_path / "exp")}})
+    script = tmp_path / "ops.jsonl"
+    script.write_text(
+        '["1", "Omega", "Lento", "2", "SP", "0.8", "40"]\n["5", "name", "Omega"]\n', encoding="utf-8"
+    )
+    target = tmp_path / "target.db"
+    assert run(["replay", str(script), "--db", str(target), "--format", "json"], cfg) == EXIT_OK
+    report = json.loads(capsys.readouterr().out)
+    assert report["operations"] == 2 and report["errors"] == 0
+    assert target.exists() and not (tmp_path / "cfg.db").exists()
+
+    # segunda passada: o cadastro repetido falha, a consulta não
+    assert run(["replay", str(script), "--db", str(target), "--repeat", "2"], cfg) == EXIT_PARTIAL
+    out = capsys.readouterr().out
+    assert "4 operação(ões)" in out and "cadastrar-condominio" in out
+
+
+def test_replay_db_inside_run_script_uses_its_own_database(tmp_path: Path):
+    import sqlite3
+
+    cfg = AppConfig({"database": {"path": str(tmp_path / "cfg.db")}, "cli": {"export_path": str(tmp_path / "exp")}})
+    condos = tmp_path / "condos.txt"
+    condos.write_text("Sigma;Rápido;3;RJ;1.20;60\n", encoding="utf-8")
+    ops = tmp_path / "ops.jsonl"
+    ops.write_text('["1", "Omega", "Lento", "2", "SP", "0.8", "40"]\n', encoding="utf-8")
+    target = tmp_path / "target.db"
+    script = tmp_path / "script.txt"
+    # o contexto da sessão já existe (cfg.db) quando o replay chega com --db
+    script.write_text(
+        f"import-condos '{condos}'\nreplay '{ops}' --db '{target}'\nimport-condos '{condos}'\n", encoding="utf-8"
+    )
+    assert run(["run-script", str(script), "--keep-going"], cfg) == EXIT_PARTIAL  # 2º import: nome repetido
+
+    def names(path):
+        conn = sqlite3.connect(path)
+        try:
+            return [r[0] for r in conn.execute("SELECT name FROM condos ORDER BY id")]
+        finally:
+            conn.close()
+
+    assert names(target) == ["Omega"]
+    assert names(tmp_path / "cfg.db") == ["Sigma"]
@@ -0,0 +1,66 @@
+import asyncio
+import json
+
+from app.server.auth_server import AuthorizationServer
+from app.server.client import AuthorizationClient
+from app.services.rfid_service import RfidAuthorizationService
+
+
+def _server(user_svc):
+    rfid = RfidAuthorizationService(user_svc.users)
+    user_svc.add_listener(rfid)
+    return AuthorizationServer(user_svc, rfid, port=0, max_workers=2, max_pipeline=4)
+
+
+def test_authorize_and_measure_over_tcp(services_db, sample_condos):
+    user_svc, _ = services_db
+    uid = user_svc.register_user("Ana", "12B", "Alpha", "34", "elétrico", "b3950a25")
+    server = _server(user_svc)
+
+    async def scenario():
+        await server.start()
+        client = await AuthorizationClient.connect(port=server.port)
+        try:
+            ok = await client.authorize("B3950A25", condo_id=sample_condos["Alpha"])
+            wrong = await client.authorize("b3950a25", condo_id=sample_condos["Beta"])
+            unknown = await client.authorize("deadbeef")
+            measured = await client.measure("b3950a25", 10.0, 7.5, 30)
+            bad = await client.request("measure", user_id=uid)
+            nope = await client.request("fly")
+            return ok, wrong, unknown, measured, bad, nope
+        finally:
+            await client.close()
+            await server.close()
+
+    ok, wrong, unknown, measured, bad, nope = asyncio.run(scenario())
+    assert ok["authorized"] and ok["user_id"] == uid and ok["vehicle_type"] == "elétrico"
+    assert wrong == {"id": 2, "ok": True, "authorized": False, "reason": "wrong_condo"}
+    assert unknown["reason"] == "unknown_tag"
+    assert measured == {"ok": True, "user_id": uid, "id": 4}
+    assert bad["ok"] is False and "energy_kwh" in bad["error"]
+    assert nope["ok"] is False
+    assert "10.000" in user_svc.read_last_measure(uid)
+    assert server.stats()["errors"] == 2
+
+
+def test_pipelined_requests_answer_in_order(services_db, sample_condos):
+    user_svc, _ = services_db
+    for i in range(3):
+        user_svc.register_user(f"U{i}", "1", "Alpha", "11", "híbrido", f"0000000{i}")
+    server = _server(user_svc)
+
+    async def scenario():
+        await server.start()
+        reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+        lines = [json.dumps({"id": i, "op": "authorize", "rfid": f"0000000{i % 5}"}) for i in range(20)]
+        writer.write(("\n".join(lines) + "\nnot json\n").encode())
+        await writer.drain()
+        out = [json.loads(await reader.readline()) for _ in range(21)]
+        writer.close()
+        await server.close()
+        return out
+
+    out = asyncio.run(scenario())
+    assert [r["id"] for r in out[:20]] == list(range(20))
+    assert [r["authorized"] for r in out[:5]] == [True, True, True, False, False]
+    assert out[20]["ok"] is False and "JSON" in out[20]["error"]
@@ -0,0 +1,91 @@
+import http.client
+import json
+
+import pytest
+
+from app.server.http_api import HttpApi
+
+
+@pytest.fixture
+def api(services_db, sample_condos):
+    user_svc, condo_svc = services_db
+    api = HttpApi(user_svc, condo_svc, port=0)
+    api.start()
+    yield api
+    api.close()
+
+
+def _call(conn, method, path, body=None):
+    conn.request(method, path, body=None if body is None else json.dumps(body),
+                 headers={"Content-Type": "application/json"})
+    resp = conn.getresponse()
+    data = resp.read()
+    return resp.status, (json.loads(data) if data else None), resp
+
+
+def test_user_lifecycle_over_keep_alive_connection(api, sample_condos):
+    conn = http.client.HTTPConnection(api.host, api.port)
+    status, body, resp = _call(conn, "POST", "/users", {
+        "name": "Ana", "apartment": "12B", "condo": "Alpha", "plate_ending": "34",
+        "vehicle_type": "elétrico", "rfid_code": "b3950a25",
+    })
+    assert status == 201 and resp.getheader("Server-Timing").startswith("app;dur=")
+    uid = body["id"]
+    assert _call(conn, "GET", f"/users/{uid}")[1]["condo"] == "Alpha"
+    status, body, _ = _call(conn, "PUT", f"/users/{uid}", {"condo": "Beta"})
+    assert status == 200 and body["condo_id"] == sample_condos["Beta"]
+    assert _call(conn, "POST", f"/users/{uid}/measurements", {"energy_kwh": 10, "cost": 7.5, "minutes": 30})[0] == 201
+    assert "10.000 kWh" in _call(conn, "GET", f"/users/{uid}/measurements")[1]["last"]
+    assert _call(conn, "DELETE", f"/users/{uid}")[0] == 204
+    assert _call(conn, "GET", f"/users/{uid}")[0] == 404
+    conn.close()
+
+
+def test_batches_pagination_and_errors(api, sample_condos):
+    conn = http.client.HTTPConnection(api.host, api.port)
+    users = [
+        {"name": f"U{i}", "apartment": "1", "condo": "Alpha", "plate_ending": "11",
+         "vehicle_type": "híbrido", "rfid_code": f"{i:08x}"}
+        for i in range(5)
+    ] + [{"name": "X", "apartment": "1", "condo": "Nenhum", "plate_ending": "1", "vehicle_type": "híbrido", "rfid_code": "ffffffff"}]
+    status, body, _ = _call(conn, "POST", "/users/batch", {"users": users})
+    assert body["created"] == 5 and body["failed"] == 1 and body["errors"][0].startswith("item 5")
+    page = _call(conn, "GET", "/users?limit=3")[1]
+    assert len(page["items"]) == 3 and page["next_after_id"] == 3
+    assert [u["name"] for u in _call(conn, "GET", "/users?after_id=3")[1]["items"]] == ["U3", "U4"]
+    status, body, _ = _call(conn, "POST", "/measurements/batch", {"measurements": [
+        {"user_id": 1, "energy_kwh": 1, "cost": 1, "minutes": 1},
+        {"user_id": 999, "energy_kwh": 1, "cost": 1, "minutes": 1},
+    ]})
+    assert body["written"] == 1 and body["errors"][0]["index"] == 1
+    status, body, _ = _call(conn, "POST", "/users/999/measurements", {"energy_kwh": 1, "cost": 1, "minutes": 1})
+    assert status == 404 and body["error"] == "Usuário não encontrado."
+    status, body, _ = _call(conn, "POST", "/condos/batch", {"condos": [
+        {"name": "Gamma", "apartments_count": 1, "chargers_count": 1, "charger_type": "Lento", "state": "SP", "energy_price": 1},
+        {"name": "Alpha", "apartments_count": 1, "chargers_count": 1, "charger_type": "Lento", "state": "SP", "energy_price": 1},
+    ]})
+    assert body == {"created": 1}
+    assert _call(conn, "PUT", "/condos/3", {"energy_price": 2.5})[1]["energy_price"] == 2.5
+    assert _call(conn, "DELETE", f"/condos/{sample_condos['Alpha']}")[0] == 409
+    assert _call(conn, "DELETE", "/condos/3")[0] == 204
+    assert _call(conn, "POST", "/users", {"name": "Bob"})[0] == 400
+    assert _call(conn, "POST", "/users", {
+        "name": "Dup", "apartment": "1", "condo": "Alpha", "plate_ending": "1", "vehicle_type": "híbrido", "rfid_code": "00000001",
+    })[0] == 409
+    assert _call(conn, "DELETE", "/users")[0] == 405
+    assert _call(conn, "GET", "/nada")[0] == 404
+    conn.request("POST", "/condos", body=b"{", headers={"Content-Type": "application/json"})
+    assert conn.getresponse().status == 400
+    conn.close()
+
+
+@pytest.mark.parametrize("length", ["-1", "abc"])
+def test_invalid_content_length_is_rejected_and_closes(api, length):
+    conn = http.client.HTTPConnection(api.host, api.port, timeout=5)
+    conn.putrequest("POST", "/condos")
+    conn.putheader("Content-Length", length)
+    conn.endheaders()
+    resp = conn.getresponse()
+    assert resp.status == 400 and json.loads(resp.read())["error"] == "Content-Length inválido."
+    assert resp.getheader("Connection") == "close"
+    conn.close()
@@ -0,0 +1,143 @@
+import asyncio
+
+import pytest
+
+from app.server.ocpp import OcppCentralSystem, OcppError
+from app.server.ocpp_client import ChargePointClient
+from app.server.websocket import WebSocketError, client_handshake, encode_frame, WebSocket
+from app.services.rfid_service import RfidAuthorizationService
+
+
+def _central(services):
+    user_svc, condo_svc = services
+    rfid = RfidAuthorizationService(user_svc.users)
+    user_svc.add_listener(rfid)
+    return OcppCentralSystem(user_svc, condo_svc, rfid, port=0, max_workers=2)
+
+
+def test_charging_session_over_ocpp(services_db, sample_condos):
+    user_svc, _ = services_db
+    uid = user_svc.register_user("Ana", "12B", "Alpha", "34", "elétrico", "b3950a25")
+    central = _central(services_db)
+
+    async def scenario():
+        await central.start()
+        cp = await ChargePointClient.connect("127.0.0.1", central.port, "CP-1")
+        try:
+            boot = await cp.call("BootNotification", {"chargePointVendor": "X", "chargePointModel": "Y"})
+            denied = await cp.call("Authorize", {"idTag": "deadbeef"})
+            auth = await cp.call("Authorize", {"idTag": "B3950A25"})
+            start = await cp.call("StartTransaction", {
+                "connectorId": 1, "idTag": "b3950a25", "meterStart": 1000, "timestamp": "2026-01-01T10:00:00Z",
+            })
+            tx = start["transactionId"]
+            await cp.call("MeterValues", {"connectorId": 1, "transactionId": tx, "meterValue": [
+                {"timestamp": "2026-01-01T10:15:00Z", "sampledValue": [{"value": "6.0", "unit": "kWh"}]},
+            ]})
+            assert central.transactions[tx].last_meter_wh == 6000
+            stop = await cp.call("StopTransaction", {"transactionId": tx, "meterStop": 11000, "timestamp": "2026-01-01T10:30:00Z"})
+            with pytest.raises(OcppError) as err:
+                await cp.call("DataTransfer", {"vendorId": "x"})
+            with pytest.raises(OcppError):
+                await cp.call("StopTransaction", {"transactionId": tx, "timestamp": "2026-01-01T10:30:00Z"})
+            return boot, denied, auth, start, stop, err.value.code
+        finally:
+            await cp.close()
+            await central.close()
+
+    boot, denied, auth, start, stop, code = asyncio.run(scenario())
+    assert boot["status"] == "Accepted"
+    assert denied["idTagInfo"]["status"] == "Invalid"
+    assert auth["idTagInfo"]["status"] == "Accepted"
+    assert start["idTagInfo"]["status"] == "Accepted" and start["transactionId"] == 1
+    assert stop["idTagInfo"]["status"] == "Accepted"
+    assert code == "NotImplemented"
+    # 10 kWh em 30 min ao preço do Alpha (0,75/kWh)
+    assert user_svc.read_last_measure(uid) == "Energia: 10.000 kWh | Custo: R$ 7.50 | Tempo: 30.0 min"
+
+
+def test_handshake_requires_websocket_upgrade(services_db, sample_condos):
+    central = _central(services_db)
+
+    async def scenario():
+        await central.start()
+        reader, writer = await asyncio.open_connection("127.0.0.1", central.port)
+        writer.write(b"GET / HTTP/1.1\r\nHost: x\r\n\r\n")
+        status = await reader.readline()
+        writer.close()
+        reader, writer = await asyncio.open_connection("127.0.0.1", central.port)
+        with pytest.raises(WebSocketError):
+            await client_handshake(reader, writer, "x", "/ocpp/CP", "ocpp2.0")
+        writer.close()
+        # quadro fragmentado + ping no meio: a central deve remontar a mensagem
+        reader, writer = await asyncio.open_connection("127.0.0.1", central.port)
+        await client_handshake(reader, writer, "x", "/ocpp/CP", "ocpp1.6")
+        msg = b'[2,"9","Heartbeat",{}]'
+        writer.write(bytes([0x01, 0x80 | 5]) + b"\0\0\0\0" + msg[:5])
+        writer.write(encode_frame(b"hi", 0x9, mask=True))
+        writer.write(bytes([0x80, 0x80 | (len(msg) - 5)]) + b"\0\0\0\0" + msg[5:])
+        await writer.drain()
+        ws = WebSocket(reader, writer, mask=True)
+        reply = await ws.recv()
+        await ws.close()
+        await central.close()
+        return status, reply
+
+    status, reply = asyncio.run(scenario())
+    assert b"400" in status
+    assert reply.startswith('[3, "9", {"currentTime"')
+
+
+def test_invalid_utf8_closes_with_1007(services_db, sample_condos):
+    central = _central(services_db)
+
+    async def scenario():
+        await central.start()
+        reader, writer = await asyncio.open_connection("127.0.0.1", central.port)
+        await client_handshake(reader, writer, "x", "/ocpp/CP", "ocpp1.6")
+        writer.write(encode_frame(b"\xff\xfe", mask=True))
+        await writer.drain()
+        head = await reader.readexactly(4)
+        writer.close()
+        await central.close()
+        return head
+
+    head = asyncio.run(scenario())
+    assert head[0] & 0x0F == 0x8 and head[2:] == b"\x03\xef"  # quadro de fechamento, código 1007
+
+
+def test_failed_recording_keeps_transaction_open(services_db, sample_condos, monkeypatch):
+    user_svc, _ = services_db
+    user_svc.register_user("Ana", "12B", "Alpha", "34", "elétrico", "b3950a25")
+    central = _central(services_db)
+    record = central._record
+    failures = [RuntimeError("database is locked")]
+
+    def flaky(*args):
+        if failures:
+            raise failures.pop()
+        record(*args)
+
+    monkeypatch.setattr(central, "_record", flaky)
+
+    async def scenario():
+        await central.start()
+        cp = await ChargePointClient.connect("127.0.0.1", central.port, "CP-1")
+        try:
+            start = await cp.call("StartTransaction", {
+                "connectorId": 1, "idTag": "b3950a25", "meterStart": 0, "timestamp": "2026-01-01T10:00:00Z",
+            })
+            stop = {"transactionId": start["transactionId"], "meterStop": 2000, "timestamp": "2026-01-01T10:30:00Z"}
+            with pytest.raises(OcppError) as err:
+                await cp.call("StopTransaction", stop)
+            still_open = start["transactionId"] in central.transactions
+            await cp.call("StopTransaction", stop)  # reenvio do carregador
+            return err.value.code, still_open
+        finally:
+            await cp.close()
+            await central.close()
+
+    code, still_open = asyncio.run(scenario())
+    assert code == "InternalError" and still_open
+    assert central.transactions == {}
+    assert "Energia: 2.000 kWh" in user_svc.read_last_measure(1)
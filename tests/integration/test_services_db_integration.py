@@ -135,3 +135,49 @@ def test_update_user_change_to_nonexistent_condo_raises(services_db, sample_cond
     u.condo = "X-NAO-EXISTE"
     with pytest.raises(ValueError):
         user_svc.update_user(u)
+
+
+def test_import_users_reports_db_errors_by_line(services_db, sample_condos, tmp_path: Path):
+    user_svc, _ = services_db
+    users_txt = tmp_path / "usuarios_dup.txt"
+    users_txt.write_text(
+        """# nome;apartamento;condominio;final_placa;tipo_veiculo;rfid
+Ana;1;Alpha;11;elétrico;aaaa0001
+Bia;2;Alpha;22;marciano;aaaa0002
+Caio;3;Beta;33;híbrido;AAAA0001
+Duda;4;Beta;44;híbrido;aaaa0004
+""",
+        encoding="utf-8",
+    )
+    ok, fail, errors = user_svc.import_from_txt(str(users_txt))
+    assert ok == 2 and fail == 2
+    assert errors[0].startswith("linha 3:") and "veículo" in errors[0]
+    assert errors[1].startswith("linha 4:") and "UNIQUE" in errors[1]
+
+
+def test_import_users_in_chunks_from_gzip(services_db, sample_condos, tmp_path: Path):
+    import gzip
+    user_svc, _ = services_db
+    user_svc.chunk_size = 3
+    path = tmp_path / "usuarios.txt.gz"
+    lines = [f"U{i};{i};Alpha;11;elétrico;{i:08x}" for i in range(10)]
+    lines.insert(5, "Bad;1;Nope;00;elétrico;ffff0000")
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    ok, fail, errors = user_svc.import_from_txt(str(path))
+    assert ok == 10 and fail == 1
+    assert errors[0].startswith("linha 6:")
+
+
+def test_import_users_counts_malformed_lines_and_keeps_streaming(services_db, sample_condos, tmp_path: Path):
+    user_svc, _ = services_db
+    user_svc.chunk_size = 2
+    path = tmp_path / "usuarios_mal_formados.txt"
+    lines = [f"U{i};{i};Alpha;11;elétrico;{i:08x}" for i in range(6)]
+    lines.insert(3, "sem;campos;suficientes")
+    lines.append("U9;9;Alpha;11")  # depois do último registro válido
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    ok, fail, errors = user_svc.import_from_txt(str(path))
+    assert ok == 6 and fail == 2
+    assert errors[0].startswith("linha 4: Linha inválida. Esperado 6 campos")
+    assert errors[1].startswith("linha 8:")
@@ -5,6 +5,7 @@ import pytest
 from app.infrastructure.db import SQLiteDatabase
 from app.infrastructure.repositories import UserRepository, CondoRepository
 from app.infrastructure.mockdb import MockUserRepository, MockCondoRepository
+from app.infrastructure.memory import MemoryStore, MemoryUserRepository, MemoryCondoRepository, MemorySessionRepository
 from app.services.user_service import UserService
 from app.services.condo_service import CondoService
 from app.domain.models import Condo
@@ -26,6 +27,24 @@ def sqlite_repos(temp_db):
     return UserRepository(temp_db), CondoRepository(temp_db)
 
 
+@pytest.fixture
+def memory_store():
+    return MemoryStore()
+
+
+@pytest.fixture
+def memory_repos(memory_store):
+    """Mesmo contrato (e mesmas restrições) do SQLite, sem arquivo: para testes rápidos."""
+    return MemoryUserRepository(memory_store), MemoryCondoRepository(memory_store)
+
+
+@pytest.fixture
+def services_memory(memory_store, memory_repos):
+    users, condos = memory_repos
+    sessions = MemorySessionRepository(memory_store)
+    return UserService(users, condos, sessions=sessions), CondoService(condos, users)
+
+
 @pytest.fixture
 def services_mock():
     users = MockUserRepository()
@@ -49,3 +68,12 @@ def users_and_condos_services_mock(services_mock):
     condo_service.register_condo("Beta", 80, 3, "Rápido", "RJ", 1.10)
     return user_service, condo_service
 
+
+@pytest.fixture
+def users_and_condos_services_memory(services_memory):
+    """Serviços sobre o backend em memória: restrições do SQLite, sem arquivo."""
+    user_service, condo_service = services_memory
+    condo_service.register_condo("Alpha", 50, 2, "Lento", "SP", 0.75)
+    condo_service.register_condo("Beta", 80, 3, "Rápido", "RJ", 1.10)
+    return user_service, condo_service
+
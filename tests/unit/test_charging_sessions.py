@@ -0,0 +1,147 @@
+import sqlite3
+import pytest
+
+from app.domain.models import User, ChargingSession
+from app.infrastructure.repositories import ChargingSessionRepository
+from app.infrastructure.migrations import DEFAULT_MIGRATIONS, MigrationRunner
+from app.infrastructure.mockdb import MockUserRepository, MockCondoRepository, MockChargingSessionRepository
+from app.services.user_service import UserService
+
+
+@pytest.fixture
+def sessions_env(temp_db, sqlite_repos, seed_condos_sqlite):
+    users_repo, condos_repo = sqlite_repos
+    uid = users_repo.create(User(id=None, name="Ana", apartment="1", condo="Alpha", plate_ending="11", vehicle_type="elétrico", rfid_code="aaaa0001"))
+    sessions = ChargingSessionRepository(temp_db)
+    return UserService(users_repo, condos_repo, sessions=sessions), sessions, uid
+
+
+def _s(uid, start, energy=1.0, tx=None):
+    return ChargingSession(
+        user_id=uid, started_at=start, ended_at=start + 60_000, energy_kwh=energy, cost=energy * 2,
+        duration_minutes=1.0, transaction_id=tx,
+    )
+
+
+def test_set_last_measure_appends_history_and_updates_last(sessions_env):
+    svc, sessions, uid = sessions_env
+    svc.set_last_measure(uid, 10.0, 7.5, 30)
+    svc.set_last_measure(uid, 12.5, 9.37, 45)
+    history = svc.list_sessions(uid)
+    assert [s.energy_kwh for s in history] == [12.5, 10.0]
+    assert history[0].condo_id == 1
+    assert "12.500" in svc.read_last_measure(uid)
+
+
+def test_set_last_measure_unknown_user(sessions_env):
+    svc, _, _ = sessions_env
+    with pytest.raises(ValueError):
+        svc.set_last_measure(999, 1.0, 1.0, 1.0)
+
+
+def test_append_many_coalesces_last_and_reports_unknown_users(sessions_env):
+    svc, sessions, uid = sessions_env
+    written, errors = sessions.append_many([_s(uid, 3000, 3.0), _s(999, 1000), _s(uid, 1000, 1.0), _s(uid, 2000, 2.0)])
+    assert written == 3 and errors == [(1, "Usuário não encontrado.")]
+    assert svc.get_user("id", str(uid)).last_energy == 3.0
+    assert len(sessions.list_by_user(uid, limit=2)) == 2
+    assert sessions.append_many([]) == (0, [])
+
+
+def test_older_or_resent_session_does_not_override_last(sessions_env):
+    svc, sessions, uid = sessions_env
+    sessions.append(_s(uid, 5000, 5.0, tx="cp1:7"))
+    sessions.append(_s(uid, 1000, 1.0))  # chegou atrasada
+    sessions.append(_s(uid, 6000, 9.0, tx="cp1:7"))  # reenvio da mesma transação: ignorado
+    assert svc.get_user("id", str(uid)).last_energy == 5.0
+    assert [s.transaction_id for s in sessions.list_by_user(uid)] == ["cp1:7", None]
+
+
+def test_sessions_in_the_same_millisecond_are_all_kept(sessions_env):
+    svc, sessions, uid = sessions_env
+    sessions.append(_s(uid, 9000, 3.0))
+    sessions.append(_s(uid, 9000, 4.0))  # mesmo ended_at, sem transaction_id: outra sessão
+    assert [s.energy_kwh for s in sessions.list_by_user(uid)] == [4.0, 3.0]
+    assert svc.get_user("id", str(uid)).last_energy == 4.0
+
+    for i in range(50):
+        svc.set_last_measure(uid, float(i), 1.0, 1.0)
+    history = svc.list_sessions(uid)
+    assert len(history) == 52 and history[0].energy_kwh == 49.0
+    assert svc.get_user("id", str(uid)).last_energy == 49.0
+
+
+def test_record_measures_keeps_every_row_of_the_batch(sessions_env):
+    svc, _, uid = sessions_env
+    assert svc.record_measures([(uid, 1.0, 1.0, 1.0), (uid, 2.0, 2.0, 2.0), (uid, 3.0, 3.0, 3.0), (999, 1.0, 1.0, 1.0)]) == (
+        3, [(3, "Usuário não encontrado.")]
+    )
+    assert [s.energy_kwh for s in svc.list_sessions(uid)] == [3.0, 2.0, 1.0]
+    assert svc.get_user("id", str(uid)).last_energy == 3.0
+
+
+def test_append_many_counts_only_inserted_rows(sessions_env):
+    svc, sessions, uid = sessions_env
+    sessions.append(_s(uid, 1000, 1.0, tx="t1"))
+    written, errors = sessions.append_many([_s(uid, 2000, 2.0), _s(uid, 9000, 9.0, tx="t1"), _s(uid, 3000, 3.0, tx="t2"), _s(uid, 4000, 4.0, tx="t2")])
+    assert (written, errors) == (2, [])
+    assert svc.get_user("id", str(uid)).last_energy == 3.0  # o reenvio mais recente (9.0) foi ignorado
+    assert [s.energy_kwh for s in sessions.list_by_user(uid)] == [3.0, 2.0, 1.0]
+
+
+def test_deleting_user_removes_history(sessions_env):
+    svc, sessions, uid = sessions_env
+    sessions.append(_s(uid, 1000))
+    svc.delete_user(uid)
+    assert sessions.list_by_user(uid) == []
+
+
+def test_migration_backfills_last_measure_into_history(tmp_path):
+    path = str(tmp_path / "v3.db")
+    MigrationRunner(path, DEFAULT_MIGRATIONS[:3]).migrate()
+    conn = sqlite3.connect(path)
+    conn.execute("INSERT INTO condos(name, apartments_count, chargers_count, charger_type, state, energy_price) VALUES ('A', 1, 1, 'Lento', 'SP', 1.0)")
+    conn.execute("INSERT INTO users(name, apartment, condo_id, plate_ending, vehicle_type, rfid_code, last_cost, last_energy, last_time_minutes) VALUES ('Ana', '1', 1, '11', 'elétrico', 'aaaa0001', 2.0, 4.0, 30)")
+    conn.execute("INSERT INTO users(name, apartment, condo_id, plate_ending, vehicle_type, rfid_code) VALUES ('Bob', '2', 1, '22', 'híbrido', 'aaaa0002')")
+    conn.commit()
+    conn.close()
+    MigrationRunner(path).migrate()
+    conn = sqlite3.connect(path)
+    rows = conn.execute("SELECT user_id, ended_at - started_at, energy_kwh FROM charging_sessions").fetchall()
+    conn.close()
+    assert rows == [(1, 1_800_000, 4.0)]
+
+
+def test_migration_rekeys_sessions_preserving_history(tmp_path):
+    path = str(tmp_path / "v4.db")
+    MigrationRunner(path, DEFAULT_MIGRATIONS[:4]).migrate()
+    conn = sqlite3.connect(path)
+    conn.execute("INSERT INTO condos(name, apartments_count, chargers_count, charger_type, state, energy_price) VALUES ('A', 1, 1, 'Lento', 'SP', 1.0)")
+    conn.execute("INSERT INTO users(name, apartment, condo_id, plate_ending, vehicle_type, rfid_code) VALUES ('Ana', '1', 1, '11', 'elétrico', 'aaaa0001')")
+    conn.executemany(
+        "INSERT INTO charging_sessions VALUES (1, ?, ?, 1, ?, 1.0, 1.0)", [(0, 2000, 2.0), (0, 1000, 1.0)]
+    )
+    conn.commit()
+    conn.close()
+    assert MigrationRunner(path).migrate() == [5]
+    conn = sqlite3.connect(path)
+    rows = conn.execute("SELECT id, ended_at, transaction_id FROM charging_sessions ORDER BY id").fetchall()
+    conn.close()
+    assert rows == [(1, 1000, None), (2, 2000, None)]
+
+
+def test_mock_sessions_repository_matches_sqlite_behaviour():
+    users, condos = MockUserRepository(), MockCondoRepository()
+    sessions = MockChargingSessionRepository(users)
+    svc = UserService(users, condos, sessions=sessions)
+    from app.services.condo_service import CondoService
+    CondoService(condos, users).register_condo("Alpha", 1, 1, "Lento", "SP", 1.0)
+    uid = svc.register_user("Ana", "1", "Alpha", "11", "elétrico", "aaaa0001")
+    sessions.append(_s(uid, 2000, 2.0, tx="t1"))
+    sessions.append(_s(uid, 1000, 1.0))
+    sessions.append(_s(uid, 2000, 2.0, tx="t1"))
+    written, errors = sessions.append_many([_s(uid, 3000, 3.0), _s(42, 1), _s(uid, 5000, 5.0, tx="t1")])
+    assert written == 1 and errors[0][0] == 1
+    assert users.get_by_id(uid).last_energy == 3.0
+    assert [s.ended_at for s in svc.list_sessions(uid, limit=2)] == [63000, 62000]
+    assert UserService(users, condos).list_sessions(uid) == []
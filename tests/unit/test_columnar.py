@@ -0,0 +1,85 @@
+import math
+
+import pytest
+
+from app.analytics.columnar import UserTable, _numpy
+from app.domain.models import User
+
+
+def _user(name, rfid, condo, vtype="elétrico", energy=None, cost=None, minutes=None):
+    return User(
+        id=None, name=name, apartment="1", condo=condo, plate_ending="11", vehicle_type=vtype,
+        rfid_code=rfid, last_energy=energy, last_cost=cost, last_time_minutes=minutes,
+    )
+
+
+@pytest.fixture
+def table(sqlite_repos, seed_condos_sqlite):
+    users_repo, _ = sqlite_repos
+    for u in (
+        _user("A", "00000001", "Alpha", energy=10.0, cost=8.0, minutes=30),
+        _user("B", "00000002", "Alpha", "híbrido", energy=5.5, cost=4.0, minutes=20),
+        _user("C", "00000003", "Beta", energy=2.0, cost=1.5, minutes=10),
+        _user("D", "00000004", "Beta"),  # sem medida
+    ):
+        users_repo.create(u)
+    return UserTable.from_db(users_repo.db, chunk_size=3, use_numpy=False)
+
+
+def test_loads_columns_from_cursor(table, sqlite_repos):
+    assert len(table) == 4
+    assert list(table.column("id")) == [1, 2, 3, 4]
+    assert table.condo.values == ["Alpha", "Beta"]
+    assert list(table.column("condo")) == [0, 0, 1, 1]
+    assert table.vehicle_type[1] == "híbrido"
+    assert math.isnan(table.last_energy[3])
+    assert table.nbytes == 4 * (5 * 8 + 2 * 4)
+
+    same = UserTable.from_users(sqlite_repos[0].iter_all(), use_numpy=False)
+    assert list(same.condo_id) == list(table.condo_id) and same.condo.values == table.condo.values
+
+
+def test_group_sum_ignores_nulls(table):
+    totals = table.group_sum("condo")
+    assert totals["Alpha"] == {"users": 2, "measured": 2, "last_energy": 15.5, "last_cost": 12.0, "last_time_minutes": 50.0}
+    assert totals["Beta"]["users"] == 2 and totals["Beta"]["measured"] == 1
+    assert table.sum("last_energy") == 17.5
+
+
+def test_filters_by_dictionary_columns(table):
+    eletricos = table.mask(vehicle_type="elétrico")
+    assert list(eletricos) == [1, 0, 1, 1]
+    assert table.group_sum("condo", ["last_cost"], where=eletricos) == {
+        "Alpha": {"users": 1, "measured": 1, "last_cost": 8.0},
+        "Beta": {"users": 2, "measured": 1, "last_cost": 1.5},
+    }
+    assert table.sum("last_energy", where=table.mask(condo="Alpha", vehicle_type="híbrido")) == 5.5
+    assert not any(table.mask(condo="Inexistente"))
+    assert table.group_sum("vehicle_type", where=table.mask(condo="Inexistente")) == {}
+
+
+def test_rejects_unknown_columns(table):
+    with pytest.raises(KeyError):
+        table.group_sum("name")
+    with pytest.raises(KeyError):
+        table.group_sum("condo", ["id"])
+    with pytest.raises(KeyError):
+        table.sum("condo_id")
+    with pytest.raises(KeyError):
+        table.mask(id="1")
+    with pytest.raises(KeyError):
+        table.column("name")
+
+
+@pytest.mark.skipif(_numpy() is not None, reason="NumPy instalado")
+def test_use_numpy_requires_numpy():
+    with pytest.raises(RuntimeError):
+        UserTable(use_numpy=True)
+
+
+@pytest.mark.skipif(_numpy() is None, reason="NumPy não instalado")
+def test_numpy_path_matches_pure_python(table, sqlite_repos):
+    fast = UserTable.from_db(sqlite_repos[0].db, use_numpy=True)
+    mask = fast.mask(vehicle_type="elétrico")
+    assert fast.group_sum("condo", where=mask) == table.group_sum("condo", where=table.mask(vehicle_type="elétrico"))
+    assert fast.sum("last_cost") == table.sum("last_cost")
@@ -0,0 +1,78 @@
+import time
+import pytest
+
+from app.domain.models import Condo
+from app.infrastructure.cache import CachedCondoRepository
+from app.infrastructure.mockdb import MockUserRepository, MockCondoRepository
+from app.services.condo_service import CondoService
+from app.services.user_service import UserService
+
+
+class _CountingRepo(MockCondoRepository):
+    def __init__(self):
+        super().__init__()
+        self.lookups = 0
+
+    def get_by_name(self, name):
+        self.lookups += 1
+        return super().get_by_name(name)
+
+
+def _condo(name="Alpha"):
+    return Condo(id=None, name=name, apartments_count=1, chargers_count=1, charger_type="Lento", state="SP", energy_price=1.0)
+
+
+def test_hits_misses_and_negative_cache():
+    inner = _CountingRepo()
+    cache = CachedCondoRepository(inner)
+    assert cache.get_by_name("Alpha") is None
+    assert cache.get_by_name("Alpha") is None
+    assert inner.lookups == 1
+    cache.create(_condo())  # invalida a entrada negativa
+    assert cache.get_by_name("Alpha").name == "Alpha"
+    assert cache.get_by_name("Alpha").name == "Alpha"
+    assert inner.lookups == 2
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["negative_hits"] == 1 and stats["misses"] == 2
+
+
+def test_returned_objects_are_copies_and_update_invalidates():
+    inner = _CountingRepo()
+    cache = CachedCondoRepository(inner)
+    cid = cache.create(_condo())
+    c = cache.get_by_id(cid)
+    c.name = "Alpha 2"
+    assert cache.get_by_id(cid).name == "Alpha"
+    cache.update(c)
+    assert cache.get_by_id(cid).name == "Alpha 2"
+    assert cache.get_by_name("Alpha") is None
+    cache.delete(cid)
+    assert cache.get_by_id(cid) is None
+
+
+def test_lru_eviction_and_ttl():
+    inner = _CountingRepo()
+    cache = CachedCondoRepository(inner, max_size=2, ttl_seconds=0.05)
+    for n in ("A", "B", "C"):
+        cache.get_by_name(n)
+    assert cache.stats()["evictions"] == 1 and cache.stats()["size"] == 2
+    time.sleep(0.06)
+    cache.get_by_name("C")
+    assert inner.lookups == 4
+    with pytest.raises(ValueError):
+        CachedCondoRepository(inner, max_size=0)
+
+
+def test_services_use_cache_for_condo_validation():
+    users = MockUserRepository()
+    inner = _CountingRepo()
+    condos = CachedCondoRepository(inner)
+    user_svc, condo_svc = UserService(users, condos), CondoService(condos, users)
+    condo_svc.register_condo("Alpha", 50, 2, "Lento", "SP", 0.75)
+    for i in range(5):
+        user_svc.register_user(f"U{i}", "1", "Alpha", "11", "elétrico", f"{i:08x}")
+    assert inner.lookups == 2  # cadastro do condomínio + primeira validação
+    created, _ = condos.create_many([_condo("Beta")])
+    assert created == 1 and condo_svc.get_condo("name", "Beta") is not None
+    assert [c.name for c in condos.list_all()] == [c.name for c in condos.iter_all()] == ["Alpha", "Beta"]
+    assert condos.list_page(limit=1).next_after_id == 1
@@ -1,3 +1,4 @@
+import pytest
 from app.infrastructure.db import SQLiteDatabase
 
 
@@ -7,3 +8,61 @@ def test_sqlite_row_factory(tmp_path):
         cur = conn.execute("SELECT 1 AS a")
         row = cur.fetchone()
         assert row["a"] == 1
+
+
+def test_pool_reuses_connections(tmp_path):
+    db = SQLiteDatabase(str(tmp_path / "pool.db"), pool_size=2)
+    with db.connect() as c1:
+        pass
+    with db.connect() as c2:
+        assert c2 is c1
+    stats = db.stats()
+    assert stats["created"] == 1 and stats["acquired"] == 2 and stats["in_use"] == 0
+    db.close()
+
+
+def test_pool_pragmas_wal_busy_timeout_fk(tmp_path):
+    db = SQLiteDatabase(str(tmp_path / "wal.db"), busy_timeout_ms=1234)
+    with db.connect() as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 1234
+        assert conn.execute("PRAGMA foreign_keys").fetchone()[0] == 1
+    db.close()
+
+
+def test_pool_rollback_on_error_and_commit_on_success(tmp_path):
+    db = SQLiteDatabase(str(tmp_path / "tx.db"))
+    with db.connect() as conn:
+        conn.execute("CREATE TABLE t (x INTEGER)")
+    try:
+        with db.connect() as conn:
+            conn.execute("INSERT INTO t VALUES (1)")
+            raise RuntimeError("falha")
+    except RuntimeError:
+        pass
+    with db.connect() as conn:
+        conn.execute("INSERT INTO t VALUES (2)")
+    with db.connect() as conn:
+        assert [r[0] for r in conn.execute("SELECT x FROM t")] == [2]
+    db.close()
+
+
+def test_pool_exhausted_times_out_and_close(tmp_path):
+    db = SQLiteDatabase(str(tmp_path / "full.db"), pool_size=1, acquire_timeout=0.01)
+    with db.connect():
+        with pytest.raises(TimeoutError):
+            with db.connect():
+                pass
+    assert db.stats()["waits"] == 1
+    db.close()
+    assert db.stats()["created"] == 0
+    with pytest.raises(RuntimeError):
+        with db.connect():
+            pass
+
+
+def test_pool_invalid_settings(tmp_path):
+    with pytest.raises(ValueError):
+        SQLiteDatabase(str(tmp_path / "a.db"), pool_size=0)
+    with pytest.raises(ValueError):
+        SQLiteDatabase(str(tmp_path / "b.db"), journal_mode="bogus")
@@ -0,0 +1,31 @@
+import pytest
+
+from app.domain.models import Condo
+from app.infrastructure.exporters import CsvExporter
+
+
+def _condos(n):
+    for i in range(n):
+        yield Condo(id=i + 1, name=f"C{i}", apartments_count=1, chargers_count=1, charger_type="Lento", state="SP", energy_price=1.0)
+
+
+def test_export_streams_and_echoes(tmp_path):
+    lines = []
+    path, count = CsvExporter(str(tmp_path)).export_condos(_condos(3), echo=lines.append)
+    assert count == 3 and path.name == "condos.csv"
+    assert lines[0] == "1;C0;1;1;Lento;SP;1.0"
+    assert path.read_text(encoding="utf-8").splitlines()[0] == "ID;Nome;Apts;QtdeCarreg;Tipo;UF;PrecoKWh"
+
+
+def test_failed_export_keeps_previous_file(tmp_path):
+    exporter = CsvExporter(str(tmp_path))
+    exporter.export_condos(_condos(1))
+
+    def broken():
+        yield from _condos(1)
+        raise RuntimeError("falha no meio")
+
+    with pytest.raises(RuntimeError):
+        exporter.export_condos(broken())
+    assert "C0" in (tmp_path / "condos.csv").read_text(encoding="utf-8")
+    assert not (tmp_path / "condos.csv.tmp").exists()
@@ -48,3 +48,53 @@ def test_user_loader_missing_file(tmp_path: Path):
     with pytest.raises(FileNotFoundError):
         UserFileLoader.load_from_txt(str(tmp_path / "nope.txt"))
 
+
+
+def test_user_loader_iter_is_lazy_with_line_numbers(tmp_path: Path):
+    p = tmp_path / "users.txt"
+    p.write_text("# cabeçalho\n\nAna;12B;Alpha;34;elétrico;b3950a25\nruim\n", encoding="utf-8")
+    it = UserFileLoader.iter_txt(str(p))
+    line_no, rec = next(it)
+    assert line_no == 3 and rec["name"] == "Ana"
+    with pytest.raises(ValueError, match="Linha 4"):
+        next(it)
+
+
+def test_loaders_collect_malformed_lines_when_asked(tmp_path: Path):
+    p = tmp_path / "condos.txt"
+    p.write_text("A;Lento;2;SP;0.9;10\nruim\nB;Lento;dois;SP;0.9;10\nC;Rápido;1;RJ;1.1;5\n", encoding="utf-8")
+    rejected = []
+    assert [c.name for _, c in CondoFileLoader.iter_txt(str(p), rejected=rejected)] == ["A", "C"]
+    assert [line for line, _ in rejected] == [2, 3] and "dois" in rejected[1][1]
+
+
+def test_condo_loader_iter_missing_file_is_eager(tmp_path: Path):
+    with pytest.raises(FileNotFoundError):
+        CondoFileLoader.iter_txt(str(tmp_path / "nope.txt"))
+
+
+def test_condo_loader_invalid_number_reports_line(tmp_path: Path):
+    p = tmp_path / "condos.txt"
+    p.write_text("Alpha;Lento;2;SP;0.75;50\nBeta;Lento;dois;RJ;1.0;10\n", encoding="utf-8")
+    with pytest.raises(ValueError, match="Linha 2"):
+        CondoFileLoader.load_from_txt(str(p))
+
+
+@pytest.mark.parametrize("suffix, opener", [(".gz", "gzip"), (".bz2", "bz2"), (".xz", "lzma")])
+def test_loaders_read_compressed_files(tmp_path: Path, suffix, opener):
+    import importlib
+    mod = importlib.import_module(opener)
+    p = tmp_path / f"condos.txt{suffix}"
+    with mod.open(p, "wt", encoding="utf-8") as f:
+        f.write("Alpha;Lento;2;SP;0.75;50\n")
+    condos = CondoFileLoader.load_from_txt(str(p))
+    assert [c.name for c in condos] == ["Alpha"]
+
+
+def test_loader_reads_stdin(monkeypatch):
+    import io
+    import sys
+    data = "Ana;12B;Alpha;34;elétrico;b3950a25\n".encode("utf-8")
+    monkeypatch.setattr(sys, "stdin", io.TextIOWrapper(io.BytesIO(data)))
+    items = UserFileLoader.load_from_txt("-")
+    assert items[0]["vehicle_type"] == "elétrico"
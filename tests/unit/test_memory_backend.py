@@ -0,0 +1,207 @@
+import sqlite3
+import threading
+
+import pytest
+
+from app.bootstrap import build_context
+from app.config import AppConfig
+from app.domain.models import ChargingSession, Condo, User
+from app.infrastructure.memory import MemorySessionRepository, MemoryStore, MemoryUserRepository, MemoryCondoRepository
+from app.infrastructure.repositories import ChargingSessionRepository
+
+
+def _condo(name):
+    return Condo(id=None, name=name, apartments_count=10, chargers_count=2, charger_type="Lento", state="SP", energy_price=0.8)
+
+
+def _user(name, rfid, condo="Alpha", **kw):
+    return User(id=None, name=name, apartment="1", condo=condo, plate_ending="11", vehicle_type="elétrico", rfid_code=rfid, **kw)
+
+
+@pytest.fixture(params=["sqlite", "memory"])
+def backend(request, temp_db, memory_store):
+    """(usuários, condomínios, sessões) de cada backend com os mesmos dados iniciais."""
+    if request.param == "sqlite":
+        from app.infrastructure.repositories import CondoRepository, UserRepository
+
+        repos = UserRepository(temp_db), CondoRepository(temp_db), ChargingSessionRepository(temp_db)
+    else:
+        repos = (
+            MemoryUserRepository(memory_store), MemoryCondoRepository(memory_store),
+            MemorySessionRepository(memory_store),
+        )
+    repos[1].create(_condo("Alpha"))
+    repos[1].create(_condo("Beta"))
+    return repos
+
+
+def test_constraints_match_sqlite(backend):
+    users, condos, _ = backend
+    uid = users.create(_user("Ana", "aa000001"))
+    with pytest.raises(sqlite3.IntegrityError, match="UNIQUE constraint failed: users.rfid_code"):
+        users.create(_user("Bia", "aa000001"))
+    with pytest.raises(sqlite3.IntegrityError, match="NOT NULL constraint failed: users.condo_id"):
+        users.create(_user("Bia", "aa000002", condo="Gama"))
+    with pytest.raises(sqlite3.IntegrityError, match="FOREIGN KEY"):
+        users.create(_user("Bia", "aa000002", condo_id=99))
+    with pytest.raises(sqlite3.IntegrityError, match="UNIQUE constraint failed: condos.name"):
+        condos.create(_condo("Alpha"))
+    with pytest.raises(sqlite3.IntegrityError, match="FOREIGN KEY"):
+        condos.delete(1)  # ainda há moradores
+
+    other = users.create(_user("Caio", "aa000003"))
+    u = users.get_by_id(other)
+    u.rfid_code = "aa000001"
+    with pytest.raises(sqlite3.IntegrityError, match="users.rfid_code"):
+        users.update(u)
+    beta = condos.get_by_name("Beta")
+    beta.name = "Alpha"
+    with pytest.raises(sqlite3.IntegrityError, match="condos.name"):
+        condos.update(beta)
+    assert users.get_by_id(uid).rfid_code == "aa000001"
+
+
+def test_lookups_and_indexes_follow_updates(backend):
+    users, condos, _ = backend
+    a = users.create(_user("Ana", "aa000001"))
+    users.create(_user("Ana", "aa000002", condo="Beta"))
+    assert users.get_by_name("Ana").id == a  # homônimos: o de menor id
+    assert users.count_by_condo("Alpha") == 1 and users.count_by_condo("Nenhum") == 0
+
+    u = users.get_by_id(a)
+    u.name, u.rfid_code, u.condo_id = "Ana Paula", "bb000001", 2
+    assert users.get_by_rfid("aa000001").name == "Ana"  # leitura é cópia: nada muda sem update
+    users.update(u)
+    assert users.get_by_rfid("aa000001") is None
+    assert users.get_by_rfid("bb000001").condo == "Beta"
+    assert users.count_by_condo_id(1) == 0 and users.count_by_condo_id(2) == 2
+
+    c = condos.get_by_id(2)
+    c.name = "Beta Renomeado"
+    condos.update(c)
+    assert users.get_by_id(a).condo == "Beta Renomeado"
+    assert condos.get_by_name("Beta") is None
+
+    users.delete(a)
+    users.delete(a)
+    assert users.get_by_name("Ana Paula") is None and users.count_by_condo_id(2) == 1
+    condos.delete(1)
+    assert [x.name for x in condos.list_all()] == ["Beta Renomeado"]
+    users.update(User(id=999, name="X", apartment="1", condo="Beta Renomeado", plate_ending="1", vehicle_type="e", rfid_code="x"))
+    assert users.get_by_id(999) is None
+
+
+def test_bulk_pages_and_iteration(backend):
+    users, condos, _ = backend
+    batch = [_user(f"U{i}", f"{i:08x}") for i in range(25)] + [_user("Dup", "00000001")]
+    created, errors = users.create_many(batch, batch_size=10)
+    assert created == 25 and [i for i, _ in errors] == [25]
+    users.delete(3)
+    ids = [u.id for u in users.iter_all(chunk_size=7)]
+    assert ids == [u.id for u in users.list_all()] and 3 not in ids and len(ids) == 24
+
+    page, seen = users.list_page(limit=10), []
+    while True:
+        seen += [u.id for u in page.items]
+        if page.next_after_id is None:
+            break
+        page = users.list_page(page.next_after_id, limit=10)
+    assert seen == ids
+    with pytest.raises(ValueError):
+        users.list_page(limit=0)
+    assert [c.id for c in condos.list_page(after_id=1).items] == [2]
+    assert [c.name for c in condos.iter_all()] == ["Alpha", "Beta"]
+    entries = dict(users.iter_rfid_entries())
+    assert len(entries) == 24 and "00000002" not in entries and entries["00000004"].user_id == 5
+
+
+def test_sessions_update_last_and_cascade(backend):
+    users, _, sessions = backend
+    uid = users.create(_user("Ana", "aa000001"))
+
+    def s(end, energy, tx=None):
+        return ChargingSession(
+            user_id=uid, started_at=end - 60_000, ended_at=end, energy_kwh=energy, cost=1.0, duration_minutes=1.0,
+            transaction_id=tx,
+        )
+
+    sessions.append(s(2_000_000, 2.0, "t1"))
+    sessions.append(s(1_000_000, 1.0))  # mais antiga: não muda last_*
+    sessions.append(s(2_500_000, 9.0, "t1"))  # reenvio da mesma transação: ignorado
+    assert users.get_by_id(uid).last_energy == 2.0
+    written, errors = sessions.append_many(
+        [s(3_000_000, 3.0), ChargingSession(999, 0, 1, 1.0, 1.0, 1.0), s(3_000_000, 4.0), s(4_000_000, 8.0, "t1")]
+    )
+    assert written == 2 and errors == [(1, "Usuário não encontrado.")]
+    assert users.get_by_id(uid).last_energy == 4.0  # empate no ended_at: vale a gravada por último
+    history = sessions.list_by_user(uid)
+    assert [x.energy_kwh for x in history] == [4.0, 3.0, 2.0, 1.0] and history[0].condo_id == 1
+    assert len(sessions.list_by_user(uid, limit=1)) == 1
+    with pytest.raises(ValueError):
+        sessions.append(ChargingSession(999, 0, 1, 1.0, 1.0, 1.0))
+    users.delete(uid)
+    assert sessions.list_by_user(uid) == []
+
+
+def test_snapshot_round_trip(tmp_path, memory_store, services_memory):
+    user_service, condo_service = services_memory
+    condo_service.register_condo("Alpha", 10, 2, "Lento", "SP", 0.8)
+    uid = user_service.register_user("Ana", "1", "Alpha", "11", "elétrico", "aa000001")
+    user_service.set_last_measure(uid, 5.0, 4.0, 30)
+    user_service.delete_user(user_service.register_user("Bia", "2", "Alpha", "22", "híbrido", "aa000002"))
+    path = tmp_path / "snap" / "mem.json"
+    memory_store.save(str(path))
+
+    loaded = MemoryStore.load(str(path))
+    users = MemoryUserRepository(loaded)
+    ana = users.get_by_rfid("aa000001")
+    assert ana.condo == "Alpha" and ana.last_energy == 5.0
+    sessions = MemorySessionRepository(loaded)
+    assert len(sessions.list_by_user(uid)) == 1
+    sessions.append(ChargingSession(uid, 0, 1, 9.0, 1.0, 1.0))  # anterior à carregada: não vira last_*
+    assert users.get_by_id(uid).last_energy == 5.0
+    # ids excluídos não são reutilizados (AUTOINCREMENT)
+    assert users.create(_user("Caio", "aa000003")) == 3
+    assert loaded.stats() == {"users": 2, "condos": 1, "sessions": 2}
+
+    path.write_text('{"version": 99}', encoding="utf-8")
+    with pytest.raises(ValueError):
+        MemoryStore.load(str(path))
+
+
+def test_concurrent_writers_keep_indexes_consistent(memory_repos):
+    users, condos = memory_repos
+    condos.create(_condo("Alpha"))
+
+    def worker(n):
+        for i in range(200):
+            try:
+                users.create(_user(f"T{n}-{i}", f"{i:08x}"))  # mesmas tags em todas as threads
+            except sqlite3.IntegrityError:
+                pass
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert users.count_by_condo("Alpha") == 200 == len(users.list_all())
+
+
+def test_build_context_with_memory_backend(tmp_path):
+    snap = tmp_path / "state.json"
+    cfg = AppConfig({"database": {"backend": "memory", "snapshot_path": str(snap)}, "metrics": {"enabled": True}})
+    ctx = build_context(cfg)
+    ctx.condo_service.register_condo("Alpha", 10, 2, "Lento", "SP", 0.8)
+    ctx.user_service.register_user("Ana", "1", "Alpha", "11", "elétrico", "aa000001")
+    assert ctx.rfid_service.authorize("aa000001").user_id == 1
+    assert ctx.metrics.collect()["memory_store"]["users"] == 1
+    ctx.close()
+    assert snap.exists()
+
+    ctx = build_context(cfg)  # reabre a partir do instantâneo
+    assert ctx.user_service.get_user("name", "Ana").condo == "Alpha"
+    ctx.close()
+
+    with pytest.raises(ValueError, match="backend"):
+        build_context(AppConfig({"database": {"backend": "redis"}}))
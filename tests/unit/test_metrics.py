@@ -0,0 +1,106 @@
+import json
+
+import pytest
+
+from app.bootstrap import build_context
+from app.cli.commands import run
+from app.config import AppConfig
+from app.metrics import MetricsRegistry, PeriodicDump, instrument
+
+
+class _Repo:
+    def get(self, key):
+        if key is None:
+            raise KeyError("sem chave")
+        return key
+
+    def iter_all(self):
+        yield from range(3)
+
+    def _private(self):
+        return "interno"
+
+
+def test_histogram_quantiles_and_prometheus_text():
+    reg = MetricsRegistry()
+    for ms in (1, 2, 3, 4, 100):
+        reg.latency.observe(ms / 1000, "X", "op")
+    requests = reg.counter("requests_total", "Pedidos.", ("op",))
+    requests.inc(5, "op")
+    assert reg.latency.count("X", "op") == 5
+    assert 0.001 <= reg.latency.quantile(0.5, "X", "op") <= 0.005
+    assert reg.latency.quantile(0.99, "X", "op") <= 0.1
+    assert reg.latency.quantile(0.5, "Y", "op") is None
+    gauge = reg.gauge("queue_depth", "Itens na fila.")
+    gauge.set(7)
+    gauge.dec(2)
+    reg.add_collector("pool", lambda: {"idle": 2, "in_use": 1})
+    text = reg.render_prometheus()
+    assert 'evcharge_requests_total{op="op"} 5' in text
+    assert 'evcharge_call_seconds_bucket{component="X",method="op",le="+Inf"} 5' in text
+    assert 'evcharge_call_seconds_count{component="X",method="op"} 5' in text
+    assert "# TYPE evcharge_queue_depth gauge\nevcharge_queue_depth 5" in text
+    assert "evcharge_pool_in_use 1" in text
+    with pytest.raises(ValueError):
+        reg.counter("requests_total", "duplicada")
+
+
+def test_instrument_counts_calls_errors_and_generators():
+    reg = MetricsRegistry(enabled=True)
+    repo = instrument(_Repo(), reg)
+    assert repo.get(1) == 1
+    with pytest.raises(KeyError):
+        repo.get(None)
+    assert list(repo.iter_all()) == [0, 1, 2]
+    assert repo._private() == "interno"
+    rows = {r["method"]: r for r in reg.summary()}
+    assert rows["get"]["calls"] == 2 and rows["get"]["errors"] == 1
+    assert rows["iter_all"]["calls"] == 1 and "_private" not in rows
+
+
+def test_disabled_registry_leaves_objects_untouched():
+    reg = MetricsRegistry(enabled=False)
+    repo = _Repo()
+    assert instrument(repo, reg) is repo
+    assert "get" not in vars(repo)
+    assert reg.summary() == []
+
+
+def test_context_instrumentation_and_stats_command(tmp_path, capsys):
+    data = {"database": {"path": str(tmp_path / "m.db")}, "metrics": {"enabled": True}}
+    ctx = build_context(AppConfig(data))
+    try:
+        ctx.condo_service.register_condo("Alpha", 10, 1, "Lento", "SP", 0.8)
+        assert ctx.condo_service.get_condo("name", "Alpha") is not None
+        components = {(r["component"], r["method"]) for r in ctx.metrics.summary()}
+        assert ("CondoService", "register_condo") in components
+        assert ("CondoRepository", "create") in components
+        assert ctx.metrics.collect()["db_pool"]["created"] >= 1
+    finally:
+        ctx.close()
+
+    script = tmp_path / "s.evc"
+    script.write_text("measure get 1\nstats --format json\n", encoding="utf-8")
+    run(["run-script", "--keep-going", str(script)], AppConfig(data))
+    stats = json.loads(capsys.readouterr().out.strip().splitlines()[-1])
+    assert stats["enabled"] is True
+    assert any(m["component"] == "UserService" and m["method"] == "get_user" for m in stats["methods"])
+    assert run(["stats"], AppConfig({"database": {"path": str(tmp_path / "m.db")}})) == 0
+    assert "Instrumentação desligada" in capsys.readouterr().out
+
+
+def test_prometheus_file_dump(tmp_path, capsys):
+    out = tmp_path / "prom" / "evcharge.prom"
+    cfg = AppConfig({"database": {"path": str(tmp_path / "p.db")}, "metrics": {"enabled": True}})
+    assert run(["stats", "--format", "prometheus", "-o", str(out)], cfg) == 0
+    assert "evcharge_db_pool_created" in out.read_text(encoding="utf-8")
+    as_json = tmp_path / "json" / "stats.json"  # demais formatos: mesma gravação atômica
+    assert run(["stats", "--format", "json", "-o", str(as_json)], cfg) == 0
+    assert json.loads(as_json.read_text(encoding="utf-8"))["enabled"] is True
+    assert not list(as_json.parent.glob("*.tmp"))
+
+    reg = MetricsRegistry(enabled=True)
+    reg.latency.observe(0.002, "A", "b")
+    dump_path = tmp_path / "dump.prom"
+    PeriodicDump(reg, str(dump_path), interval=0).close()
+    assert 'evcharge_call_seconds_count{component="A",method="b"} 1' in dump_path.read_text(encoding="utf-8")
@@ -0,0 +1,104 @@
+import sqlite3
+import pytest
+
+from app.infrastructure.db import SQLiteDatabase
+from app.infrastructure.migrations import Migration, MigrationRunner, DEFAULT_MIGRATIONS
+from app.cli.commands import run
+from app.config import AppConfig
+
+
+def _indexes(path):
+    conn = sqlite3.connect(path)
+    try:
+        return {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    finally:
+        conn.close()
+
+
+def test_fresh_database_reaches_latest_version_with_indexes(tmp_path):
+    path = str(tmp_path / "m.db")
+    SQLiteDatabase(path).close()
+    runner = MigrationRunner(path)
+    assert runner.current_version() == runner.latest_version == DEFAULT_MIGRATIONS[-1].version
+    assert {"idx_users_name", "idx_users_condo_id"} <= _indexes(path)
+    assert all(done for _, done in runner.status())
+
+
+def test_warm_start_applies_nothing(tmp_path):
+    path = str(tmp_path / "m.db")
+    assert MigrationRunner(path).migrate()
+    assert MigrationRunner(path).migrate() == []
+
+
+def test_legacy_database_without_version_is_upgraded(tmp_path):
+    path = str(tmp_path / "legacy.db")
+    conn = sqlite3.connect(path)
+    conn.executescript(DEFAULT_MIGRATIONS[0].sql)
+    conn.execute("INSERT INTO condos(name, apartments_count, chargers_count, charger_type, state, energy_price) VALUES ('A', 1, 1, 'Lento', 'SP', 1.0)")
+    conn.commit()
+    conn.close()
+    applied = MigrationRunner(path).migrate()
+    assert applied[0] == 1
+    conn = sqlite3.connect(path)
+    assert conn.execute("SELECT COUNT(*) FROM condos").fetchone()[0] == 1
+    conn.close()
+
+
+def test_failed_migration_rolls_back(tmp_path):
+    path = str(tmp_path / "bad.db")
+    migrations = [
+        Migration(1, "ok", "CREATE TABLE a (x INTEGER);"),
+        Migration(2, "quebrada", "CREATE TABLE b (x INTEGER);\nINSERT INTO nao_existe VALUES (1);"),
+    ]
+    runner = MigrationRunner(path, migrations)
+    with pytest.raises(sqlite3.OperationalError):
+        runner.migrate()
+    assert runner.current_version() == 0
+    assert MigrationRunner(path, migrations[:1]).migrate() == [1]
+
+
+def test_incomplete_statement_is_rejected(tmp_path):
+    runner = MigrationRunner(str(tmp_path / "x.db"), [Migration(1, "sem ;", "CREATE TABLE a (x INTEGER)")])
+    with pytest.raises(ValueError):
+        runner.migrate()
+
+
+def test_migrate_command_status_and_apply(tmp_path, capsys):
+    cfg = AppConfig({"database": {"path": str(tmp_path / "cli.db")}})
+    assert run(["migrate", "--status"], cfg) == 0
+    out = capsys.readouterr().out
+    assert "Versão atual: 0" in out and "[ ] 001" in out
+    assert run(["migrate"], cfg) == 0
+    assert "Migrações aplicadas" in capsys.readouterr().out
+    run(["migrate"], cfg)
+    assert "versão mais recente" in capsys.readouterr().out
+    run(["migrate", "--status"], cfg)
+    assert "[x] 002" in capsys.readouterr().out
+
+
+def test_condo_name_fk_migrated_to_condo_id(tmp_path):
+    path = str(tmp_path / "v2.db")
+    MigrationRunner(path, DEFAULT_MIGRATIONS[:2]).migrate()
+    conn = sqlite3.connect(path)
+    conn.execute("INSERT INTO condos(name, apartments_count, chargers_count, charger_type, state, energy_price) VALUES ('Alpha', 1, 1, 'Lento', 'SP', 1.0)")
+    conn.execute("INSERT INTO users(name, apartment, condo, plate_ending, vehicle_type, rfid_code, last_energy) VALUES ('Ana', '1', 'Alpha', '11', 'elétrico', 'aaaa0001', 3.5)")
+    conn.execute("INSERT INTO users(name, apartment, condo, plate_ending, vehicle_type, rfid_code) VALUES ('Bob', '2', 'Renomeado', '22', 'híbrido', 'aaaa0002')")
+    conn.execute("INSERT INTO users(name, apartment, condo, plate_ending, vehicle_type, rfid_code) VALUES ('Tmp', '3', 'Alpha', '33', 'híbrido', 'aaaa0003')")
+    conn.execute("DELETE FROM users WHERE name = 'Tmp'")
+    conn.commit()
+    conn.close()
+
+    assert MigrationRunner(path, DEFAULT_MIGRATIONS[:3]).migrate() == [3]
+    db = SQLiteDatabase(path)
+    from app.infrastructure.repositories import UserRepository
+    from app.domain.models import User
+    users = UserRepository(db)
+    ana = users.get_by_name("Ana")
+    assert ana.condo == "Alpha" and ana.condo_id == 1 and ana.last_energy == 3.5
+    assert users.get_by_name("Bob").condo == "Renomeado"
+    new_id = users.create(User(id=None, name="Caio", apartment="4", condo="Alpha", plate_ending="44", vehicle_type="elétrico", rfid_code="aaaa0004"))
+    assert new_id == 4  # AUTOINCREMENT preservado: id 3 (excluído) não é reutilizado
+    with db.connect() as conn:
+        cols = [r["name"] for r in conn.execute("PRAGMA table_info(users)")]
+    assert "condo_id" in cols and "condo" not in cols
+    db.close()
@@ -0,0 +1,57 @@
+import builtins
+import pstats
+
+from app.cli.commands import run
+from app.cli.menu import MenuCLI
+from app.config import AppConfig
+from app.infrastructure.mockdb import MockCondoRepository, MockUserRepository
+from app.profiling import Profiler, make_profiler
+from app.services.condo_service import CondoService
+from app.services.user_service import UserService
+
+
+def test_profiler_writes_pstats_and_summary(tmp_path):
+    profiler = Profiler(str(tmp_path / "p"), top_n=5)
+    with profiler.profile("import users") as run_:
+        sum(i * i for i in range(10_000))
+        profiler.note_size(42)
+        with profiler.profile("aninhado") as inner:  # ignorado: cProfile não aninha
+            pass
+    assert inner.pstats_path is None
+    assert run_.pstats_path.name.endswith("_import-users_42.pstats")
+    assert pstats.Stats(str(run_.pstats_path)).total_calls > 0
+    summary = run_.summary_path.read_text(encoding="utf-8")
+    assert "Operação: import users" in summary and "Tamanho: 42" in summary
+    assert "tempo acumulado" in summary and "tempo próprio" in summary
+
+
+def test_profiler_enabled_by_env(tmp_path, monkeypatch):
+    monkeypatch.delenv("EVCHARGE_PROFILE", raising=False)
+    assert make_profiler(str(tmp_path)) is None
+    assert make_profiler(str(tmp_path), flag=True) is not None
+    monkeypatch.setenv("EVCHARGE_PROFILE", "1")
+    monkeypatch.setenv("EVCHARGE_PROFILE_TOP", "7")
+    profiler = make_profiler(str(tmp_path))
+    assert profiler.top_n == 7 and profiler.out_dir == tmp_path / "profiles"
+
+
+def test_batch_command_profile_tagged_with_size(tmp_path):
+    condos = tmp_path / "c.txt"
+    condos.write_text("Omega;Lento;2;SP;0.80;40\nSigma;Rápido;3;RJ;1.20;60\n", encoding="utf-8")
+    cfg = AppConfig({"database": {"path": str(tmp_path / "b.db")}, "cli": {"export_path": str(tmp_path / "exp")}})
+    assert run(["--profile", "import-condos", str(condos)], cfg) == 0
+    assert run(["--profile", "measure", "get", "9"], cfg) == 4
+    names = sorted(p.name for p in (tmp_path / "exp" / "profiles").iterdir())
+    assert any(n.endswith("_import-condos_2.pstats") for n in names)
+    assert any(n.endswith("_measure-get.txt") for n in names)
+
+
+def test_menu_operation_profiled(tmp_path, monkeypatch):
+    users, condos = MockUserRepository(), MockCondoRepository()
+    profiler = Profiler(str(tmp_path / "prof"))
+    cli = MenuCLI(UserService(users, condos), CondoService(condos, users), str(tmp_path / "exp"), profiler=profiler)
+    inputs = iter(["12", "99", "0"])
+    monkeypatch.setattr(builtins, "input", lambda prompt="": next(inputs))
+    cli.run()
+    names = [p.name for p in (tmp_path / "prof").iterdir()]
+    assert len(names) == 2 and all("_exportar-condominios_0." in n for n in names)
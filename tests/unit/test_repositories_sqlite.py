@@ -26,3 +26,105 @@ def test_user_unique_rfid_sqlite(sqlite_repos, seed_condos_sqlite):
         assert False, "Deveria falhar por UNIQUE(rfid_code)"
     except sqlite3.IntegrityError:
         pass
+
+
+def _user(name, rfid, condo="Alpha"):
+    return User(id=None, name=name, apartment="1", condo=condo, plate_ending="11", vehicle_type="elétrico", rfid_code=rfid)
+
+
+def test_user_create_many_reports_bad_rows(sqlite_repos, seed_condos_sqlite):
+    users_repo, _ = sqlite_repos
+    users = [_user("A", "00000001"), _user("B", "00000002"), _user("C", "00000001"), _user("D", "00000004")]
+    created, errors = users_repo.create_many(users, batch_size=2)
+    assert created == 3
+    assert [idx for idx, _ in errors] == [2]
+    assert "UNIQUE" in errors[0][1]
+    assert [u.name for u in users_repo.list_all()] == ["A", "B", "D"]
+
+
+def test_user_create_many_commit_every(sqlite_repos, seed_condos_sqlite):
+    users_repo, _ = sqlite_repos
+    users = [_user(f"U{i}", f"{i:08x}") for i in range(25)]
+    created, errors = users_repo.create_many(users, batch_size=4, commit_every=10)
+    assert created == 25 and errors == []
+    assert users_repo.count_by_condo("Alpha") == 25
+
+
+def test_condo_create_many_duplicate_name(sqlite_repos):
+    from app.domain.models import Condo
+    _, condos_repo = sqlite_repos
+    mk = lambda n: Condo(id=None, name=n, apartments_count=1, chargers_count=1, charger_type="Lento", state="SP", energy_price=1.0)
+    created, errors = condos_repo.create_many([mk("X"), mk("X"), mk("Y")])
+    assert created == 2 and errors[0][0] == 1
+
+
+def test_condo_rename_keeps_users_linked_by_id(sqlite_repos, seed_condos_sqlite):
+    users_repo, condos_repo = sqlite_repos
+    uid = users_repo.create(_user("Ana", "0000aaaa"))
+    condo = condos_repo.get_by_name("Alpha")
+    assert users_repo.get_by_id(uid).condo_id == condo.id
+    condo.name = "Alpha Renomeado"
+    condos_repo.update(condo)
+    assert users_repo.get_by_id(uid).condo == "Alpha Renomeado"
+    assert users_repo.count_by_condo_id(condo.id) == 1
+    assert users_repo.count_by_condo("Alpha Renomeado") == 1
+
+
+def test_user_with_unknown_condo_is_rejected_by_db(sqlite_repos, seed_condos_sqlite):
+    users_repo, _ = sqlite_repos
+    try:
+        users_repo.create(_user("X", "0000bbbb", condo="NaoExiste"))
+        assert False, "Deveria falhar: condo_id NOT NULL"
+    except sqlite3.IntegrityError:
+        pass
+
+
+def test_iter_all_streams_in_chunks(sqlite_repos, seed_condos_sqlite):
+    users_repo, condos_repo = sqlite_repos
+    users_repo.create_many([_user(f"U{i}", f"{i:08x}") for i in range(7)])
+    it = users_repo.iter_all(chunk_size=3)
+    assert next(it).name == "U0"
+    assert [u.name for u in it] == [f"U{i}" for i in range(1, 7)]
+    assert [c.name for c in condos_repo.iter_all(chunk_size=1)] == ["Alpha", "Beta"]
+
+
+def test_list_page_walks_table_with_keyset_cursor(sqlite_repos, seed_condos_sqlite):
+    users_repo, condos_repo = sqlite_repos
+    users_repo.create_many([_user(f"U{i}", f"{i:08x}") for i in range(5)])
+    users_repo.delete(2)
+    seen, after = [], None
+    while True:
+        page = users_repo.list_page(after_id=after, limit=2)
+        seen.extend(u.id for u in page.items)
+        if page.next_after_id is None:
+            break
+        after = page.next_after_id
+    assert seen == [1, 3, 4, 5]
+    last = condos_repo.list_page(limit=2)
+    assert [c.name for c in last.items] == ["Alpha", "Beta"] and last.next_after_id is None
+    try:
+        users_repo.list_page(limit=0)
+        assert False, "limit inválido"
+    except ValueError:
+        pass
+
+
+def test_get_by_rfid_sqlite(sqlite_repos, seed_condos_sqlite):
+    users_repo, _ = sqlite_repos
+    uid = users_repo.create(_user("Ana", "b3950a25"))
+    assert users_repo.get_by_rfid("b3950a25").id == uid
+    assert users_repo.get_by_rfid("deadbeef") is None
+
+
+def test_select_columns_follow_model_field_order(sqlite_repos):
+    # os modelos são montados por posição: uma coluna fora de ordem trocaria valores em silêncio
+    from dataclasses import fields
+    from app.domain.models import Condo
+    from app.infrastructure.repositories import SELECT_CONDO_SQL, SELECT_USER_SQL
+
+    users_repo, _ = sqlite_repos
+    with users_repo.db.connect() as conn:
+        for sql, model in ((SELECT_USER_SQL, User), (SELECT_CONDO_SQL, Condo)):
+            cur = conn.execute(sql + " LIMIT 0")
+            assert [d[0] for d in cur.description] == [f.name for f in fields(model)]
+    assert not hasattr(User(None, "A", "1", "X", "11", "elétrico", "00000001"), "__dict__")
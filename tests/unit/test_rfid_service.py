@@ -0,0 +1,47 @@
+from app.domain.models import User
+from app.services.rfid_service import RfidAuthorizationService
+
+
+def test_authorize_tracks_user_changes(users_and_condos_services_memory):
+    user_service, _ = users_and_condos_services_memory
+    rfid = RfidAuthorizationService(user_service.users)
+    user_service.add_listener(rfid)
+    uid = user_service.register_user("Ana", "12B", "Alpha", "34", "elétrico", "B3950A25")
+    entry = rfid.authorize(" b3950a25 ")
+    assert entry and entry.user_id == uid and entry.condo_id == 1 and entry.vehicle_type == "elétrico"
+
+    u = user_service.get_user("id", str(uid))
+    u.rfid_code, u.condo = "0fbb65a9", "Beta"
+    user_service.update_user(u)
+    assert rfid.authorize("b3950a25") is None
+    assert rfid.authorize("0FBB65A9").condo_id == 2
+
+    user_service.delete_user(uid)
+    assert rfid.authorize("0fbb65a9") is None
+    assert rfid.authorize("xyz") is None
+    assert rfid.stats()["rejected"] == 1
+
+
+def test_negative_cache_and_fallback_to_repository(users_and_condos_services_memory):
+    user_service, _ = users_and_condos_services_memory
+    rfid = RfidAuthorizationService(user_service.users, negative_ttl=60)
+    assert rfid.authorize("deadbeef") is None
+    assert rfid.authorize("deadbeef") is None
+    assert rfid.stats()["negative_hits"] == 1
+    # cadastro feito por fora do serviço (sem aviso): visto após o TTL
+    user_service.users.create(User(id=None, name="Bob", apartment="1", condo="Alpha", plate_ending="11",
+                                   vehicle_type="híbrido", rfid_code="cafebabe", condo_id=1))
+    assert rfid.authorize("cafebabe").user_id == 1
+    assert rfid.stats()["fallbacks"] == 2
+
+
+def test_import_rebuilds_index(users_and_condos_services_memory, tmp_path):
+    user_service, _ = users_and_condos_services_memory
+    rfid = RfidAuthorizationService(user_service.users)
+    user_service.add_listener(rfid)
+    assert rfid.authorize("b3950a25") is None
+    p = tmp_path / "users.txt"
+    p.write_text("Ana;12B;Alpha;34;elétrico;b3950a25\nBob;1;Beta;56;híbrido;0fbb65a9\n", encoding="utf-8")
+    assert user_service.import_from_txt(str(p))[0] == 2
+    assert rfid.authorize("b3950a25").user_id == 1
+    assert rfid.stats()["indexed"] == 2 and rfid.stats()["fallbacks"] == 1
@@ -0,0 +1,65 @@
+import pytest
+
+from app.cli.commands import run
+from app.config import AppConfig
+from app.infrastructure.db import SQLiteDatabase
+from app.infrastructure.repositories import UserRepository, CondoRepository
+from app.infrastructure.rfid_snapshot import HEADER_SIZE, RECORD_SIZE, RfidSnapshot, write_snapshot
+from app.domain.models import Condo, User
+
+
+def test_write_and_lookup(tmp_path):
+    path = str(tmp_path / "rfid.snap")
+    entries = [(f"{i * 7:08x}", i + 1) for i in range(1000)]
+    assert write_snapshot(reversed(entries), path) == 1000
+    assert (tmp_path / "rfid.snap").stat().st_size == HEADER_SIZE + 1000 * RECORD_SIZE
+    with RfidSnapshot(path) as snap:
+        assert len(snap) == 1000
+        assert all(snap.lookup(rfid) == uid for rfid, uid in entries)
+        assert snap.lookup("00000001") is None
+        assert snap.lookup("FFFFFFFF") is None
+        assert snap.lookup("nope") is None
+        assert snap.lookup(" 0000001C ") == 5  # normalizado como validate_rfid
+
+
+def test_rejects_invalid_input_and_files(tmp_path):
+    path = tmp_path / "rfid.snap"
+    with pytest.raises(ValueError):
+        write_snapshot([("b3950a25", 1), ("B3950A25", 2)], str(path))
+    with pytest.raises(ValueError):
+        write_snapshot([("zz", 1)], str(path))
+    assert not path.exists() and not (tmp_path / "rfid.snap.tmp").exists()
+    path.write_bytes(b"XXXX" + bytes(12))
+    with pytest.raises(ValueError):
+        RfidSnapshot(str(path))
+    write_snapshot([("b3950a25", 1)], str(path))
+    path.write_bytes(path.read_bytes()[:-1])
+    with pytest.raises(ValueError):
+        RfidSnapshot(str(path))
+
+
+def test_refresh_after_atomic_swap(tmp_path):
+    path = str(tmp_path / "rfid.snap")
+    write_snapshot([("b3950a25", 1)], path)
+    snap = RfidSnapshot(path)
+    assert snap.refresh() is False
+    write_snapshot([("b3950a25", 1), ("0fbb65a9", 2)], path)
+    assert snap.lookup("0fbb65a9") is None  # ainda lê o arquivo antigo
+    assert snap.refresh() is True
+    assert snap.lookup("0fbb65a9") == 2 and len(snap) == 2
+    snap.close()
+
+
+def test_rfid_snapshot_command(tmp_path, capsys):
+    db_path = str(tmp_path / "cli.db")
+    db = SQLiteDatabase(db_path)
+    CondoRepository(db).create(Condo(None, "Alpha", 10, 1, "Lento", "SP", 1.0))
+    users = UserRepository(db)
+    uid = users.create(User(None, "Ana", "1", "Alpha", "11", "elétrico", "b3950a25"))
+    db.close()
+    out = str(tmp_path / "gw" / "rfid.snap")
+    cfg = AppConfig({"database": {"path": db_path}, "rfid": {"snapshot_path": out}})
+    assert run(["rfid-snapshot"], cfg) == 0
+    assert "1 tag(s)" in capsys.readouterr().out
+    with RfidSnapshot(out) as snap:
+        assert snap.lookup("b3950a25") == uid
@@ -1,4 +1,7 @@
+import pytest
+
 from app.domain.models import Condo
+from app.utils.repository import MAX_PAGE_SIZE
 
 
 def test_register_and_get_condo(services_mock):
@@ -40,3 +43,27 @@ Beta;Rápido;3;RJ;1.10;80
 """, encoding="utf-8")
     created = condo_service.import_from_txt(str(p))
     assert created == 2
+
+
+def test_import_condos_without_rejected_validates_whole_file_first(services_mock, tmp_path):
+    _, condo_service = services_mock
+    condo_service.chunk_size = 1  # a linha ruim fica num bloco posterior
+    p = tmp_path / "condos.txt"
+    p.write_text("Alpha;Lento;2;SP;0.75;50\nBeta;Rápido;3;RJ;1.10;80\nlinha quebrada\n", encoding="utf-8")
+    with pytest.raises(ValueError):
+        condo_service.import_from_txt(str(p))
+    assert list(condo_service.list_condos()) == []
+
+
+def test_paginated_listing_mock(users_and_condos_services_mock):
+    user_service, condo_service = users_and_condos_services_mock
+    condo_service.register_condo("Gamma", 10, 1, "Lento", "MG", 0.9)
+    page = condo_service.list_condos_page(limit=2)
+    assert [c.name for c in page.items] == ["Alpha", "Beta"] and page.next_after_id == 2
+    page = condo_service.list_condos_page(after_id=page.next_after_id, limit=2)
+    assert [c.name for c in page.items] == ["Gamma"] and page.next_after_id is None
+    uid = user_service.register_user("Ana", "1", "Alpha", "11", "elétrico", "aaaa0001")
+    assert [u.id for u in user_service.list_users_page().items] == [uid]
+    for bad in (0, MAX_PAGE_SIZE + 1):  # mesmos limites do SQLite
+        with pytest.raises(ValueError):
+            condo_service.list_condos_page(limit=bad)
@@ -0,0 +1,174 @@
+import threading
+import time
+import pytest
+
+from app.domain.models import ChargingSession, User
+from app.infrastructure.memory import MemorySessionRepository
+from app.infrastructure.write_behind import WriteBehindSessionRepository
+from app.services.rfid_service import RfidAuthorizationService
+from app.services.user_service import UserService
+
+
+class _Recorder:
+    """Repositório interno falso que registra os lotes recebidos."""
+
+    def __init__(self, fail_times=0):
+        self.batches = []
+        self.fail_times = fail_times
+
+    def append_many(self, sessions):
+        if self.fail_times:
+            self.fail_times -= 1
+            raise RuntimeError("database is locked")
+        self.batches.append(list(sessions))
+        return len(self.batches[-1]), [(i, "Usuário não encontrado.") for i, s in enumerate(self.batches[-1]) if s.user_id < 0]
+
+    def list_by_user(self, user_id, limit=None):
+        return [s for b in self.batches for s in b if s.user_id == user_id]
+
+
+def _s(uid, end, energy=1.0):
+    return ChargingSession(user_id=uid, started_at=end - 60_000, ended_at=end, energy_kwh=energy, cost=1.0, duration_minutes=1.0)
+
+
+def test_flushes_by_size_in_background():
+    inner = _Recorder()
+    q = WriteBehindSessionRepository(inner, max_batch=3, flush_interval=60)
+    for i in range(3):
+        q.append(_s(1, 1000 + i))
+    deadline = time.time() + 2
+    while not inner.batches and time.time() < deadline:
+        time.sleep(0.005)
+    assert [len(b) for b in inner.batches] == [3]
+    assert q.stats()["batches"] == 1 and q.stats()["depth"] == 0
+    q.close()
+
+
+def test_flushes_by_age_and_reports_lag():
+    inner = _Recorder()
+    q = WriteBehindSessionRepository(inner, max_batch=1000, flush_interval=0.05)
+    q.append(_s(1, 1000))
+    assert q.stats()["depth"] == 1
+    deadline = time.time() + 2
+    while not inner.batches and time.time() < deadline:
+        time.sleep(0.005)
+    assert inner.batches and q.stats()["flushed"] == 1 and q.stats()["lag_ms"] == 0.0
+    q.close()
+
+
+def test_coalesce_keeps_latest_per_user_and_close_flushes():
+    inner = _Recorder()
+    q = WriteBehindSessionRepository(inner, max_batch=1000, flush_interval=60, coalesce=True)
+    q.append(_s(1, 1000, 1.0))
+    q.append(_s(1, 2000, 2.0))
+    q.append(_s(2, 1500, 5.0))
+    assert q.pending_last(1).energy_kwh == 2.0
+    q.close()
+    assert [(s.user_id, s.energy_kwh) for s in inner.batches[0]] == [(1, 2.0), (2, 5.0)]
+    assert q.stats()["coalesced"] == 1 and q.pending_last(1) is None
+    with pytest.raises(RuntimeError):
+        q.append(_s(1, 3000))
+    q.close()  # idempotente
+
+
+def test_coalesce_keeps_newest_ended_at_even_when_it_arrives_first():
+    inner = _Recorder(fail_times=1)
+    q = WriteBehindSessionRepository(inner, max_batch=1000, flush_interval=60, coalesce=True)
+    q.append(_s(1, 2000, 2.0))
+    q.append(_s(1, 1000, 1.0))  # atrasada: não substitui a pendente
+    with pytest.raises(RuntimeError):
+        q.flush()
+    q.append(_s(1, 1500, 1.5))  # a devolvida à fila após a falha continua valendo
+    q.close()
+    assert [s.energy_kwh for s in inner.batches[0]] == [2.0]
+
+
+def test_unknown_user_is_rejected_before_enqueue(memory_repos, users_and_condos_services_memory):
+    users_repo, condos_repo = memory_repos
+    inner = _Recorder()
+    rfid = RfidAuthorizationService(users_repo)
+    q = WriteBehindSessionRepository(inner, flush_interval=60, user_exists=rfid.has_user)
+    svc = UserService(users_repo, condos_repo, sessions=q)
+    svc.add_listener(rfid)
+    uid = svc.register_user("Ana", "1", "Alpha", "11", "elétrico", "aaaa0001")
+    other = users_repo.create(User(None, "Bia", "2", "Alpha", "22", "híbrido", "aaaa0002"))  # outro processo
+    with pytest.raises(ValueError, match="Usuário não encontrado."):
+        svc.set_last_measure(999, 1.0, 1.0, 1.0)
+    assert svc.record_measures([(999, 1.0, 1.0, 1.0), (uid, 2.0, 2.0, 2.0)]) == (1, [(0, "Usuário não encontrado.")])
+    assert q.stats()["depth"] == 1
+    lookups = []
+    users_repo.get_by_id = lambda user_id: lookups.append(user_id)  # conhecidos não vão ao banco
+    svc.set_last_measure(uid, 3.0, 3.0, 3.0)
+    assert lookups == []
+    del users_repo.get_by_id
+    svc.set_last_measure(other, 1.0, 1.0, 1.0)
+    assert rfid.has_user(other) and rfid.stats()["fallbacks"] == 2
+    q.close()
+
+
+def test_close_unregisters_and_reports_lost_measures_when_flush_keeps_failing(caplog):
+    inner = _Recorder(fail_times=10)
+    q = WriteBehindSessionRepository(inner, flush_interval=60)
+    q.append(_s(1, 1000))
+    with pytest.raises(RuntimeError):
+        q.close()
+    assert "1 medidas não gravadas" in caplog.text
+    q.close()  # já fechada: não tenta de novo
+
+
+def test_age_trigger_uses_oldest_pending_after_requeue():
+    inner = _Recorder(fail_times=1)
+    q = WriteBehindSessionRepository(inner, max_batch=1000, flush_interval=60)
+    q.append(_s(1, 1000))
+    with pytest.raises(RuntimeError):
+        q.flush()
+    with q._cond:
+        t, s = q._pending.pop(next(iter(q._pending)))
+        q._pending["novo"] = (t - 120, s)  # a mais antiga fica no fim da fila
+        q._pending = {"recente": (time.monotonic(), _s(2, 1000)), **q._pending}
+        assert q._wait_time() == 0.0
+    q.close()
+
+
+def test_failed_batch_is_requeued_and_errors_counted():
+    inner = _Recorder(fail_times=1)
+    q = WriteBehindSessionRepository(inner, max_batch=1000, flush_interval=60)
+    q.append(_s(1, 1000))
+    q.append(_s(-1, 1000))
+    with pytest.raises(RuntimeError):
+        q.flush()
+    assert q.stats()["depth"] == 2
+    assert q.append_many([_s(2, 1000)]) == (1, [])
+    assert q.flush() == 3
+    assert q.stats()["failed"] == 1
+    assert len(q.list_by_user(1)) == 1
+    q.close()
+
+
+def test_backpressure_waits_for_flush():
+    inner = _Recorder()
+    q = WriteBehindSessionRepository(inner, max_batch=2, max_pending=2, flush_interval=0.01)
+    t = threading.Thread(target=lambda: [q.append(_s(1, i)) for i in range(10)])
+    t.start()
+    t.join(5)
+    assert not t.is_alive()
+    q.close()
+    assert sum(len(b) for b in inner.batches) == 10
+
+
+def test_service_reads_pending_measure_before_flush(memory_store, memory_repos, users_and_condos_services_memory):
+    users_repo, condos_repo = memory_repos
+    q = WriteBehindSessionRepository(MemorySessionRepository(memory_store), flush_interval=60)
+    svc = UserService(users_repo, condos_repo, sessions=q)
+    uid = svc.register_user("Ana", "1", "Alpha", "11", "elétrico", "aaaa0001")
+    svc.set_last_measure(uid, 12.5, 9.37, 45)
+    assert users_repo.get_by_id(uid).last_energy is None
+    assert "12.500" in svc.read_last_measure(uid)
+    q.close()
+    assert users_repo.get_by_id(uid).last_energy == 12.5
+    assert len(MemorySessionRepository(memory_store).list_by_user(uid)) == 1
+
+
+def test_invalid_settings():
+    with pytest.raises(ValueError):
+        WriteBehindSessionRepository(_Recorder(), max_batch=0)